@@ -0,0 +1,208 @@
+import argparse
+import logging
+
+
+def export_command(args):
+    """
+    Convert the JSONL output to the legacy JSON array format.
+    """
+    from src.sink import export_jsonl_to_json
+    count = export_jsonl_to_json(args.source, args.destination)
+    print(f"Exported {count} profiles to {args.destination}")
+
+
+def import_command(args):
+    """
+    Stream a JSON array or JSONL file into MongoDB, resuming an interrupted import.
+    """
+    import os
+    from pymongo import MongoClient
+    from src.config import get_config
+    from src.importer import import_to_mongo
+    config = get_config()
+    checkpoint = args.checkpoint or f"{args.source}.checkpoint"
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    with MongoClient(args.uri or config.mongo_uri) as client:
+        collection = client[args.db or config.mongo_db][args.collection or config.mongo_collection]
+        summary = import_to_mongo(args.source, collection, batch_size=args.batch_size,
+                                  workers=args.workers, checkpoint_path=checkpoint)
+    print(f"Imported {summary['documents']} documents in {summary['elapsed']:.1f}s "
+          f"({summary['docs_per_second']:.0f} docs/s, {summary['errors']} failed)")
+
+
+def reextract_command(args):
+    """
+    Rebuild profiles from saved HTML or a page archive on all cores, without a browser.
+    """
+    import os
+    from src.reextract import reextract
+    from src.sink import JsonlSink
+    if not args.sources and not args.archive:
+        raise SystemExit("Give HTML files/directories or --archive.")
+    if args.archive:
+        from src.archive import PageArchive
+        try:
+            PageArchive(args.archive, read_only=True).close()
+        except FileNotFoundError as e:
+            raise SystemExit(str(e))
+    if args.overwrite and os.path.exists(args.output):
+        os.remove(args.output)
+    with JsonlSink(args.output) as sink:
+        summary = reextract(sink, args.sources, archive_dir=args.archive, workers=args.workers)
+    print(f"Re-extracted {summary['extracted']} profiles ({summary['failed']} failed) to {args.output} "
+          f"in {summary['elapsed']:.1f}s ({summary['profiles_per_second']:.1f} profiles/s)")
+
+
+def selectors_command(args):
+    """
+    Show hit rates, latencies and learned timeouts of the registered selectors.
+    """
+    from src.selector_registry import SelectorRegistry
+    registry = SelectorRegistry()
+    registry.load(args.stats)
+    print(f"{'key':<34} {'tries':>6} {'hit %':>6} {'p50 ms':>8} {'p99 ms':>8} {'timeout':>8}  xpath")
+    for row in registry.report():
+        if not row["attempts"] and not args.all:
+            continue
+        hit_rate = f"{row['hit_rate'] * 100:.0f}" if row["hit_rate"] is not None else "-"
+        p50 = f"{row['p50'] * 1000:.0f}" if row["p50"] is not None else "-"
+        p99 = f"{row['p99'] * 1000:.0f}" if row["p99"] is not None else "-"
+        print(f"{row['key']:<34} {row['attempts']:>6} {hit_rate:>6} {p50:>8} {p99:>8} {row['timeout']:>8.2f}  {row['xpath']}")
+
+
+def nodes_command(args):
+    """
+    Show the live nodes of a sharded crawl with their queued, leased and finished profiles.
+    """
+    from src.coordinator import Coordinator
+    coordinator = Coordinator(args.db, node_id="cli", heartbeat_ttl=args.heartbeat_ttl)
+    stats = coordinator.stats()
+    print(f"{'node':<32} {'pending':>8} {'leased':>7} {'done':>7}")
+    for node, row in stats.items():
+        print(f"{node:<32} {row['pending']:>8} {row['leased']:>7} {row['done']:>7}")
+    print(f"{len(stats)} live node(s), {coordinator.pending_count()} pending, {coordinator.done_count()} done in total")
+    coordinator.conn.close()
+
+
+def graph_command(args):
+    """
+    Export the recorded profile graph as a CSR adjacency and print its degree statistics.
+    """
+    import numpy as np
+    from src.graph import GraphStore
+    graph = GraphStore(args.db)
+    try:
+        stats = graph.export_csr(args.output)
+        print(f"Exported {stats['nodes']} nodes and {stats['edges']} edges ({stats['duplicates']} duplicates dropped) "
+              f"to {args.output}; {stats['no_out_edges']} nodes have no outgoing edges")
+        print(f"{'degree':<7} {'mean':>7} {'median':>7} {'p99':>7} {'max':>7}")
+        for name in ("out", "in"):
+            print(f"{name:<7} {stats[name + '_mean']:>7.2f} {stats[name + '_median']:>7.0f} "
+                  f"{stats[name + '_p99']:>7.0f} {stats[name + '_max']:>7}")
+        if args.top:
+            in_degree = np.load(args.output)["in_degree"]
+            top = np.argsort(in_degree)[::-1][:args.top]
+            print("Profiles with the most incoming links:")
+            for node_id, url in zip(top, graph.urls(top)):
+                print(f"{in_degree[node_id]:>7}  {url}")
+    finally:
+        graph.close()
+
+
+def bench_command(args):
+    """
+    Compare extraction engines offline against saved profile HTML.
+    """
+    from src.archive import find_pages
+    from src.bench import run_benchmark, run_cdp_benchmark, run_pool_benchmark, format_table
+    fixtures = find_pages(args.fixtures)
+    if not fixtures:
+        raise SystemExit("No HTML fixtures found.")
+    if args.workers:
+        print(f"{'workers':>7} {'profiles':>9} {'seconds':>8} {'profiles/s':>11}")
+        for row in run_pool_benchmark(fixtures, workers=sorted({1, args.workers}), load_time=args.load_time, latency=args.latency):
+            same = "same output" if row["same_output"] else "DIFFERENT output"
+            print(f"{row['workers']:>7} {row['profiles']:>9} {row['seconds']:>8.2f} {row['profiles_per_second']:>11.2f}  {same}")
+        return
+    if args.tabs:
+        print(f"{'tabs':>5} {'profiles':>9} {'seconds':>8} {'profiles/s':>11}")
+        for row in run_cdp_benchmark(fixtures, tabs=sorted({1, args.tabs}), load_time=args.load_time, latency=args.latency):
+            same = "same output" if row["same_output"] else "DIFFERENT output"
+            print(f"{row['tabs']:>5} {row['profiles']:>9} {row['seconds']:>8.2f} {row['profiles_per_second']:>11.2f}  {same}")
+        return
+    missing = [section.strip() for section in args.missing.split(",") if section.strip()]
+    engines = [engine.strip() for engine in args.engines.split(",") if engine.strip()]
+    rows, matches = run_benchmark(fixtures, engines=engines, latency=args.latency, missing_sections=missing)
+    print(format_table(rows, matches, len(fixtures)))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Offline tools for the LinkedIn profile scraper.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export scraped profiles from JSONL to a JSON array.")
+    export_parser.add_argument("source", nargs="?", default="./data/scraped_profiles.jsonl")
+    export_parser.add_argument("destination", nargs="?", default="./data/scraped_profiles.json")
+    export_parser.set_defaults(func=export_command)
+
+    import_parser = subparsers.add_parser("import", help="Stream scraped profiles (JSON array or JSONL) into MongoDB.")
+    import_parser.add_argument("source", nargs="?", default="./data/scraped_profiles.jsonl")
+    import_parser.add_argument("--uri", help="MongoDB URI (default: MONGO_URI).")
+    import_parser.add_argument("--db", help="Database name (default: MONGO_DB).")
+    import_parser.add_argument("--collection", help="Collection name (default: MONGO_COLLECTION).")
+    import_parser.add_argument("--batch-size", type=int, default=1000, help="Documents per bulk write.")
+    import_parser.add_argument("--workers", type=int, default=4, help="Bulk writes running concurrently.")
+    import_parser.add_argument("--checkpoint", help="Progress file (default: <source>.checkpoint).")
+    import_parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint.")
+    import_parser.set_defaults(func=import_command)
+
+    reextract_parser = subparsers.add_parser("reextract", help="Re-run the extractors over saved HTML or a page archive.")
+    reextract_parser.add_argument("sources", nargs="*", help="HTML files or directories (pages named <slug>.html).")
+    reextract_parser.add_argument("--archive", help="PageArchive directory (see ARCHIVE_DIR) to read instead.")
+    reextract_parser.add_argument("--output", default="./data/reextracted_profiles.jsonl", help="JSONL file to write.")
+    reextract_parser.add_argument("--overwrite", action="store_true", help="Replace the output file instead of appending.")
+    reextract_parser.add_argument("--workers", type=int, help="Worker processes (default: one per core).")
+    reextract_parser.set_defaults(func=reextract_command)
+
+    selectors_parser = subparsers.add_parser("selectors", help="Report selector hit rates and learned timeouts.")
+    selectors_parser.add_argument("stats", nargs="?", default="./data/selector_stats.json", help="File written via SELECTOR_STATS.")
+    selectors_parser.add_argument("--all", action="store_true", help="Also list selectors that were never tried.")
+    selectors_parser.set_defaults(func=selectors_command)
+
+    nodes_parser = subparsers.add_parser("nodes", help="Report the nodes and shards of a sharded crawl.")
+    nodes_parser.add_argument("db", help="Coordinator database (see COORDINATOR_DB).")
+    nodes_parser.add_argument("--heartbeat-ttl", type=float, default=60.0, help="Seconds after which a silent node counts as dead.")
+    nodes_parser.set_defaults(func=nodes_command)
+
+    graph_parser = subparsers.add_parser("graph", help="Export the profile graph (see GRAPH_DB) as a CSR .npz with degree stats.")
+    graph_parser.add_argument("db", nargs="?", default="./data/graph.db", help="Graph database written via GRAPH_DB.")
+    graph_parser.add_argument("--output", default="./data/graph.npz", help="NumPy .npz file to write.")
+    graph_parser.add_argument("--top", type=int, default=10, help="Also list this many profiles with the most incoming links.")
+    graph_parser.set_defaults(func=graph_command)
+
+    bench_parser = subparsers.add_parser("bench", help="Benchmark extraction engines against saved profile HTML.")
+    bench_parser.add_argument("fixtures", nargs="*", default=["./data/fixtures"], help="HTML files or directories.")
+    bench_parser.add_argument("--engines", default="selenium,snapshot,script", help="Comma-separated engines to compare.")
+    bench_parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per WebDriver round-trip.")
+    bench_parser.add_argument("--missing", default="", help="Comma-separated sections to remove, e.g. projects,honors.")
+    bench_parser.add_argument("--tabs", type=int, default=0, help="Instead, compare the DevTools engine with 1 and this many tabs.")
+    bench_parser.add_argument("--workers", type=int, default=0, help="Instead, compare the worker pool with 1 and this many browsers.")
+    bench_parser.add_argument("--load-time", type=float, default=1.0, help="Simulated page load seconds for --tabs and --workers.")
+    bench_parser.set_defaults(func=bench_command)
+
+    return parser
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    args = build_parser().parse_args()
+    from src.config import ConfigError
+    try:
+        args.func(args)
+    except ConfigError as e:
+        raise SystemExit(f"Configuration error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,62 @@
-from collections import deque
-import os
 import logging
-import time
-from dotenv import load_dotenv
-from selenium import webdriver
-from src.helper import add_random_delay, init_db, load_profile_list, login, save_profile_list, start_chrome_with_debug, save_to_json, mimic_human_interaction, load_profiles_from_csv, load_profiles_from_json, load_profiles_from_txt
-from src.scrape import scrape_profile, extract_more_profiles
+from functools import partial
+from src import metrics
+from src.config import get_config, setup_logging
+from src.helper import login, start_chrome_with_debug, mimic_human_interaction, load_profiles_from_csv, load_profiles_from_json, load_profiles_from_txt
+from src.archive import PageArchive
+from src.crawler import crawl_profile
+from src.graph import GraphStore
+from src.pool import WorkerPool
+from src.priority import PriorityRules
+from src.scheduler import CrawlScheduler
+from src.selector_registry import get_registry
+from src.session import SessionManager, start_logged_in
+from src.sink import JsonlSink, MongoSink, MultiSink
+from src.state import CrawlState
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("./log/scraping.log"),
-        # logging.StreamHandler(),  # Log to console
-    ]
-)
 
 def main():
     """
     Main function to perform LinkedIn profile scraping.
-    It logs into LinkedIn, scrapes profiles, and saves the results to a JSON file.
+    It logs into LinkedIn, scrapes profiles, and appends the results to a JSONL file.
     """
-    max_profiles_per_hour = 25
-    scraped_count = 0
-    # Load environment variables
-    load_dotenv(dotenv_path='./environment/.env')
-    root_profiles_file = os.getenv("ROOT")
-    db_path = os.getenv("DB_PATH")
+    # Load and validate the settings (environment/.env and the environment)
+    config = get_config()
+    config.require("root", "db_path")
+    if config.mongo_sink:
+        config.require("mongo_db", "mongo_collection")
+    setup_logging(config.log_file)
+    root_profiles_file = config.root
+    db_path = config.db_path
+    engine = config.extraction_engine
+    output_path = config.output_path
+    max_attempts = config.max_attempts
+    visited_capacity = config.visited_capacity
+    priority_rules_file = config.priority_rules
+    debug_ports = config.debug_ports
+    launch_chrome = config.launch_chrome
+    browser_driver = config.browser_driver
+    cdp_tabs = config.cdp_tabs
+    prefetch = config.prefetch
+    block_resources = config.block_resources
+    block_baseline_every = config.block_baseline_every
+    rate_per_hour = config.rate_per_hour
+    burst = config.burst
+    daily_budget = config.daily_budget
+    min_interval = config.min_interval
+    jitter = config.jitter
+    archive_dir = config.archive_dir
+    graph_db = config.graph_db
+    session_file = config.session_file
+    coordinator_db = config.coordinator_db
+    selector_stats = config.selector_stats
+    refresh_ttl_hours = config.refresh_ttl_hours
+    mongo_sink = config.mongo_sink
+    mongo_batch_size = config.mongo_batch_size
+    mongo_flush_interval = config.mongo_flush_interval
+    metrics_port = config.metrics_port
+    metrics_file = config.metrics_file
+    metrics_interval = config.metrics_interval
     
     if root_profiles_file.endswith('.json'):
         list_profile = load_profiles_from_json(root_profiles_file)
@@ -42,62 +71,103 @@ def main():
     if not list_profile:
         logging.warning("No root profiles found in the file, starting with an empty set.")
     
-    try:
-        # Initialize the Selenium driver
-        logging.info("Starting Chrome with remote debugging...")
-        driver = start_chrome_with_debug()
-
-        # Initialize database and queue
-        init_db(db_path)
-        queue = deque(list_profile)
-        list_profile = load_profile_list(db_path)
+    # Shared pacing: one budget covers every worker and browser
+    scheduler = CrawlScheduler(
+        rate_per_hour=rate_per_hour,
+        burst=burst,
+        daily_budget=daily_budget,
+        min_interval=min_interval,
+        jitter=jitter,
+    )
 
-        while queue:
-            if scraped_count >= max_profiles_per_hour:
-                logging.info("Reached hourly limit. Pausing for 1 hour...")
-                time.sleep(3600)  # Sleep for 1 hour
-                scraped_count = 0
-            
-            add_random_delay(20,60)
-            current_profile = queue.popleft()
-            # mimic_human_interaction(driver)
-            if current_profile not in list_profile:
-                try:
-                    # Scrape the profile data
-                    profile_info = scrape_profile(driver, current_profile, visited_profiles=list_profile)
-                    if profile_info:
-                        list_profile.add(current_profile)
-                        # Save each profile after scraping, appending to the file
-                        save_to_json(profile_info)
-                        logging.info(f"Profile {current_profile} successfully saved.")
+    # Optional metrics surface: a localhost endpoint and/or a Prometheus textfile
+    if metrics_port:
+        metrics_server = metrics.start_http_server(metrics_port)
+    if metrics_file:
+        metrics_writer = metrics.start_textfile_writer(metrics_file, metrics_interval)
 
-                    else:
-                        logging.warning(f"Failed to scrape profile: {current_profile}")
+    try:
+        # Open the output sink, optionally mirrored into MongoDB
+        sink = JsonlSink(output_path)
+        if mongo_sink:
+            sink = MultiSink(sink, MongoSink(
+                config.mongo_uri,
+                config.mongo_db,
+                config.mongo_collection,
+                batch_size=mongo_batch_size,
+                flush_interval=mongo_flush_interval,
+                max_buffered=config.mongo_max_buffered,
+                spill_path=config.mongo_spill_file,
+            ))
 
-                    # Discover more profiles to scrape
-                    new_links = extract_more_profiles(driver)
-                    new_links = [link for link in new_links if link not in list_profile]
-                    queue.extend(new_links)
+        # Open the crawl state and seed the frontier; a previous run's frontier is resumed as-is
+        rules = PriorityRules.from_file(priority_rules_file) if priority_rules_file else PriorityRules()
+        state = CrawlState(db_path, max_attempts=max_attempts, visited_capacity=visited_capacity, rules=rules)
+        if coordinator_db:
+            # Share the frontier with the other nodes; every node seeds it, duplicates are ignored
+            from src.coordinator import Coordinator, ShardedState
+            coordinator = Coordinator(coordinator_db, node_id=config.node_id, lease_seconds=config.lease_seconds,
+                                      heartbeat_ttl=config.heartbeat_ttl, max_attempts=max_attempts, rules=rules)
+            coordinator.join()
+            state = ShardedState(coordinator, state)
+        state.push(list_profile)
+        if refresh_ttl_hours:
+            state.requeue_stale(refresh_ttl_hours * 3600)
+        state.commit()
+        logging.info(f"Crawl state loaded: {state.pending_count()} pending, {state.visited_count()} visited.")
 
-                    
-                    save_profile_list(db_path, current_profile)
-                    
-                    logging.info(f"Scraped profile: {current_profile}")
-                    scraped_count += 1
+        # Optionally keep every rendered page for offline re-extraction
+        archive = PageArchive(archive_dir) if archive_dir else None
+        # Optionally record the "people also viewed" links between profiles
+        graph = GraphStore(graph_db) if graph_db else None
 
-                except Exception as e:
-                    logging.error(f"Error while scraping profile {current_profile}: {e}")
-                    continue  # Proceed to the next profile in case of an error
+        if browser_driver == "cdp":
+            # Several tabs of one browser, driven over DevTools from a single thread
+            from src import helper
+            from src.cdp import run_crawl
+            logging.info(f"Crawling with {cdp_tabs} DevTools tab(s) on port {debug_ports[0]}...")
+            if launch_chrome:
+                chrome_process = helper.launch_chrome(debug_ports[0])
+            sessions = SessionManager(session_file) if session_file else None
+            run_crawl(state, sink, port=debug_ports[0], tabs=cdp_tabs, pace=scheduler.acquire, archive=archive,
+                      block_resources=block_resources, graph=graph, sessions=sessions)
+        else:
+            # One worker (and browser) per debugger port
+            logging.info(f"Starting {len(debug_ports)} Chrome worker(s) with remote debugging on ports {debug_ports}...")
+            driver_factories = [partial(start_chrome_with_debug, port=port, launch=launch_chrome,
+                                        block_resources=block_resources, baseline_every=block_baseline_every)
+                                for port in debug_ports]
+            if session_file:
+                # Log in once, then warm-start every other browser (and restart) from the saved session
+                sessions = SessionManager(session_file)
+                driver_factories = [partial(start_logged_in, factory, sessions) for factory in driver_factories]
+            crawl = partial(crawl_profile, archive=archive, graph=graph)
+            pool = WorkerPool(driver_factories, state, sink, engine=engine, pace=scheduler.acquire, crawl=crawl,
+                              prefetch=prefetch)
+            pool.run()
 
     except Exception as e:
         logging.error(f"An error occurred during execution: {e}")
     
     finally:
-        # Quit the driver to close the browser
-        if 'driver' in locals():
-            driver.quit()
-        logging.info("Driver successfully closed.")
-
+        if 'state' in locals():
+            state.close()
+        if 'sink' in locals():
+            sink.close()
+        if locals().get('archive'):
+            archive.close()
+        if locals().get('graph'):
+            graph.close()
+        if 'chrome_process' in locals():
+            chrome_process.terminate()
+        if selector_stats:
+            get_registry().save(selector_stats)
+        logging.info("Crawl state and output closed.")
+        if metrics_file:
+            metrics_writer.set()
+            metrics.write_textfile(metrics_file)
+        if metrics_port:
+            metrics_server.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,187 @@
+import os
+import lzma
+import time
+import hashlib
+import sqlite3
+import threading
+from lxml import etree
+from lxml import html as lxml_html
+
+
+# Elements no extractor reads: scripts, styles, LinkedIn's <code> hydration JSON and inline icons
+STRIPPED_TAGS = ("script", "style", "code", "noscript", "template", "svg")
+
+
+def strip_page(page_source):
+    """
+    Remove the parts of a rendered page that extraction never looks at.
+    """
+    document = lxml_html.document_fromstring(page_source)
+    etree.strip_elements(document, *STRIPPED_TAGS, etree.Comment, with_tail=False)
+    return lxml_html.tostring(document, encoding="unicode", doctype="<!DOCTYPE html>")
+
+
+def find_pages(paths):
+    """
+    Expand files and directories into a sorted list of saved HTML pages.
+    """
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            pages.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith((".html", ".htm")))
+        else:
+            pages.append(path)
+    return pages
+
+
+class PageArchive:
+    """
+    Content-addressed archive of rendered profile pages.
+
+    Each stripped page is compressed on its own with LZMA and appended to a pack
+    file; an SQLite index maps its hash to its position in the pack and every
+    (profile URL, capture time) to a hash. Pages identical to an archived one are
+    stored once, and a single page is read back with one seek without touching
+    the rest of the pack. Safe to share between worker threads.
+
+    Files:
+        <directory>/pages.pack: concatenated LZMA blobs.
+        <directory>/index.db:   blobs and captures tables.
+    """
+
+    def __init__(self, directory, preset=6, read_only=False):
+        """
+        Args:
+            directory: Archive directory, created if needed unless read_only.
+            preset: LZMA preset for new pages.
+            read_only: Open an existing archive for reading only; FileNotFoundError
+                       is raised if directory holds no archive.
+        """
+        self.directory = directory
+        self.preset = preset
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        pack_path = os.path.join(directory, "pages.pack")
+        index_path = os.path.join(directory, "index.db")
+        if read_only:
+            for path in (index_path, pack_path):
+                if not os.path.isfile(path):
+                    raise FileNotFoundError(f"No page archive in {directory}: {path} is missing.")
+            self._pack = open(pack_path, "rb")
+            self.conn = sqlite3.connect(f"file:{os.path.abspath(index_path)}?mode=ro", uri=True, check_same_thread=False)
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        self._pack = open(pack_path, "ab+")
+        self.conn = sqlite3.connect(index_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            raw_size INTEGER NOT NULL
+        ) WITHOUT ROWID
+        ''')
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS captures (
+            url TEXT NOT NULL,
+            captured_at REAL NOT NULL,
+            hash TEXT NOT NULL,
+            PRIMARY KEY (url, captured_at)
+        ) WITHOUT ROWID
+        ''')
+        self.conn.commit()
+
+    def put(self, url, page_source, captured_at=None):
+        """
+        Archive a rendered page.
+
+        Args:
+            url: Canonical profile URL the page belongs to.
+            page_source: The page HTML (str or bytes), e.g. driver.page_source.
+            captured_at: Unix time of the capture (default: now).
+
+        Returns:
+            The content hash the page is stored under.
+        """
+        data = strip_page(page_source).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        captured_at = time.time() if captured_at is None else captured_at
+        with self._lock:
+            if self.conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone() is None:
+                blob = lzma.compress(data, preset=self.preset)
+                self._pack.seek(0, os.SEEK_END)
+                offset = self._pack.tell()
+                self._pack.write(blob)
+                self._pack.flush()
+                self.conn.execute("INSERT INTO blobs (hash, offset, length, raw_size) VALUES (?, ?, ?, ?)",
+                                  (digest, offset, len(blob), len(data)))
+            self.conn.execute("INSERT OR REPLACE INTO captures (url, captured_at, hash) VALUES (?, ?, ?)",
+                              (url, captured_at, digest))
+            self.conn.commit()
+        return digest
+
+    def read_blob(self, digest):
+        """
+        Return the archived page stored under a content hash.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT offset, length FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if row is None:
+                raise KeyError(digest)
+            self._pack.seek(row[0])
+            blob = self._pack.read(row[1])
+        return lzma.decompress(blob).decode("utf-8")
+
+    def get(self, url, at=None):
+        """
+        Return the latest archived page of a profile, or the latest one captured at
+        or before the Unix time `at`. Returns None if there is none.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT hash FROM captures WHERE url = ? AND captured_at <= ? ORDER BY captured_at DESC LIMIT 1",
+                (url, float("inf") if at is None else at)
+            ).fetchone()
+        return self.read_blob(row[0]) if row else None
+
+    def captures(self, url):
+        """
+        List the (captured_at, hash) pairs archived for a profile, oldest first.
+        """
+        with self._lock:
+            return self.conn.execute("SELECT captured_at, hash FROM captures WHERE url = ? ORDER BY captured_at",
+                                     (url,)).fetchall()
+
+    def latest(self):
+        """
+        Yield (url, captured_at, hash) for the latest capture of every archived profile.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, MAX(captured_at), hash FROM captures GROUP BY url ORDER BY url"
+            ).fetchall()
+        yield from rows
+
+    def stats(self):
+        """
+        Counts and sizes: captures, distinct pages, raw (stripped) and compressed bytes.
+        """
+        with self._lock:
+            captures = self.conn.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+            pages, raw, compressed = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(length), 0) FROM blobs"
+            ).fetchone()
+        return {"captures": captures, "pages": pages, "raw_bytes": raw, "compressed_bytes": compressed}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+            self._pack.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
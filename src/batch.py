@@ -0,0 +1,381 @@
+import logging
+from selenium.webdriver.common.by import By
+from src.metrics import SECTION_SECONDS, SECTIONS_SKIPPED
+from src.selector_registry import get_registry
+
+
+# Walks a section spec in the page and returns every field of every entry at once.
+# spec = {"entries": [xpaths], "fields": {name: {"xpaths": [xpaths], "attr": optional}}, "nested": optional spec}
+# Each list holds a selector and its fallbacks, best first; the first one that matches is used.
+BATCH_SCRIPT = """
+var spec = arguments[0];
+function first(xpaths, context) {
+    for (var i = 0; i < xpaths.length; i++) {
+        try {
+            var node = document.evaluate(xpaths[i], context, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (node) {
+                return node;
+            }
+        } catch (e) {}
+    }
+    return null;
+}
+function all(xpaths, context) {
+    for (var i = 0; i < xpaths.length; i++) {
+        var nodes = [];
+        try {
+            var result = document.evaluate(xpaths[i], context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (var j = 0; j < result.snapshotLength; j++) {
+                nodes.push(result.snapshotItem(j));
+            }
+        } catch (e) {}
+        if (nodes.length) {
+            return nodes;
+        }
+    }
+    return [];
+}
+function value(node, field) {
+    if (!node) {
+        return null;
+    }
+    if (field.attr) {
+        var attribute = node.getAttribute(field.attr);
+        if (attribute && (field.attr === 'href' || field.attr === 'src')) {
+            try { attribute = new URL(attribute, document.baseURI).href; } catch (e) {}
+        }
+        return attribute;
+    }
+    return (node.innerText || '').trim();
+}
+function walk(context, spec) {
+    return all(spec.entries, context).map(function (entry) {
+        var row = {};
+        for (var name in (spec.fields || {})) {
+            row[name] = value(first(spec.fields[name].xpaths, entry), spec.fields[name]);
+        }
+        if (spec.nested) {
+            row._nested = walk(entry, spec.nested);
+        }
+        return row;
+    });
+}
+return walk(document, spec);
+"""
+
+
+# One spec per section, naming the same registry selectors as the extractors in src/scrape.py.
+# Fields map a row name to a selector key, or to (key, attribute).
+SECTION_SPECS = {
+    "intro": {
+        "entries": "intro.container",
+        "fields": {
+            "name": "intro.name",
+            "pronouns": "intro.pronouns",
+            "works_at": "intro.works_at",
+            "location": "intro.location",
+            "followers": "intro.followers",
+            "connections": "intro.connections",
+        },
+    },
+    "about": {
+        "entries": None,  # The whole document
+        "fields": {"about_description": "about.description"},
+    },
+    "experience": {
+        "entries": "experience.entries",
+        "fields": {
+            "header": "experience.header",
+            "logo_location": "experience.logo_location",
+            "company_type": "experience.company_type",
+            "dates": "experience.dates",
+            "location": "experience.location",
+            "description": "experience.description",
+        },
+        "nested": {
+            "entries": "experience.nested",
+            "fields": {
+                "job_title": "experience.nested_job_title",
+                "type": "experience.nested_type",
+                "dates": "experience.nested_dates",
+                "description": "experience.nested_description",
+            },
+        },
+    },
+    "education": {
+        "entries": "education.entries",
+        "fields": {
+            "institution": "education.institution",
+            "degree_field": "education.degree_field",
+            "graduation_year": "education.graduation_year",
+        },
+    },
+    "certificates": {
+        "entries": "certificates.entries",
+        "fields": {
+            "cert_name": "certificates.cert_name",
+            "issuer": "certificates.issuer",
+            "issue_date": "certificates.issue_date",
+            "credential_url": ("certificates.credential_url", "href"),
+        },
+    },
+    "projects": {
+        "entries": "projects.entries",
+        "fields": {
+            "project_title": "projects.project_title",
+            "dates": "projects.dates",
+            "organization": "projects.organization",
+            "description": "projects.description",
+            "link": ("projects.link", "href"),
+        },
+    },
+    "volunteering": {
+        "entries": "volunteering.entries",
+        "fields": {
+            "role": "volunteering.role",
+            "organization": "volunteering.organization",
+            "duration": "volunteering.duration",
+        },
+    },
+    "skills": {
+        "entries": "skills.entries",
+        "fields": {
+            "title": "skills.title",
+            "endorsements": "skills.endorsements",
+        },
+    },
+    "honors": {
+        "entries": "honors.entries",
+        "fields": {
+            "title": "honors.title",
+            "issuer": "honors.issuer",
+        },
+    },
+    "organizations": {
+        "entries": "organizations.entries",
+        "fields": {
+            "organization_name": "organizations.organization_name",
+            "role_duration": "organizations.role_duration",
+            "description": "organizations.description",
+        },
+    },
+}
+
+
+def resolve_spec(spec, registry=None):
+    """
+    Replace the selector keys of a section spec with their XPaths, best first.
+    """
+    registry = registry or get_registry()
+    fields = {}
+    for name, field in spec.get("fields", {}).items():
+        key, attr = field if isinstance(field, tuple) else (field, None)
+        fields[name] = {"xpaths": registry.candidates(key), "attr": attr}
+    resolved = {
+        "entries": registry.candidates(spec["entries"]) if spec["entries"] else ["/html"],
+        "fields": fields,
+    }
+    if spec.get("nested"):
+        resolved["nested"] = resolve_spec(spec["nested"], registry)
+    return resolved
+
+
+def evaluate_spec(driver, spec):
+    """
+    Python evaluation of a resolved section spec against a SnapshotPage, returning
+    the same structure as BATCH_SCRIPT. Used when no browser is available.
+    """
+    rows = []
+    for entry in _first_match(driver, spec["entries"]):
+        row = {}
+        for name, field in spec.get("fields", {}).items():
+            found = _first_match(entry, field["xpaths"])
+            if not found:
+                row[name] = None
+            elif field.get("attr"):
+                row[name] = found[0].get_attribute(field["attr"])
+            else:
+                row[name] = found[0].text.strip()
+        if spec.get("nested"):
+            row["_nested"] = evaluate_spec(entry, spec["nested"])
+        rows.append(row)
+    return rows
+
+
+def _first_match(context, xpaths):
+    for xpath in xpaths:
+        found = context.find_elements(By.XPATH, xpath)
+        if found:
+            return found
+    return []
+
+
+def run_spec(driver, spec):
+    """
+    Fetch every field of every entry of a section in one round-trip.
+    """
+    resolved = resolve_spec(spec)
+    if getattr(driver, "static", False):
+        return evaluate_spec(driver, resolved)
+    return driver.execute_script(BATCH_SCRIPT, resolved) or []
+
+
+# Builders turning raw rows into the same records as the extractors in src/scrape.py
+
+def build_intro(rows):
+    if not rows:
+        logging.error("Intro section not found.")
+        return None
+    row = rows[0]
+    intro_data = {key: row[key] for key in ("name", "pronouns", "works_at", "location")}
+    try:
+        intro_data["followers"] = row["followers"].split()[0]
+    except:
+        intro_data["followers"] = None
+    intro_data["connections"] = row["connections"]
+    return intro_data
+
+
+def build_about(rows):
+    about_description = rows[0]["about_description"] if rows else None
+    return {"about_description": about_description or ""}
+
+
+def build_experience(rows):
+    experience_data = []
+    try:
+        for row in rows:
+            nested_experiences = row["_nested"] or None
+
+            if nested_experiences:
+                try:
+                    company_name = row["header"].split("\n")[0]
+                except:
+                    company_name = None
+
+                try:
+                    location = row["logo_location"].split("\n")[0]
+                except:
+                    location = None
+
+                for nested_exp in nested_experiences:
+                    try:
+                        job_title = nested_exp["job_title"].split("\n")[0]
+                    except:
+                        job_title = None
+
+                    try:
+                        type = nested_exp["type"].split()[0]
+                    except:
+                        type = None
+
+                    experience_data.append({
+                        "company_name": company_name,
+                        "job_title": job_title,
+                        "location": location,
+                        "type": type,
+                        "dates": nested_exp["dates"],
+                        "description": nested_exp["description"]
+                    })
+
+            else:
+                company_type = row["company_type"].split("\n")[0].split("·")
+                company_name, type = company_type[0], company_type[1]
+                experience_data.append({
+                    "company_name": company_name,
+                    "job_title": row["header"],
+                    "location": row["location"],
+                    "type": type,
+                    "dates": row["dates"],
+                    "description": row["description"]
+                })
+
+    except Exception:
+        logging.error("Error extracting experience section.")
+    return experience_data
+
+
+def build_skills(rows):
+    skills = []
+    for row in rows:
+        try:
+            endorsements = row["endorsements"].split()[0]
+        except:
+            endorsements = None
+        skills.append({"title": row["title"], "endorsements": endorsements})
+    return skills
+
+
+def build_honors(rows):
+    honors = []
+    try:
+        for row in rows:
+            issuer_data = row["issuer"].split("·")
+            honors.append({
+                "title": row["title"],
+                "issuer": issuer_data[0].strip(),
+                "issued_date": issuer_data[1].strip(),
+            })
+    except Exception:
+        logging.error("Error extracting honors information.")
+    return honors
+
+
+def build_organizations(rows):
+    organizations = []
+    try:
+        for row in rows:
+            role_duration = row["role_duration"].split("·")
+            organizations.append({
+                "organization_name": row["organization_name"],
+                "role": role_duration[0].strip() if len(role_duration) > 0 else None,
+                "duration": role_duration[1].strip() if len(role_duration) > 1 else None,
+                "description": row["description"],
+            })
+    except Exception:
+        logging.error("Error extracting organizations information.")
+    return organizations
+
+
+def build_plain(rows):
+    return [{key: value for key, value in row.items() if key != "_nested"} for row in rows]
+
+
+SECTION_BUILDERS = {
+    "intro": build_intro,
+    "about": build_about,
+    "experience": build_experience,
+    "education": build_plain,
+    "certificates": build_plain,
+    "projects": build_plain,
+    "volunteering": build_plain,
+    "skills": build_skills,
+    "honors": build_honors,
+    "organizations": build_organizations,
+}
+
+
+def extract_sections_batched(driver, sections=None):
+    """
+    Extracts all profile sections with one execute_script call per section.
+    Produces the same profile_data as extract_sections in src/scrape.py.
+
+    Args:
+        driver: Selenium WebDriver instance or SnapshotPage.
+        sections: Optional set of optional sections known to be present; the
+            others are skipped without a round-trip.
+    """
+    profile_data = {}
+    for field, spec in SECTION_SPECS.items():
+        if sections is not None and field not in ("intro", "about") and field not in sections:
+            SECTIONS_SKIPPED.inc(section=field)
+            profile_data[field] = []
+            continue
+        with SECTION_SECONDS.time(section=field, engine="script"):
+            try:
+                rows = run_spec(driver, spec)
+            except Exception as e:
+                logging.error(f"Batched extraction of {field} failed: {e}")
+                rows = []
+            profile_data[field] = SECTION_BUILDERS[field](rows)
+    return profile_data
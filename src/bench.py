@@ -0,0 +1,268 @@
+import os
+import time
+import asyncio
+import logging
+import tempfile
+import threading
+from functools import partial
+from collections import defaultdict
+from src.fakes import FakeWebDriver, FakeCDPServer
+from src.snapshot import SnapshotPage
+from src.selector_registry import get_registry
+from src.scrape import SECTION_EXTRACTORS, SECTION_ANCHORS, probe_sections, scrape_html, scrape_profile
+from src.batch import SECTION_SPECS, SECTION_BUILDERS, run_spec
+from src.crawler import record_profile
+from src.pool import WorkerPool
+from src.state import CrawlState
+
+
+ENGINES = ("selenium", "snapshot", "script")
+
+
+def _measure(driver, label, results, func):
+    """
+    Run func with every fake round-trip charged to label and record its cost.
+    """
+    driver.label = label
+    calls_before = driver.calls_for(label)
+    misses_before = get_registry().misses()
+    start = time.perf_counter()
+    value = func()
+    results.append({
+        "section": label,
+        "seconds": time.perf_counter() - start,
+        "calls": driver.calls_for(label) - calls_before,
+        "misses": get_registry().misses() - misses_before,
+    })
+    return value
+
+
+def _run_selenium(driver, results):
+    sections = _measure(driver, "probe", results, lambda: probe_sections(driver))
+    profile_data = {}
+    for field, extractor in SECTION_EXTRACTORS.items():
+        if field in SECTION_ANCHORS and sections is not None and field not in sections:
+            profile_data[field] = []
+            continue
+        profile_data[field] = _measure(driver, field, results, lambda: extractor(driver))
+    return profile_data
+
+
+def _run_snapshot(driver, results):
+    page = _measure(driver, "page_source", results, lambda: SnapshotPage.from_driver(driver))
+    sections = _measure(driver, "probe", results, lambda: probe_sections(page))
+    profile_data = {}
+    for field, extractor in SECTION_EXTRACTORS.items():
+        if field in SECTION_ANCHORS and field not in sections:
+            profile_data[field] = []
+            continue
+        profile_data[field] = _measure(driver, field, results, lambda: extractor(page))
+    return profile_data
+
+
+def _run_script(driver, results):
+    sections = _measure(driver, "probe", results, lambda: probe_sections(driver))
+    profile_data = {}
+    for field, spec in SECTION_SPECS.items():
+        if field in SECTION_ANCHORS and sections is not None and field not in sections:
+            profile_data[field] = []
+            continue
+        profile_data[field] = _measure(driver, field, results, lambda: SECTION_BUILDERS[field](run_spec(driver, spec)))
+    return profile_data
+
+
+RUNNERS = {"selenium": _run_selenium, "snapshot": _run_snapshot, "script": _run_script}
+
+
+def run_benchmark(fixtures, engines=ENGINES, latency=0.0, missing_sections=()):
+    """
+    Extract every fixture with every engine against a FakeWebDriver.
+
+    Args:
+        fixtures: Paths of saved profile HTML pages.
+        engines: Engines to compare ("selenium", "snapshot", "script").
+        latency: Simulated seconds per WebDriver round-trip.
+        missing_sections: Sections removed from every page to simulate absent ones.
+
+    Returns:
+        A list of result rows (engine, fixture, section, seconds, calls, misses)
+        and, per engine, whether its output matched the first engine's on every fixture.
+    """
+    rows = []
+    matches = {engine: True for engine in engines}
+    for fixture in fixtures:
+        with open(fixture, "rb") as file:
+            page_source = file.read()
+        reference = None
+        for engine in engines:
+            driver = FakeWebDriver(page_source, f"file://{os.path.abspath(fixture)}", latency, missing_sections)
+            results = []
+            profile_data = RUNNERS[engine](driver, results)
+            for result in results:
+                rows.append({"engine": engine, "fixture": fixture, **result})
+            if reference is None:
+                reference = profile_data
+            elif profile_data != reference:
+                matches[engine] = False
+                logging.warning(f"{engine} output differs from {engines[0]} on {fixture}.")
+    return rows, matches
+
+
+async def _scrape_with_tabs(port, urls, tabs):
+    from src.cdp import CDPBrowser, scrape_profile_cdp
+    queue = list(urls)
+    results = {}
+
+    async def work(browser):
+        tab = await browser.new_tab()
+        try:
+            while queue:
+                url = queue.pop(0)
+                results[url], _ = await scrape_profile_cdp(tab, url)
+        finally:
+            await tab.close()
+
+    async with await CDPBrowser.connect(port=port) as browser:
+        await asyncio.gather(*(work(browser) for _ in range(tabs)))
+    return results
+
+
+def run_cdp_benchmark(fixtures, tabs=(1, 4), repeat=4, load_time=1.0, latency=0.0):
+    """
+    Scrape every fixture through the async DevTools engine against a FakeCDPServer,
+    once per tab count, and compare the output with offline extraction.
+
+    Args:
+        fixtures: Paths of saved profile HTML pages.
+        tabs: Tab counts to compare.
+        repeat: Times every fixture is visited (under different URLs).
+        load_time: Simulated seconds until a page fires its load event.
+        latency: Simulated seconds per DevTools command.
+
+    Returns:
+        One row per tab count with profiles, seconds, profiles per second and
+        whether the output matched.
+    """
+    pages, expected = _fixture_pages(fixtures, repeat)
+
+    async def run(count):
+        async with FakeCDPServer(pages, load_time=load_time, latency=latency) as server:
+            start = time.perf_counter()
+            results = await _scrape_with_tabs(server.port, pages, count)
+            return results, time.perf_counter() - start
+
+    rows = []
+    for count in tabs:
+        results, seconds = asyncio.run(run(count))
+        rows.append({
+            "tabs": count,
+            "profiles": len(results),
+            "seconds": seconds,
+            "profiles_per_second": len(results) / seconds if seconds > 0 else 0.0,
+            "same_output": results == expected,
+        })
+    return rows
+
+
+class _ListSink:
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        with self._lock:
+            self.records.append(record)
+
+
+def _scrape_only(driver, profile_url, state, sink, engine="snapshot", preloaded=False):
+    # The fixtures link to profiles the benchmark has no pages for; do not queue them
+    profile_info = scrape_profile(driver, profile_url, engine=engine, preloaded=preloaded)
+    return record_profile(profile_url, profile_info, state, sink)
+
+
+def _fixture_pages(fixtures, repeat):
+    pages = {}
+    expected = {}
+    for fixture in fixtures:
+        with open(fixture, "rb") as file:
+            page_source = file.read()
+        slug = os.path.splitext(os.path.basename(fixture))[0]
+        for i in range(repeat):
+            url = f"https://www.linkedin.com/in/{slug}-{i}/"
+            pages[url] = page_source
+            expected[url] = scrape_html(page_source, url)
+    return pages, expected
+
+
+def run_pool_benchmark(fixtures, workers=(1, 4), repeat=4, load_time=1.0, latency=0.0, engine="snapshot"):
+    """
+    Scrape every fixture through a WorkerPool of FakeWebDrivers, once per worker
+    count, and compare the output with offline extraction.
+
+    Args:
+        fixtures: Paths of saved profile HTML pages.
+        workers: Worker counts to compare.
+        repeat: Times every fixture is visited (under different URLs).
+        load_time: Simulated seconds driver.get takes per page.
+        latency: Simulated seconds per WebDriver round-trip.
+        engine: Extraction engine the workers use.
+
+    Returns:
+        One row per worker count with profiles, seconds, profiles per second and
+        whether the output matched.
+    """
+    pages, expected = _fixture_pages(fixtures, repeat)
+    blank = "<html><body></body></html>"
+
+    rows = []
+    for count in workers:
+        with tempfile.TemporaryDirectory() as directory:
+            state = CrawlState(os.path.join(directory, "state.db"))
+            state.push(list(pages))
+            sink = _ListSink()
+            factories = [partial(FakeWebDriver, blank, latency=latency, pages=pages, load_time=load_time)] * count
+            pool = WorkerPool(factories, state, sink, engine=engine, crawl=_scrape_only, idle_poll=0.05)
+            summary = pool.run()
+            state.close()
+        results = {record.pop("profile_url"): record for record in sink.records}
+        rows.append({
+            "workers": count,
+            "profiles": len(results),
+            "seconds": summary["elapsed"],
+            "profiles_per_second": len(results) / summary["elapsed"] if summary["elapsed"] > 0 else 0.0,
+            "same_output": results == expected,
+        })
+    return rows
+
+
+def format_table(rows, matches, fixture_count):
+    """
+    Render benchmark rows as a table of per-section means per profile.
+    """
+    totals = defaultdict(lambda: {"seconds": 0.0, "calls": 0, "misses": 0})
+    order = []
+    for row in rows:
+        key = (row["engine"], row["section"])
+        if key not in totals:
+            order.append(key)
+        totals[key]["seconds"] += row["seconds"]
+        totals[key]["calls"] += row["calls"]
+        totals[key]["misses"] += row["misses"]
+
+    count = max(1, fixture_count)
+    lines = [f"{'engine':<10} {'section':<14} {'wall ms':>10} {'calls':>8} {'misses':>8}", "-" * 54]
+    engine_totals = defaultdict(lambda: [0.0, 0, 0])
+    for engine, section in order:
+        total = totals[(engine, section)]
+        lines.append(f"{engine:<10} {section:<14} {total['seconds'] * 1000 / count:>10.1f} "
+                     f"{total['calls'] / count:>8.1f} {total['misses'] / count:>8.1f}")
+        engine_totals[engine][0] += total["seconds"]
+        engine_totals[engine][1] += total["calls"]
+        engine_totals[engine][2] += total["misses"]
+
+    lines.append("-" * 54)
+    for engine, (seconds, calls, misses) in engine_totals.items():
+        same = "same output" if matches.get(engine) else "DIFFERENT output"
+        lines.append(f"{engine:<10} {'TOTAL':<14} {seconds * 1000 / count:>10.1f} "
+                     f"{calls / count:>8.1f} {misses / count:>8.1f}  {same}")
+    return "\n".join(lines)
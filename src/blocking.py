@@ -0,0 +1,126 @@
+import logging
+from src.metrics import PAGE_BYTES, PAGE_NETWORK_SECONDS
+
+
+def _extensions(*extensions):
+    # Blocked-URL patterns match the whole URL, query string included
+    return [pattern for ext in extensions for pattern in (f"*.{ext}", f"*.{ext}?*")]
+
+
+# URL patterns (Network.setBlockedURLs wildcards) per resource class; none of
+# them is read by the extractors, which only look at the DOM
+RESOURCE_PATTERNS = {
+    "images": _extensions("jpg", "jpeg", "png", "gif", "webp", "avif", "ico") + ["*media.licdn.com/dms/image/*"],
+    "fonts": _extensions("woff", "woff2", "ttf", "otf", "eot"),
+    "media": _extensions("mp4", "webm", "m3u8", "mp3") + ["*media.licdn.com/dms/playlist/*"],
+    "trackers": [
+        "*px.ads.linkedin.com/*", "*/li/track*", "*/sensorCollect*", "*snap.licdn.com/*",
+        "*doubleclick.net/*", "*google-analytics.com/*", "*googletagmanager.com/*", "*connect.facebook.net/*",
+    ],
+}
+
+# LinkedIn pages make more requests than the default buffer of 250 resource timings holds
+BUFFER_SCRIPT = "performance.setResourceTimingBufferSize(5000);"
+
+# Bytes transferred and network time of the current page, from the Performance API.
+# Cross-origin responses without Timing-Allow-Origin report a transferSize of 0.
+PAGE_COST_SCRIPT = """
+var navigation = performance.getEntriesByType('navigation')[0] || {};
+var resources = performance.getEntriesByType('resource');
+var bytes = navigation.transferSize || 0, end = navigation.loadEventEnd || 0;
+resources.forEach(function (entry) {
+    bytes += entry.transferSize || 0;
+    end = Math.max(end, entry.responseEnd);
+});
+return {bytes: bytes, requests: resources.length + 1, ms: end};
+"""
+
+
+def blocked_patterns(classes):
+    """
+    URL patterns blocking the given resource classes (see RESOURCE_PATTERNS).
+    """
+    unknown = set(classes) - set(RESOURCE_PATTERNS)
+    if unknown:
+        raise ValueError(f"Unknown resource classes {sorted(unknown)}, expected some of {sorted(RESOURCE_PATTERNS)}.")
+    return [pattern for name in classes for pattern in RESOURCE_PATTERNS[name]]
+
+
+class ResourceBlocker:
+    """
+    Blocks resource classes the extractors never read (images, fonts, media,
+    trackers) in the tabs of a Chrome driver, and reports what a page costs.
+
+    Blocking is set per tab through the DevTools Network domain, so every tab that
+    navigates must call before_visit() first. Every baseline_every-th visit is
+    made without blocking; comparing those pages with the blocked ones gives the
+    bytes and milliseconds saved per page.
+    """
+
+    def __init__(self, driver, classes, baseline_every=25):
+        self.driver = driver
+        self.classes = list(classes)
+        self.patterns = blocked_patterns(self.classes)
+        self.baseline_every = baseline_every
+        self.visits = 0
+        self.totals = {True: [0, 0, 0.0], False: [0, 0, 0.0]}  # blocking -> [pages, bytes, ms]
+        self._blocking = {}  # window handle -> whether blocking is on in that tab
+
+    def _set(self, blocking):
+        handle = self.driver.current_window_handle
+        if self._blocking.get(handle) == blocking:
+            return
+        if handle not in self._blocking:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": BUFFER_SCRIPT})
+        self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns if blocking else []})
+        self._blocking[handle] = blocking
+
+    def before_visit(self):
+        """
+        Configure the current tab for the navigation about to start in it.
+        """
+        self.visits += 1
+        baseline = self.baseline_every and self.visits % self.baseline_every == 0
+        self._set(not baseline)
+
+    def after_load(self, url=None):
+        """
+        Record the bytes and network time of the page loaded in the current tab.
+
+        Returns:
+            The page cost (bytes, requests, ms), or None if it could not be read.
+        """
+        blocking = self._blocking.get(self.driver.current_window_handle, False)
+        try:
+            cost = self.driver.execute_script(PAGE_COST_SCRIPT)
+        except Exception as e:
+            logging.warning(f"Could not read the page cost of {url}: {e}")
+            return None
+
+        label = "on" if blocking else "off"
+        PAGE_BYTES.observe(cost["bytes"], blocking=label)
+        PAGE_NETWORK_SECONDS.observe(cost["ms"] / 1000, blocking=label)
+        totals = self.totals[blocking]
+        totals[0] += 1
+        totals[1] += cost["bytes"]
+        totals[2] += cost["ms"]
+
+        message = (f"Page {url} transferred {cost['bytes'] / 1024:.0f} KB in {cost['requests']} requests "
+                   f"over {cost['ms']:.0f} ms (blocking {label})")
+        saved = self.savings()
+        if saved:
+            message += f"; blocking saves ~{saved[0] / 1024:.0f} KB and ~{saved[1]:.0f} ms per page"
+        logging.info(message + ".")
+        return cost
+
+    def savings(self):
+        """
+        Mean bytes and milliseconds saved per page by blocking, or None until
+        both blocked and baseline pages have been measured.
+        """
+        blocked, baseline = self.totals[True], self.totals[False]
+        if not blocked[0] or not baseline[0]:
+            return None
+        return (baseline[1] / baseline[0] - blocked[1] / blocked[0],
+                baseline[2] / baseline[0] - blocked[2] / blocked[0])
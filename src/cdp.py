@@ -0,0 +1,483 @@
+import json
+import time
+import asyncio
+import logging
+import itertools
+import urllib.request
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+from src.config import get_config
+from src.helper import SCROLL_SCRIPT
+from src.blocking import blocked_patterns
+from src.snapshot import SnapshotPage
+from src.scrape import extract_sections, probe_sections
+from src.crawler import record_profile, queue_discovered, skip_visited
+from src.session import ORIGIN_URL, PROBE_SCRIPT, WRITE_STORAGE_SCRIPT
+from src.urls import canonical_profile_url
+from src.metrics import PAGE_LOAD_SECONDS, SCROLL_SECONDS, PROFILE_SECONDS, PROFILES, SESSIONS
+
+
+# Rendered page and its final URL (after redirects), fetched in one evaluation
+PAGE_EXPRESSION = "({url: location.href, html: document.documentElement.outerHTML})"
+
+# Scripts written for execute_async_script (SCROLL_SCRIPT, the session probe) are wrapped in a
+# promise for Runtime.evaluate: the script and a JSON array of its arguments go in
+ASYNC_EXPRESSION = "new Promise(function (resolve) { (function () {%s}).apply(null, %s.concat([resolve])); })"
+SESSION_PROBE_EXPRESSION = ASYNC_EXPRESSION % (PROBE_SCRIPT, "[]")
+
+
+class CDPError(Exception):
+    """
+    A DevTools command failed, timed out, or the connection was lost.
+    """
+
+
+class CDPConnection:
+    """
+    One DevTools websocket shared by every tab of a browser.
+
+    Commands are matched to their responses by id, so any number of them can be
+    in flight at once; tabs are addressed through their flattened session id.
+    Events are delivered to whoever is waiting for them (see expect()).
+    """
+
+    def __init__(self, websocket):
+        self._websocket = websocket
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._waiters = {}
+        self._reader = asyncio.get_running_loop().create_task(self._read())
+
+    @classmethod
+    async def open(cls, websocket_url):
+        # Rendered pages are far larger than the websockets default frame limit
+        return cls(await connect(websocket_url, max_size=None, ping_interval=None))
+
+    async def _read(self):
+        try:
+            async for raw in self._websocket:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(f"{message['error'].get('message')} ({message['error'].get('code')})"))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    for future in self._waiters.pop((message.get("sessionId"), message.get("method")), []):
+                        if not future.done():
+                            future.set_result(message.get("params", {}))
+        except ConnectionClosed:
+            pass
+        finally:
+            # Nothing will answer anymore; fail every caller still waiting
+            for future in list(self._pending.values()) + [f for fs in self._waiters.values() for f in fs]:
+                if not future.done():
+                    future.set_exception(CDPError("DevTools connection closed."))
+            self._pending.clear()
+            self._waiters.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        """
+        Send a command and wait for its result.
+
+        Args:
+            method: DevTools method, e.g. "Page.navigate".
+            params: Command parameters.
+            session_id: Tab session to address, None for the browser itself.
+            timeout: Seconds to wait for the response.
+
+        Returns:
+            The result object of the response.
+        """
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self._websocket.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise CDPError(f"{method} timed out after {timeout}s.")
+        except ConnectionClosed:
+            raise CDPError("DevTools connection closed.")
+        finally:
+            self._pending.pop(message_id, None)
+
+    def expect(self, method, session_id=None):
+        """
+        Return a future resolved with the params of the next `method` event of a session.
+        Call it before sending the command that triggers the event.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault((session_id, method), []).append(future)
+        return future
+
+    async def close(self):
+        await self._websocket.close()
+        await self._reader
+
+
+class CDPTab:
+    """
+    One browser tab driven over DevTools, with the primitives scrape_profile needs:
+    navigation, JavaScript evaluation, scrolling and a parsed snapshot of the DOM.
+    """
+
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.current_url = None
+
+    async def send(self, method, params=None, timeout=30):
+        return await self.connection.send(method, params, session_id=self.session_id, timeout=timeout)
+
+    async def navigate(self, url, timeout=30):
+        """
+        Load a URL and wait for its load event.
+        """
+        loaded = self.connection.expect("Page.loadEventFired", self.session_id)
+        try:
+            result = await self.send("Page.navigate", {"url": url}, timeout=timeout)
+            if result.get("errorText"):
+                raise CDPError(f"Navigation to {url} failed: {result['errorText']}")
+            await asyncio.wait_for(loaded, timeout)
+        except asyncio.TimeoutError:
+            raise CDPError(f"{url} did not finish loading within {timeout}s.")
+        finally:
+            loaded.cancel()
+        self.current_url = url
+
+    async def evaluate(self, expression, await_promise=False, timeout=30):
+        """
+        Evaluate a JavaScript expression in the page and return its value.
+        """
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": await_promise,
+        }, timeout=timeout)
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(f"Script failed: {details.get('exception', {}).get('description') or details.get('text')}")
+        return result.get("result", {}).get("value")
+
+    async def scroll_and_load(self, quiet_time=None, max_wait=None, max_scrolls=None):
+        """
+        Scroll until lazily loaded content stops arriving, see helper.scroll_and_load.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        quiet_time = get_config().scroll_quiet if quiet_time is None else quiet_time
+        max_wait = get_config().scroll_max_wait if max_wait is None else max_wait
+        start = time.perf_counter()
+        arguments = json.dumps([int(quiet_time * 1000), int(max_wait * 1000), max_scrolls])
+        try:
+            result = await self.evaluate(ASYNC_EXPRESSION % (SCROLL_SCRIPT, arguments),
+                                         await_promise=True, timeout=max_wait + 5) or {}
+            if result.get("capped"):
+                logging.info(f"Page still changing after {max_wait}s, continuing with what has loaded.")
+        except CDPError as e:
+            logging.warning(f"Scrolling the page failed: {e}")
+        return time.perf_counter() - start
+
+    async def block(self, patterns):
+        """
+        Stop the tab from loading URLs matching any of the patterns (see src/blocking.py).
+        """
+        await self.send("Network.enable")
+        await self.send("Network.setBlockedURLs", {"urls": list(patterns)})
+
+    async def snapshot(self):
+        """
+        Capture the DOM in one evaluation and parse it (off the event loop) into a SnapshotPage.
+        """
+        page = await self.evaluate(PAGE_EXPRESSION)
+        self.current_url = page["url"]
+        return await asyncio.to_thread(SnapshotPage, page["html"], page["url"])
+
+    async def close(self):
+        try:
+            await self.connection.send("Target.closeTarget", {"targetId": self.target_id})
+        except CDPError as e:
+            logging.warning(f"Could not close tab {self.target_id}: {e}")
+
+
+class CDPBrowser:
+    """
+    A Chrome instance with remote debugging enabled (see helper.start_chrome_with_debug),
+    driven directly over the DevTools protocol from asyncio. Any number of tabs
+    can load and be evaluated concurrently over its single websocket.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=9222, timeout=10):
+        """
+        Attach to the browser whose debugger listens on host:port.
+        """
+        def websocket_url():
+            with urllib.request.urlopen(f"http://{host}:{port}/json/version", timeout=timeout) as response:
+                return json.load(response)["webSocketDebuggerUrl"]
+
+        url = await asyncio.to_thread(websocket_url)
+        logging.info(f"Connected to DevTools at {url}")
+        return cls(await CDPConnection.open(url))
+
+    async def new_tab(self, url="about:blank"):
+        """
+        Open a tab and attach to it.
+        """
+        target = await self.connection.send("Target.createTarget", {"url": url})
+        attached = await self.connection.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        tab = CDPTab(self.connection, target["targetId"], attached["sessionId"])
+        await tab.send("Page.enable")
+        return tab
+
+    async def close(self):
+        await self.connection.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+async def scrape_profile_cdp(tab, profile_url, archive=None):
+    """
+    Load a profile in a tab and extract it from a snapshot of the rendered page.
+
+    Args:
+        tab: CDPTab to load the profile in.
+        profile_url: URL of the LinkedIn profile to scrape.
+        archive: Optional PageArchive receiving the rendered page.
+
+    Returns:
+        (profile_data, page): the extracted sections, or None if the page had no
+        intro, and the SnapshotPage they were extracted from.
+    """
+    logging.info(f"Scraping profile: {profile_url}")
+    with PAGE_LOAD_SECONDS.time():
+        await tab.navigate(profile_url)
+    with SCROLL_SECONDS.time():
+        await tab.scroll_and_load()
+    page = await tab.snapshot()
+
+    if archive is not None:
+        try:
+            await asyncio.to_thread(archive.put, canonical_profile_url(profile_url) or profile_url, page.page_source)
+        except Exception as e:
+            logging.error(f"Failed to archive page of {profile_url}: {e}")
+
+    profile_data = await asyncio.to_thread(lambda: extract_sections(page, probe_sections(page)))
+    if not profile_data["intro"]:
+        logging.warning(f"No intro found for {profile_url}.")
+        return None, page
+    return profile_data, page
+
+
+async def crawl_profile_cdp(tab, profile_url, state, sink, archive=None, graph=None, executor=None):
+    """
+    Async counterpart of crawler.crawl_profile: scrape one claimed profile in a
+    tab, save it, and queue the profiles discovered on its page if it scraped.
+    Returns True, None or False like crawl_profile.
+
+    The crawl state, sink and graph are synchronous (SQLite, files), so they are
+    called on executor (the default thread pool if None), never on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    if await loop.run_in_executor(executor, skip_visited, profile_url, state):
+        return None
+    start = time.perf_counter()
+    depth = await loop.run_in_executor(executor, state.depth_of, profile_url)
+    profile_info, page = await scrape_profile_cdp(tab, profile_url, archive=archive)
+    if not await loop.run_in_executor(executor, record_profile, profile_url, profile_info, state, sink):
+        return False
+    PROFILE_SECONDS.observe(time.perf_counter() - start)
+    await loop.run_in_executor(executor, partial(queue_discovered, page, profile_url, depth, state, graph=graph))
+    return True
+
+
+async def crawl_with_tabs(browser, state, sink, tabs=4, pace=None, archive=None, block_resources=(), idle_poll=1.0,
+                          graph=None):
+    """
+    Crawl the frontier with several tabs of one browser, all driven from the
+    current event loop.
+
+    Args:
+        browser: Connected CDPBrowser.
+        state: CrawlState holding the frontier and visited set.
+        sink: Output sink with a write(record) method.
+        tabs: Tabs loading profiles concurrently.
+        pace: Optional blocking callable invoked before every profile visit
+            (rate limiting); it runs on a worker thread.
+        archive: Optional PageArchive keeping the rendered pages.
+        block_resources: Resource classes the tabs do not load, e.g. ("images", "fonts").
+        idle_poll: Seconds an idle tab waits before checking the frontier again.
+        graph: Optional GraphStore recording the links found on every page.
+
+    Returns:
+        A summary with the elapsed time, profiles per second and per-tab stats.
+    """
+    start = time.perf_counter()
+    patterns = blocked_patterns(block_resources)
+    stats = [{"tab": i, "scraped": 0, "failed": 0} for i in range(tabs)]
+    busy = 0
+
+    # One thread runs every crawl state call, in order, so SQLite never blocks the tabs
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cdp-state")
+    loop = asyncio.get_running_loop()
+
+    async def claim():
+        # The frontier only runs dry once no tab (or other node) is still scraping and discovering
+        nonlocal busy
+        while True:
+            profile_url = await loop.run_in_executor(executor, state.pop)
+            if profile_url is not None:
+                busy += 1
+                return profile_url
+            if busy == 0 and not await loop.run_in_executor(executor, state.pending_count):
+                return None
+            await asyncio.sleep(idle_poll)
+
+    async def work(index):
+        nonlocal busy
+        tab = await browser.new_tab()
+        try:
+            if patterns:
+                await tab.block(patterns)
+            while True:
+                # Pace before claiming, so a profile is never held while waiting for the budget
+                if pace:
+                    await asyncio.to_thread(pace)
+                profile_url = await claim()
+                if profile_url is None:
+                    break
+                try:
+                    scraped = await crawl_profile_cdp(tab, profile_url, state, sink, archive=archive, graph=graph,
+                                                      executor=executor)
+                    if scraped:
+                        stats[index]["scraped"] += 1
+                    elif scraped is False:
+                        stats[index]["failed"] += 1
+                except Exception as e:
+                    await loop.run_in_executor(executor, state.mark_failed, profile_url, str(e))
+                    PROFILES.inc(outcome="failed")
+                    stats[index]["failed"] += 1
+                    logging.error(f"Tab {index}: error while scraping profile {profile_url}: {e}")
+                finally:
+                    busy -= 1
+        finally:
+            await tab.close()
+            logging.info(f"Tab {index} stopped: {stats[index]['scraped']} scraped, {stats[index]['failed']} failed.")
+
+    try:
+        await asyncio.gather(*(work(i) for i in range(tabs)))
+    finally:
+        executor.shutdown(wait=True)
+
+    elapsed = time.perf_counter() - start
+    scraped = sum(tab_stats["scraped"] for tab_stats in stats)
+    summary = {
+        "tabs": tabs,
+        "scraped": scraped,
+        "failed": sum(tab_stats["failed"] for tab_stats in stats),
+        "elapsed": elapsed,
+        "profiles_per_second": scraped / elapsed if elapsed > 0 else 0.0,
+        "per_tab": stats,
+    }
+    logging.info(f"Crawl finished: {scraped} profiles with {tabs} tabs "
+                 f"in {elapsed:.1f}s ({summary['profiles_per_second']:.3f} profiles/s).")
+    return summary
+
+
+def cdp_cookie(cookie):
+    """
+    Convert a cookie as saved by Selenium (see SessionManager.save) into a DevTools CookieParam.
+    """
+    converted = {key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly") if key in cookie}
+    if cookie.get("expiry"):
+        converted["expires"] = cookie["expiry"]
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        converted["sameSite"] = cookie["sameSite"]
+    return converted
+
+
+async def probe_session(tab, timeout=10):
+    """
+    Check whether the tab, on a LinkedIn page, is logged in (see SessionManager.probe).
+    """
+    try:
+        status = await tab.evaluate(SESSION_PROBE_EXPRESSION, await_promise=True, timeout=timeout)
+    except CDPError as e:
+        logging.warning(f"Session probe failed: {e}")
+        return False
+    logging.info(f"Session probe answered {status}.")
+    return status == 200
+
+
+async def restore_session(browser, sessions):
+    """
+    Make sure the browser is logged in before crawling: keep its own session if it
+    is valid, otherwise load the cookies and localStorage saved in the
+    SessionManager's file. The interactive login needs Selenium, so a browser
+    that is still logged out is left to the caller.
+
+    Returns:
+        How the session was obtained ("existing", "restored"), or None.
+    """
+    tab = await browser.new_tab()
+    outcome = None
+    try:
+        await tab.navigate(ORIGIN_URL)
+        if await probe_session(tab, sessions.probe_timeout):
+            outcome = "existing"
+        else:
+            session = await asyncio.to_thread(sessions.load)
+            if session:
+                now = time.time()
+                cookies = [cdp_cookie(cookie) for cookie in session["cookies"]
+                           if not cookie.get("expiry") or cookie["expiry"] >= now]
+                await browser.connection.send("Storage.setCookies", {"cookies": cookies})
+                await tab.evaluate(f"(function () {{ {WRITE_STORAGE_SCRIPT} }}).apply(null, "
+                                   f"[{json.dumps(session.get('local_storage') or {})}])")
+                logging.info(f"Restored {len(cookies)} cookies from the session saved "
+                             f"{(now - session['saved_at']) / 3600:.1f}h ago.")
+                if await probe_session(tab, sessions.probe_timeout):
+                    outcome = "restored"
+    finally:
+        await tab.close()
+
+    SESSIONS.inc(outcome=outcome or "failed")
+    if outcome:
+        logging.info(f"Session ready ({outcome}).")
+    return outcome
+
+
+def run_crawl(state, sink, port=9222, host="127.0.0.1", tabs=4, pace=None, archive=None, block_resources=(),
+              graph=None, sessions=None):
+    """
+    Connect to the browser on host:port and crawl with crawl_with_tabs until the frontier is empty.
+    With a SessionManager the browser is first warm-started from its saved session;
+    RuntimeError is raised if it cannot be logged in that way.
+    """
+    async def crawl():
+        async with await CDPBrowser.connect(host, port) as browser:
+            if sessions and await restore_session(browser, sessions) is None:
+                raise RuntimeError(f"Browser could not be logged in from {sessions.file_path}; "
+                                   "log in once with BROWSER_DRIVER=selenium to save a session.")
+            return await crawl_with_tabs(browser, state, sink, tabs=tabs, pace=pace, archive=archive,
+                                         block_resources=block_resources, graph=graph)
+
+    return asyncio.run(crawl())
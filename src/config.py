@@ -0,0 +1,195 @@
+import os
+import logging
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from dotenv import dotenv_values
+
+
+ENV_PATH = "./environment/.env"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+EXTRACTION_ENGINES = ("snapshot", "script", "selenium")
+BROWSER_DRIVERS = ("selenium", "cdp")
+
+
+class ConfigError(ValueError):
+    """
+    A setting is missing or has a value that cannot be used.
+    """
+
+
+def _text(value):
+    return value
+
+
+def _bool(value):
+    lowered = value.strip().lower()
+    if lowered in ("true", "1", "yes", "on"):
+        return True
+    if lowered in ("false", "0", "no", "off"):
+        return False
+    raise ValueError("expected true or false")
+
+
+def _names(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _ports(value):
+    return [int(port) for port in _names(value)]
+
+
+def setting(env, parse=_text, default=None):
+    """
+    Declare a Config field read from the environment variable env and parsed with parse.
+    An unset or empty variable leaves the default.
+    """
+    return field(default=default, metadata={"env": env, "parse": parse})
+
+
+@dataclass(frozen=True)
+class Config:
+    """
+    Scraper settings, read from environment/.env and the process environment
+    (which takes precedence). See the README for what every variable does.
+    """
+
+    # Account and selectors
+    email: str = setting("EMAIL")
+    password: str = setting("PASSWORD")
+    timeout: int = setting("TIMEOUT", int, 10)
+    tries: int = setting("TRIES", int, 3)
+    delay: float = setting("DELAY", float, 2.0)
+    scroll_quiet: float = setting("SCROLL_QUIET", float, 0.5)
+    scroll_max_wait: float = setting("SCROLL_MAX_WAIT", float, 10.0)
+    selector_stats: str = setting("SELECTOR_STATS")
+    extraction_engine: str = setting("EXTRACTION_ENGINE", default="snapshot")
+
+    # Crawl state and output
+    root: str = setting("ROOT")
+    db_path: str = setting("DB_PATH")
+    output_path: str = setting("OUTPUT_PATH", default="./data/scraped_profiles.jsonl")
+    max_attempts: int = setting("MAX_ATTEMPTS", int, 3)
+    visited_capacity: int = setting("VISITED_CAPACITY", int, 10_000_000)
+    priority_rules: str = setting("PRIORITY_RULES")
+    refresh_ttl_hours: float = setting("REFRESH_TTL_HOURS", float)
+    archive_dir: str = setting("ARCHIVE_DIR")
+    graph_db: str = setting("GRAPH_DB")
+    session_file: str = setting("SESSION_FILE")
+
+    # Sharded crawl
+    coordinator_db: str = setting("COORDINATOR_DB")
+    node_id: str = setting("NODE_ID")
+    lease_seconds: float = setting("LEASE_SECONDS", float, 600.0)
+    heartbeat_ttl: float = setting("HEARTBEAT_TTL", float, 60.0)
+
+    # MongoDB
+    mongo_uri: str = setting("MONGO_URI", default="mongodb://localhost:27017/")
+    mongo_db: str = setting("MONGO_DB")
+    mongo_collection: str = setting("MONGO_COLLECTION")
+    mongo_sink: bool = setting("MONGO_SINK", _bool, False)
+    mongo_batch_size: int = setting("MONGO_BATCH_SIZE", int, 50)
+    mongo_flush_interval: float = setting("MONGO_FLUSH_INTERVAL", float, 5.0)
+    mongo_max_buffered: int = setting("MONGO_MAX_BUFFERED", int, 10_000)
+    mongo_spill_file: str = setting("MONGO_SPILL_FILE")
+
+    # Pacing
+    rate_per_hour: float = setting("RATE_PER_HOUR", float, 25.0)
+    burst: int = setting("BURST", int, 3)
+    daily_budget: int = setting("DAILY_BUDGET", int)
+    min_interval: float = setting("MIN_INTERVAL", float, 20.0)
+    jitter: float = setting("JITTER", float, 0.5)
+
+    # Browsers
+    debug_ports: list = setting("DEBUG_PORTS", _ports, (9222,))
+    launch_chrome: bool = setting("LAUNCH_CHROME", _bool, False)
+    chrome_binary: str = setting("CHROME_BINARY", default="google-chrome")
+    chrome_profile_dir: str = setting("CHROME_PROFILE_DIR", default="./data/chrome")
+    browser_driver: str = setting("BROWSER_DRIVER", default="selenium")
+    cdp_tabs: int = setting("CDP_TABS", int, 4)
+    prefetch: bool = setting("PREFETCH", _bool, False)
+    block_resources: list = setting("BLOCK_RESOURCES", _names, ())
+    block_baseline_every: int = setting("BLOCK_BASELINE_EVERY", int, 25)
+
+    # Metrics and logging
+    metrics_port: int = setting("METRICS_PORT", int)
+    metrics_file: str = setting("METRICS_FILE")
+    metrics_interval: float = setting("METRICS_INTERVAL", float, 15.0)
+    log_file: str = setting("LOG_FILE", default="./log/scraping.log")
+
+    @classmethod
+    def from_env(cls, env):
+        """
+        Build and validate a Config from a mapping of environment variables.
+        Raises ConfigError naming the variable of the first bad value.
+        """
+        values = {}
+        for config_field in fields(cls):
+            name, parse = config_field.metadata["env"], config_field.metadata["parse"]
+            raw = env.get(name)
+            if raw is None or not raw.strip():
+                continue
+            try:
+                values[config_field.name] = parse(raw.strip())
+            except ValueError as e:
+                kind = {int: "an integer", float: "a number"}.get(parse)
+                raise ConfigError(f"{name} must be {kind}, got {raw!r}." if kind else f"{name}={raw!r}: {e}.") from None
+        config = cls(**values)
+        config.validate()
+        return config
+
+    def validate(self):
+        """
+        Check values that parse but cannot be used.
+        """
+        if self.extraction_engine not in EXTRACTION_ENGINES:
+            raise ConfigError(f"EXTRACTION_ENGINE must be one of {', '.join(EXTRACTION_ENGINES)}, got {self.extraction_engine!r}.")
+        if self.browser_driver not in BROWSER_DRIVERS:
+            raise ConfigError(f"BROWSER_DRIVER must be one of {', '.join(BROWSER_DRIVERS)}, got {self.browser_driver!r}.")
+        for name, value, minimum in (("TIMEOUT", self.timeout, 0), ("TRIES", self.tries, 1), ("DELAY", self.delay, 0),
+                                     ("MAX_ATTEMPTS", self.max_attempts, 1), ("CDP_TABS", self.cdp_tabs, 1),
+                                     ("MONGO_BATCH_SIZE", self.mongo_batch_size, 1), ("BURST", self.burst, 1),
+                                     ("MONGO_MAX_BUFFERED", self.mongo_max_buffered, 1),
+                                     ("BLOCK_BASELINE_EVERY", self.block_baseline_every, 0)):
+            if value < minimum:
+                raise ConfigError(f"{name} must be at least {minimum}, got {value}.")
+        for name, value in (("RATE_PER_HOUR", self.rate_per_hour), ("LEASE_SECONDS", self.lease_seconds),
+                            ("HEARTBEAT_TTL", self.heartbeat_ttl)):
+            if value <= 0:
+                raise ConfigError(f"{name} must be positive, got {value}.")
+        if not self.debug_ports:
+            raise ConfigError("DEBUG_PORTS must list at least one port.")
+        from src.blocking import RESOURCE_PATTERNS
+        unknown = sorted(set(self.block_resources) - set(RESOURCE_PATTERNS))
+        if unknown:
+            raise ConfigError(f"BLOCK_RESOURCES has unknown classes {unknown}, expected some of {sorted(RESOURCE_PATTERNS)}.")
+
+    def require(self, *names):
+        """
+        Raise ConfigError unless the given settings (field names) are set.
+        """
+        missing = [config_field.metadata["env"] for config_field in fields(self)
+                   if config_field.name in names and getattr(self, config_field.name) in (None, "")]
+        if missing:
+            raise ConfigError(f"{', '.join(missing)} must be set in {ENV_PATH} or the environment.")
+
+
+@lru_cache(maxsize=None)
+def get_config(env_path=ENV_PATH):
+    """
+    Load the configuration once; later calls return the same Config.
+    """
+    env = {**dotenv_values(env_path), **os.environ} if os.path.exists(env_path) else dict(os.environ)
+    return Config.from_env(env)
+
+
+def setup_logging(log_file=None, level=logging.INFO):
+    """
+    Send log records to log_file, or to the console if it is None.
+    """
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        handler = logging.FileHandler(log_file)
+    else:
+        handler = logging.StreamHandler()
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=[handler])
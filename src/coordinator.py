@@ -0,0 +1,509 @@
+import os
+import time
+import socket
+import bisect
+import hashlib
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from src.metrics import LEASES
+from src.priority import PriorityRules
+from src.urls import canonical_profile_url
+
+
+# Ring points are the first 63 bits of a SHA-1, so they fit a signed SQLite INTEGER
+MAX_POINT = (1 << 63) - 1
+
+
+def ring_point(key):
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "big") >> 1
+
+
+def default_node_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class HashRing:
+    """
+    Consistent hashing of profile URLs onto nodes.
+
+    Every node is placed on the ring at `replicas` points; a URL belongs to the
+    first node point at or after its own point, wrapping around. When a node
+    joins or leaves, only the URLs on its arcs change owner.
+    """
+
+    def __init__(self, nodes, replicas=64):
+        self.nodes = sorted(set(nodes))
+        self._ring = sorted((ring_point(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas))
+        self._points = [point for point, _ in self._ring]
+
+    def owner(self, url):
+        """
+        Node owning url (a canonical profile URL), or None if the ring is empty.
+        """
+        if not self._ring:
+            return None
+        index = bisect.bisect_left(self._points, ring_point(url)) % len(self._ring)
+        return self._ring[index][1]
+
+    def arcs(self, node):
+        """
+        Point ranges (lo, hi] owned by node, with neighbouring arcs merged.
+        """
+        arcs = []
+        for index, (point, owner) in enumerate(self._ring):
+            if owner != node:
+                continue
+            if index == 0:
+                # The first point also owns the wrap-around from the last one
+                if self._ring[-1][0] < MAX_POINT:
+                    arcs.append((self._ring[-1][0], MAX_POINT))
+                arcs.append((-1, point))
+            elif arcs and arcs[-1][1] == self._points[index - 1]:
+                arcs[-1] = (arcs[-1][0], point)
+            else:
+                arcs.append((self._points[index - 1], point))
+        return sorted(arcs)
+
+
+class Coordinator:
+    """
+    Shares one frontier between scraper nodes on different machines, through a
+    SQLite file they can all reach (a network share, or a local file when
+    several nodes run on one host).
+
+    Tables:
+        nodes:    every node with its last heartbeat; a node is live while its
+                  heartbeat is younger than heartbeat_ttl.
+        frontier: profiles still to scrape, with their ring point, priority score
+                  and the lease (owner and expiry) of the node scraping them.
+        refs:     distinct (referrer, profile) links behind the frontier's reference counts.
+        done:     profiles finished by any node, scraped or given up on.
+
+    Profile URLs are sharded over the live nodes with a HashRing, so a node only
+    claims profiles on its own arcs; links a node discovers are routed to their
+    owner simply by storing them with their ring point. A claim is a lease that
+    expires after lease_seconds unless renewed; the heartbeat thread renews this
+    node's leases while it works on them. Leases held by a node whose heartbeat
+    has stopped are reclaimed at once by the node now owning the profile.
+
+    Every node must use the same priority rules, since scores are computed by the
+    node that queues a profile.
+    """
+
+    def __init__(self, db_path, node_id=None, lease_seconds=600, heartbeat_ttl=60, max_attempts=3, rules=None,
+                 replicas=64):
+        self.db_path = db_path
+        self.node_id = node_id or default_node_id()
+        self.lease_seconds = lease_seconds
+        self.heartbeat_ttl = heartbeat_ttl
+        self.max_attempts = max_attempts
+        self.rules = rules or PriorityRules()
+        self.replicas = replicas
+        self._lock = threading.RLock()
+        self._ring = None
+        self._ring_nodes = None
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
+
+        # Autocommit: every change has to be visible to the other nodes right away
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._transaction() as cursor:
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS nodes (
+                node_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                heartbeat_at REAL NOT NULL
+            ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                point INTEGER NOT NULL,
+                depth INTEGER NOT NULL DEFAULT 0,
+                refs INTEGER NOT NULL DEFAULT 0,
+                boost REAL NOT NULL DEFAULT 0,
+                penalty REAL NOT NULL DEFAULT 0,
+                score REAL NOT NULL DEFAULT 0,
+                context TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                added_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL
+            ) WITHOUT ROWID
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS frontier_priority ON frontier (score DESC, added_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS frontier_lease ON frontier (lease_owner)")
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS refs (
+                url TEXT NOT NULL,
+                referrer TEXT NOT NULL,
+                PRIMARY KEY (url, referrer)
+            ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS done (
+                url TEXT PRIMARY KEY,
+                node_id TEXT NOT NULL,
+                outcome TEXT NOT NULL,
+                finished_at REAL NOT NULL
+            ) WITHOUT ROWID
+            ''')
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            # Take the write lock up front, so a read-then-update is atomic across nodes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn.cursor()
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def heartbeat(self):
+        """
+        Record that this node is alive and renew the leases it holds, so a profile
+        is never taken over while this node is still working on it.
+        """
+        now = time.time()
+        with self._transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO nodes (node_id, started_at, heartbeat_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(node_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+                (self.node_id, now, now)
+            )
+            cursor.execute("UPDATE frontier SET lease_expires = ? WHERE lease_owner = ?",
+                           (now + self.lease_seconds, self.node_id))
+
+    def _heartbeat_loop(self):
+        # Often enough to stay live and to renew leases well before they run out
+        while not self._stop.wait(min(self.heartbeat_ttl, self.lease_seconds) / 3):
+            try:
+                self.heartbeat()
+            except sqlite3.Error as e:
+                logging.warning(f"Node {self.node_id}: heartbeat failed: {e}")
+
+    def join(self):
+        """
+        Register this node, release leases a previous run under the same id left
+        behind, and keep the heartbeat going from a background thread.
+        """
+        self.heartbeat()
+        with self._transaction() as cursor:
+            released = cursor.execute("UPDATE frontier SET lease_owner = NULL, lease_expires = NULL WHERE lease_owner = ?",
+                                      (self.node_id,)).rowcount
+        if released:
+            logging.info(f"Node {self.node_id}: released {released} leases left by a previous run.")
+        self._stop.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+        logging.info(f"Node {self.node_id} joined the crawl with {len(self.live_nodes())} live node(s).")
+
+    def leave(self):
+        """
+        Stop the heartbeat, give back this node's leases and deregister it, so its
+        shard moves to the other nodes immediately.
+        """
+        self._stop.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+        with self._transaction() as cursor:
+            cursor.execute("UPDATE frontier SET lease_owner = NULL, lease_expires = NULL WHERE lease_owner = ?", (self.node_id,))
+            cursor.execute("DELETE FROM nodes WHERE node_id = ?", (self.node_id,))
+        logging.info(f"Node {self.node_id} left the crawl.")
+
+    def close(self):
+        self.leave()
+        self.conn.close()
+
+    def live_nodes(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT node_id FROM nodes WHERE heartbeat_at >= ? ORDER BY node_id",
+                                     (time.time() - self.heartbeat_ttl,)).fetchall()
+        return [row[0] for row in rows]
+
+    def ring(self):
+        """
+        HashRing over the live nodes; rebuilt only when membership changes.
+        """
+        nodes = self.live_nodes()
+        if nodes != self._ring_nodes:
+            if self._ring_nodes is not None:
+                logging.info(f"Node {self.node_id}: membership changed to {nodes}, resharding.")
+            self._ring, self._ring_nodes = HashRing(nodes, self.replicas), nodes
+        return self._ring
+
+    def owner(self, url):
+        """
+        Live node whose shard url belongs to.
+        """
+        return self.ring().owner(canonical_profile_url(url) or url)
+
+    def push(self, links, depth=0, referrer=None):
+        """
+        Queue profiles for whichever node owns them, skipping finished ones. Takes
+        the same arguments as CrawlState.push, and profiles already queued likewise
+        keep their smallest depth and gain the new boost, and a reference only
+        from a referrer that has not linked to them before.
+
+        Returns the number of profiles added.
+        """
+        now = time.time()
+        added = 0
+        referrer = canonical_profile_url(referrer) if referrer else None
+        with self._transaction() as cursor:
+            for link in links:
+                url, text = link if isinstance(link, tuple) else (link, None)
+                url = canonical_profile_url(url)
+                if url is None or url == referrer:
+                    continue
+                if cursor.execute("SELECT 1 FROM done WHERE url = ?", (url,)).fetchone():
+                    continue
+
+                references = 0
+                if referrer:
+                    references = cursor.execute("INSERT OR IGNORE INTO refs (url, referrer) VALUES (?, ?)",
+                                                (url, referrer)).rowcount
+                boost = self.rules.boost(text)
+                row = cursor.execute("SELECT depth, refs, boost, penalty, context FROM frontier WHERE url = ?", (url,)).fetchone()
+                if row is None:
+                    cursor.execute(
+                        "INSERT INTO frontier (url, point, depth, refs, boost, score, context, added_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (url, ring_point(url), depth, references, boost, self.rules.score(depth, references, boost), text, now)
+                    )
+                    added += 1
+                else:
+                    old_depth, old_references, old_boost, penalty, context = row
+                    new_depth, references, boost = min(old_depth, depth), old_references + references, max(old_boost, boost)
+                    cursor.execute(
+                        "UPDATE frontier SET depth = ?, refs = ?, boost = ?, score = ?, context = ? WHERE url = ?",
+                        (new_depth, references, boost, self.rules.score(new_depth, references, boost) - penalty, text or context, url)
+                    )
+        return added
+
+    def claim(self):
+        """
+        Lease the highest-scoring profile of this node's shard that nobody holds a
+        valid lease on. Leases of other nodes that expired, or whose owner is no
+        longer live, are taken over; a profile this node holds is never handed out
+        again before release, complete or fail.
+
+        Returns:
+            The profile URL, or None if nothing in this shard can be claimed now.
+        """
+        ring = self.ring()
+        arcs = ring.arcs(self.node_id)
+        if not arcs:
+            return None
+        now = time.time()
+        in_shard = " OR ".join(["(point > ? AND point <= ?)"] * len(arcs))
+        query = (f"SELECT url, lease_owner FROM frontier WHERE ({in_shard}) AND "
+                 f"(lease_owner IS NULL OR (lease_owner != ? AND "
+                 f"(lease_expires < ? OR lease_owner NOT IN ({', '.join('?' * len(ring.nodes))})))) "
+                 f"ORDER BY score DESC, added_at LIMIT 1")
+        params = [bound for arc in arcs for bound in arc] + [self.node_id, now] + ring.nodes
+        with self._transaction() as cursor:
+            row = cursor.execute(query, params).fetchone()
+            if row is None:
+                return None
+            url, previous_owner = row
+            cursor.execute("UPDATE frontier SET lease_owner = ?, lease_expires = ? WHERE url = ?",
+                           (self.node_id, now + self.lease_seconds, url))
+        if previous_owner:
+            LEASES.inc(kind="reclaimed")
+            logging.info(f"Node {self.node_id}: reclaimed {url} from the expired lease of {previous_owner}.")
+        else:
+            LEASES.inc(kind="fresh")
+        return url
+
+    def renew(self, url):
+        """
+        Extend this node's lease on url now, without waiting for the next heartbeat.
+        Returns False if the lease was lost.
+        """
+        with self._transaction() as cursor:
+            return cursor.execute("UPDATE frontier SET lease_expires = ? WHERE url = ? AND lease_owner = ?",
+                                  (time.time() + self.lease_seconds, url, self.node_id)).rowcount == 1
+
+    def release(self, url):
+        """
+        Give up the lease on url without counting an attempt.
+        """
+        with self._transaction() as cursor:
+            cursor.execute("UPDATE frontier SET lease_owner = NULL, lease_expires = NULL WHERE url = ? AND lease_owner = ?",
+                           (url, self.node_id))
+
+    def discard(self, url):
+        """
+        Drop a profile this node holds that another node already finished.
+        """
+        with self._transaction() as cursor:
+            if cursor.execute("DELETE FROM frontier WHERE url = ? AND lease_owner = ?", (url, self.node_id)).rowcount:
+                cursor.execute("DELETE FROM refs WHERE url = ?", (url,))
+
+    def complete(self, url, outcome="done"):
+        """
+        Move url from the frontier to the finished profiles, if this node still
+        holds its lease.
+
+        Returns:
+            False if the lease was lost (taken over by another node), so nothing was recorded.
+        """
+        with self._transaction() as cursor:
+            if cursor.execute("SELECT 1 FROM frontier WHERE url = ? AND lease_owner = ?",
+                              (url, self.node_id)).fetchone() is None:
+                return False
+            cursor.execute("INSERT OR REPLACE INTO done (url, node_id, outcome, finished_at) VALUES (?, ?, ?, ?)",
+                           (url, self.node_id, outcome, time.time()))
+            cursor.execute("DELETE FROM frontier WHERE url = ?", (url,))
+            cursor.execute("DELETE FROM refs WHERE url = ?", (url,))
+        return True
+
+    def fail(self, url):
+        """
+        Count a failed attempt on url and release it with a lower score, or give up
+        on it after max_attempts. Nothing is recorded if this node no longer holds
+        the lease: the node that took it over decides.
+
+        Returns:
+            True if the profile was given up on, False otherwise.
+        """
+        penalty = self.rules.retry_penalty
+        with self._transaction() as cursor:
+            if not cursor.execute(
+                "UPDATE frontier SET attempts = attempts + 1, penalty = penalty + ?, score = score - ?, "
+                "lease_owner = NULL, lease_expires = NULL WHERE url = ? AND lease_owner = ?",
+                (penalty, penalty, url, self.node_id)
+            ).rowcount:
+                return False
+            row = cursor.execute("SELECT attempts FROM frontier WHERE url = ?", (url,)).fetchone()
+            if row[0] < self.max_attempts:
+                return False
+            cursor.execute("INSERT OR REPLACE INTO done (url, node_id, outcome, finished_at) VALUES (?, ?, 'failed', ?)",
+                           (url, self.node_id, time.time()))
+            cursor.execute("DELETE FROM frontier WHERE url = ?", (url,))
+            cursor.execute("DELETE FROM refs WHERE url = ?", (url,))
+        logging.warning(f"Giving up on {url} after {self.max_attempts} attempts.")
+        return True
+
+    def depth_of(self, url):
+        with self._lock:
+            row = self.conn.execute("SELECT depth FROM frontier WHERE url = ?", (canonical_profile_url(url),)).fetchone()
+            return row[0] if row else 0
+
+    def is_done(self, url):
+        url = canonical_profile_url(url)
+        if url is None:
+            return False
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM done WHERE url = ?", (url,)).fetchone() is not None
+
+    def pending_count(self):
+        """
+        Profiles queued across all shards, leased ones included.
+        """
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+    def done_count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM done").fetchone()[0]
+
+    def stats(self):
+        """
+        Per live node: queued profiles in its shard, leases it holds and profiles it finished.
+        """
+        ring = self.ring()
+        now = time.time()
+        stats = {node: {"pending": 0, "leased": 0, "done": 0} for node in ring.nodes}
+        with self._lock:
+            for url, owner, expires in self.conn.execute("SELECT url, lease_owner, lease_expires FROM frontier"):
+                shard = ring.owner(url)
+                if shard in stats:
+                    stats[shard]["pending"] += 1
+                if owner in stats and expires >= now:
+                    stats[owner]["leased"] += 1
+            for node, count in self.conn.execute("SELECT node_id, COUNT(*) FROM done GROUP BY node_id"):
+                if node in stats:
+                    stats[node]["done"] = count
+        return stats
+
+
+class ShardedState:
+    """
+    CrawlState stand-in for a node of a sharded crawl (see Coordinator).
+
+    The frontier, claims and the finished set live in the shared coordinator
+    database; the local CrawlState keeps this node's own records, such as the
+    section hashes of the profiles it scraped.
+    """
+
+    def __init__(self, coordinator, local):
+        self.coordinator = coordinator
+        self.local = local
+
+    def __contains__(self, url):
+        return self.coordinator.is_done(url)
+
+    def push(self, links, depth=0, referrer=None):
+        return self.coordinator.push(links, depth=depth, referrer=referrer)
+
+    def pop(self):
+        return self.coordinator.claim()
+
+    def release(self, url):
+        self.coordinator.release(url)
+
+    def discard(self, url):
+        self.coordinator.discard(url)
+
+    def depth_of(self, url):
+        return self.coordinator.depth_of(url)
+
+    def section_hashes(self, url):
+        return self.local.section_hashes(url)
+
+    def _holds(self, url):
+        # Renewing also proves the lease is still ours right before the outcome is recorded
+        if self.coordinator.renew(url):
+            return True
+        LEASES.inc(kind="lost")
+        logging.warning(f"Node {self.coordinator.node_id}: lease on {url} was taken over, "
+                        f"leaving its outcome to the new owner.")
+        return False
+
+    def mark_done(self, url, hashes=None):
+        if self._holds(url) and self.coordinator.complete(url):
+            self.local.mark_done(url, hashes)
+
+    def mark_failed(self, url, error=None):
+        if self._holds(url):
+            self.coordinator.fail(url)
+            logging.debug(f"Attempt on {url} failed: {error}")
+
+    def requeue_stale(self, ttl, limit=None):
+        logging.warning("Refreshing stale profiles is not supported in a sharded crawl, skipping.")
+        return 0
+
+    def pending_count(self):
+        return self.coordinator.pending_count()
+
+    def visited_count(self):
+        return self.coordinator.done_count()
+
+    def commit(self):
+        self.local.commit()
+
+    def close(self):
+        try:
+            self.coordinator.close()
+        finally:
+            self.local.close()
@@ -0,0 +1,132 @@
+import time
+import json
+import hashlib
+import logging
+from src.metrics import PROFILE_SECONDS, PROFILES, PROFILE_WRITES, LINKS_DISCOVERED
+from src.scrape import scrape_profile, extract_more_profile_cards
+
+
+def section_hashes(profile_info):
+    """
+    Content hash of every section of a scraped profile, independent of key order.
+    """
+    return {
+        section: hashlib.sha1(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        for section, data in profile_info.items()
+    }
+
+
+def profile_record(profile_url, profile_info, hashes, previous_hashes):
+    """
+    Build the record to save for a scraped profile.
+
+    Returns:
+        The full profile the first time it is scraped, a delta record holding only
+        the changed sections on a refresh, or None if nothing changed.
+    """
+    if previous_hashes is None:
+        return {"profile_url": profile_url, **profile_info}
+    changed = [section for section, digest in hashes.items() if previous_hashes.get(section) != digest]
+    if not changed:
+        return None
+    return {
+        "profile_url": profile_url,
+        "changed_sections": changed,
+        "scraped_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        **{section: profile_info[section] for section in changed},
+    }
+
+
+def record_profile(profile_url, profile_info, state, sink):
+    """
+    Save a scraped profile to the sink and record the outcome in the crawl state.
+
+    A profile scraped before (queued again by state.requeue_stale) is only written
+    as a delta of its changed sections, and not at all if nothing changed.
+
+    Returns:
+        True if the profile was scraped, False if profile_info is empty.
+    """
+    if profile_info:
+        hashes = section_hashes(profile_info)
+        record = profile_record(profile_url, profile_info, hashes, state.section_hashes(profile_url))
+        if record is None:
+            PROFILE_WRITES.inc(kind="unchanged")
+            logging.info(f"Profile {profile_url} unchanged since its last scrape, nothing written.")
+        else:
+            # Save each profile after scraping, appending one line to the file
+            sink.write(record)
+            PROFILE_WRITES.inc(kind="delta" if "changed_sections" in record else "full")
+            logging.info(f"Profile {profile_url} successfully saved.")
+        state.mark_done(profile_url, hashes)
+        PROFILES.inc(outcome="scraped")
+        return True
+
+    state.mark_failed(profile_url, "No profile data extracted")
+    PROFILES.inc(outcome="failed")
+    logging.warning(f"Failed to scrape profile: {profile_url}")
+    return False
+
+
+def skip_visited(profile_url, state):
+    """
+    Drop a claimed profile from the frontier if it was visited already. Nothing
+    is scraped, recorded or queued for it, and no attempt is counted.
+
+    Returns:
+        True if the profile was skipped.
+    """
+    if profile_url not in state:
+        return False
+    logging.warning(f"Profile already visited: {profile_url}")
+    PROFILES.inc(outcome="skipped")
+    state.discard(profile_url)
+    return True
+
+
+def queue_discovered(driver, profile_url, depth, state, graph=None):
+    """
+    Queue the profiles linked from a scraped page, one step further from the seeds,
+    and record the links in the graph store if one is given.
+    """
+    new_cards = extract_more_profile_cards(driver)
+    LINKS_DISCOVERED.inc(len(new_cards))
+    state.push(new_cards, depth=depth + 1, referrer=profile_url)
+    if graph is not None:
+        graph.add_edges(profile_url, [url for url, _ in new_cards])
+
+
+def crawl_profile(driver, profile_url, state, sink, engine="snapshot", archive=None, preloaded=False, graph=None):
+    """
+    Scrape one claimed profile, save it to the sink, record the outcome in the
+    crawl state and, if it scraped, queue the profiles discovered on its page.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        profile_url: Profile claimed from the frontier with state.pop().
+        state: CrawlState holding the frontier and visited set.
+        sink: Output sink with a write(record) method.
+        engine: Extraction engine passed to scrape_profile.
+        archive: Optional PageArchive keeping the rendered page.
+        preloaded: True if the profile is already loading in the driver's current tab.
+        graph: Optional GraphStore recording the links found on the page.
+
+    Returns:
+        True if the profile was scraped and saved, None if it was visited already
+        and skipped, False otherwise.
+    """
+    if skip_visited(profile_url, state):
+        return None
+    start = time.perf_counter()
+    depth = state.depth_of(profile_url)
+    profile_info = scrape_profile(driver, profile_url, engine=engine, archive=archive, preloaded=preloaded)
+    if not record_profile(profile_url, profile_info, state, sink):
+        return False
+    PROFILE_SECONDS.observe(time.perf_counter() - start)
+
+    # Discover more profiles to scrape, only from pages that scraped: a failed
+    # page is retried later and would credit its links twice
+    queue_discovered(driver, profile_url, depth, state, graph=graph)
+
+    logging.info(f"Scraped profile: {profile_url}")
+    return True
@@ -0,0 +1,231 @@
+import json
+import time
+import asyncio
+import itertools
+from http import HTTPStatus
+from collections import Counter
+from lxml import html as lxml_html
+from src.snapshot import CAPTURE_SCRIPT, SnapshotPage
+from src.batch import BATCH_SCRIPT, evaluate_spec
+from src.helper import SCROLL_SCRIPT
+from src.scrape import PROBE_SCRIPT, SECTION_ANCHORS
+
+
+class FakeWebElement:
+    """
+    WebElement stand-in that forwards to a snapshot node and charges every
+    access as one round-trip to its FakeWebDriver.
+    """
+
+    def __init__(self, driver, element):
+        self._driver = driver
+        self._element = element
+
+    def find_element(self, by, value=None):
+        self._driver._round_trip("find_element")
+        return FakeWebElement(self._driver, self._element.find_element(by, value))
+
+    def find_elements(self, by, value=None):
+        self._driver._round_trip("find_elements")
+        return [FakeWebElement(self._driver, element) for element in self._element.find_elements(by, value)]
+
+    @property
+    def text(self):
+        self._driver._round_trip("text")
+        return self._element.text
+
+    def get_attribute(self, name):
+        self._driver._round_trip("get_attribute")
+        return self._element.get_attribute(name)
+
+    def click(self):
+        self._driver._round_trip("click")
+
+
+class FakeWebDriver:
+    """
+    Offline WebDriver stand-in backed by saved profile HTML.
+
+    Every call that would be an HTTP request to chromedriver is counted (per
+    label, see the `label` attribute) and can be slowed down by a fixed latency.
+    Sections listed in missing_sections are removed from the page to simulate
+    profiles without them. With pages ({url: html}) get() switches to the page
+    of the URL it loads, taking load_time seconds. execute_script understands the scripts used by
+    src/snapshot.py, src/scrape.py and src/batch.py.
+    """
+
+    def __init__(self, page_source, url=None, latency=0.0, missing_sections=(), pages=None, load_time=0.0):
+        self._page = SnapshotPage(page_source, url)
+        self.pages = pages or {}
+        self.load_time = load_time
+        for field in missing_sections:
+            anchor = SECTION_ANCHORS.get(field, field)
+            for section in self._page._node.xpath("//div[@id=$anchor]/ancestor::section[1]", anchor=anchor):
+                section.getparent().remove(section)
+        self.current_url = url
+        self.latency = latency
+        self.label = None
+        self.calls = Counter()
+        self.total_calls = 0
+
+    def _round_trip(self, method):
+        self.calls[(self.label, method)] += 1
+        self.total_calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, url):
+        self._round_trip("get")
+        if self.load_time:
+            time.sleep(self.load_time)
+        if url in self.pages:
+            self._page = SnapshotPage(self.pages[url], url)
+        self.current_url = url
+
+    @property
+    def page_source(self):
+        self._round_trip("page_source")
+        return lxml_html.tostring(self._page._node, encoding="unicode")
+
+    def find_element(self, by, value=None):
+        self._round_trip("find_element")
+        return FakeWebElement(self, self._page.find_element(by, value))
+
+    def find_elements(self, by, value=None):
+        self._round_trip("find_elements")
+        return [FakeWebElement(self, element) for element in self._page.find_elements(by, value)]
+
+    def execute_script(self, script, *args):
+        self._round_trip("execute_script")
+        if script == PROBE_SCRIPT:
+            return [anchor for anchor in args[0] if self._page.find_elements("id", anchor)]
+        if script == BATCH_SCRIPT:
+            return evaluate_spec(self._page, args[0])
+        if script == CAPTURE_SCRIPT:
+            return [lxml_html.tostring(self._page._node, encoding="unicode"), self.current_url]
+        return None
+
+    def execute_async_script(self, script, *args):
+        self._round_trip("execute_async_script")
+        if script == SCROLL_SCRIPT:
+            return {"scrolls": 1, "height": 1000, "capped": False}
+        return None
+
+    def set_script_timeout(self, time_to_wait):
+        self._round_trip("set_script_timeout")
+
+    def calls_for(self, label):
+        return sum(count for (call_label, _), count in self.calls.items() if call_label == label)
+
+    def quit(self):
+        pass
+
+
+class FakeCDPServer:
+    """
+    Local stand-in for Chrome's DevTools endpoint, serving saved profile HTML.
+
+    Answers /json/version like Chrome and, over its websocket, the subset of the
+    protocol used by src/cdp.py: creating, attaching and closing tabs, navigation
+    (the load event fires load_time seconds later), setting cookies (which logs
+    the browser in) and the evaluations CDPTab sends. Every command is counted per method and delayed by latency seconds.
+
+    Usage:
+        async with FakeCDPServer({url: html}) as server:
+            browser = await CDPBrowser.connect(port=server.port)
+    """
+
+    def __init__(self, pages, default_page=None, load_time=0.0, latency=0.0):
+        self.pages = pages
+        self.default_page = default_page
+        self.load_time = load_time
+        self.latency = latency
+        self.calls = Counter()
+        self.port = None
+        self.loading = 0
+        self.max_loading = 0
+        self.session_status = 200  # what the session probe answers
+        self.cookies = []
+        self._tabs = {}  # session id -> current URL
+        self._target_ids = itertools.count(1)
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        from websockets.asyncio.server import serve
+        self._server = await serve(self._handle, host, port, process_request=self._process_request, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def _process_request(self, connection, request):
+        if request.path == "/json/version":
+            body = json.dumps({"Browser": "FakeChrome", "webSocketDebuggerUrl": f"ws://127.0.0.1:{self.port}/devtools/browser/fake"})
+            return connection.respond(HTTPStatus.OK, body)
+        return None
+
+    async def _handle(self, websocket):
+        async for raw in websocket:
+            message = json.loads(raw)
+            asyncio.get_running_loop().create_task(self._answer(websocket, message))
+
+    async def _answer(self, websocket, message):
+        method, params, session_id = message["method"], message.get("params", {}), message.get("sessionId")
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        result = {}
+        if method == "Target.createTarget":
+            result = {"targetId": f"target-{next(self._target_ids)}"}
+        elif method == "Target.attachToTarget":
+            attached = f"session-{params['targetId']}"
+            self._tabs[attached] = "about:blank"
+            result = {"sessionId": attached}
+        elif method == "Target.closeTarget":
+            self._tabs.pop(f"session-{params['targetId']}", None)
+            result = {"success": True}
+        elif method == "Page.navigate":
+            self._tabs[session_id] = params["url"]
+            asyncio.get_running_loop().create_task(self._load(websocket, session_id))
+            result = {"frameId": session_id}
+        elif method == "Storage.setCookies":
+            self.cookies = params["cookies"]
+            if self.cookies:
+                self.session_status = 200
+        elif method == "Runtime.evaluate":
+            result = {"result": {"type": "object", "value": self._evaluate(session_id, params["expression"])}}
+
+        await websocket.send(json.dumps({"id": message["id"], "result": result, **({"sessionId": session_id} if session_id else {})}))
+
+    async def _load(self, websocket, session_id):
+        self.loading += 1
+        self.max_loading = max(self.max_loading, self.loading)
+        try:
+            await asyncio.sleep(self.load_time)
+        finally:
+            self.loading -= 1
+        await websocket.send(json.dumps({"method": "Page.loadEventFired", "params": {"timestamp": time.time()},
+                                         "sessionId": session_id}))
+
+    def _evaluate(self, session_id, expression):
+        from src.cdp import PAGE_EXPRESSION, ASYNC_EXPRESSION, SESSION_PROBE_EXPRESSION
+        url = self._tabs.get(session_id)
+        if expression == SESSION_PROBE_EXPRESSION:
+            return self.session_status
+        if expression == PAGE_EXPRESSION:
+            html = self.pages.get(url, self.default_page)
+            if isinstance(html, bytes):
+                html = html.decode("utf-8")
+            return {"url": url, "html": html or "<html><body></body></html>"}
+        if expression.startswith(ASYNC_EXPRESSION.split("%s")[0]):
+            return {"scrolls": 1, "height": 1000, "capped": False}
+        return None
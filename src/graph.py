@@ -0,0 +1,203 @@
+import time
+import array
+import logging
+import sqlite3
+import threading
+from src.urls import canonical_profile_url
+
+
+class GraphStore:
+    """
+    Compact store of the "people also viewed" graph: an edge A -> B means B was
+    suggested on A's profile page.
+
+    Tables:
+        nodes: canonical profile URL per integer node id (0, 1, 2, ...).
+        edge_batches: append-only batches of edges, each a BLOB of int32
+                      (source, target) pairs.
+
+    Edges are buffered in an int32 array and written as one batch every
+    batch_size edges or flush_interval seconds, so recording costs a few bytes
+    per edge and the URLs are stored once. export_csr() turns the batches into
+    a compressed-sparse-row adjacency without building Python objects per edge.
+    """
+
+    def __init__(self, db_path, batch_size=5000, flush_interval=60.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._buffer = array.array("i")
+        self._last_flush = time.monotonic()
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS nodes (id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL)")
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS edge_batches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            edges INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            added_at REAL NOT NULL
+        )
+        ''')
+        self.conn.commit()
+        self.node_count = self.conn.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM nodes").fetchone()[0]
+
+    def intern(self, url):
+        """
+        Node id of url, assigning the next free one to a URL seen for the first time.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT id FROM nodes WHERE url = ?", (url,)).fetchone()
+            if row:
+                return row[0]
+            node_id = self.node_count
+            self.conn.execute("INSERT INTO nodes (id, url) VALUES (?, ?)", (node_id, url))
+            self.node_count += 1
+            return node_id
+
+    def add_edges(self, source, targets):
+        """
+        Record edges from the profile source to each of the profiles in targets.
+        URLs that are not profile URLs and self-links are skipped.
+
+        Returns the number of edges recorded.
+        """
+        source = canonical_profile_url(source)
+        if source is None:
+            return 0
+        with self._lock:
+            source_id = None
+            added = 0
+            for target in targets:
+                target = canonical_profile_url(target)
+                if target is None or target == source:
+                    continue
+                if source_id is None:
+                    source_id = self.intern(source)
+                self._buffer.extend((source_id, self.intern(target)))
+                added += 1
+            if (len(self._buffer) >= 2 * self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+        return added
+
+    def flush(self):
+        """
+        Write the buffered edges as one batch, together with the nodes interned since the last flush.
+        """
+        with self._lock:
+            if self._buffer:
+                self.conn.execute("INSERT INTO edge_batches (edges, data, added_at) VALUES (?, ?, ?)",
+                                  (len(self._buffer) // 2, self._buffer.tobytes(), time.time()))
+                self._buffer = array.array("i")
+            self.conn.commit()
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self.conn.close()
+
+    def edge_count(self):
+        """
+        Edges recorded so far, duplicates included.
+        """
+        with self._lock:
+            stored = self.conn.execute("SELECT COALESCE(SUM(edges), 0) FROM edge_batches").fetchone()[0]
+            return stored + len(self._buffer) // 2
+
+    def urls(self, node_ids):
+        """
+        Canonical profile URLs of the given node ids, in the same order.
+        """
+        with self._lock:
+            rows = [self.conn.execute("SELECT url FROM nodes WHERE id = ?", (int(node_id),)).fetchone() for node_id in node_ids]
+        return [row[0] if row else None for row in rows]
+
+    def edges(self):
+        """
+        All recorded edges as an (n, 2) int32 array of (source, target) node ids.
+        """
+        import numpy as np
+        self.flush()
+        with self._lock:
+            total = self.conn.execute("SELECT COALESCE(SUM(edges), 0) FROM edge_batches").fetchone()[0]
+            edges = np.empty(2 * total, dtype=np.int32)
+            offset = 0
+            for (data,) in self.conn.execute("SELECT data FROM edge_batches ORDER BY id"):
+                batch = np.frombuffer(data, dtype=np.int32)
+                edges[offset:offset + len(batch)] = batch
+                offset += len(batch)
+        return edges.reshape(-1, 2)
+
+    def csr(self):
+        """
+        Compressed-sparse-row adjacency of the graph, duplicate edges removed.
+
+        Returns:
+            (indptr, indices): the targets of node i are indices[indptr[i]:indptr[i + 1]], sorted.
+        """
+        import numpy as np
+        edges = self.edges()
+        nodes = self.node_count
+        # One int64 key per edge sorts by source, then target, and makes duplicates adjacent
+        width = max(nodes, 1)
+        keys = np.unique(edges[:, 0].astype(np.int64) * width + edges[:, 1])
+        sources = (keys // width).astype(np.int32)
+        indices = (keys % width).astype(np.int32)
+        indptr = np.zeros(nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=nodes), out=indptr[1:])
+        return indptr, indices
+
+    def export_csr(self, path):
+        """
+        Save the CSR adjacency with the degrees of every node to a compressed .npz
+        file (arrays indptr, indices, out_degree, in_degree). Row i is the node
+        with id i; see urls() for its profile.
+
+        Returns:
+            Degree statistics, see degree_stats.
+        """
+        import numpy as np
+        start = time.perf_counter()
+        indptr, indices = self.csr()
+        out_degree = np.diff(indptr).astype(np.int32)
+        in_degree = np.bincount(indices, minlength=self.node_count).astype(np.int32)
+        np.savez_compressed(path, indptr=indptr, indices=indices, out_degree=out_degree, in_degree=in_degree)
+        stats = degree_stats(out_degree, in_degree, recorded=self.edge_count())
+        logging.info(f"Exported {stats['nodes']} nodes and {stats['edges']} edges to {path} "
+                     f"in {time.perf_counter() - start:.1f}s.")
+        return stats
+
+
+def degree_stats(out_degree, in_degree, recorded=None):
+    """
+    Summary of a graph's degree distribution.
+
+    Args:
+        out_degree: Out-degree per node (NumPy array).
+        in_degree: In-degree per node (NumPy array).
+        recorded: Edges recorded before duplicates were removed, if known.
+
+    Returns:
+        A dict with the node and edge counts, the nodes without outgoing edges
+        (profiles discovered but not scraped) and mean, median, p99 and max of
+        both degrees.
+    """
+    import numpy as np
+    stats = {
+        "nodes": int(len(out_degree)),
+        "edges": int(out_degree.sum()),
+        "duplicates": int(recorded - out_degree.sum()) if recorded is not None else None,
+        "no_out_edges": int(np.count_nonzero(out_degree == 0)),
+    }
+    for name, degree in (("out", out_degree), ("in", in_degree)):
+        empty = not len(degree)
+        stats[f"{name}_mean"] = 0.0 if empty else float(degree.mean())
+        stats[f"{name}_median"] = 0.0 if empty else float(np.median(degree))
+        stats[f"{name}_p99"] = 0.0 if empty else float(np.percentile(degree, 99))
+        stats[f"{name}_max"] = 0 if empty else int(degree.max())
+    return stats
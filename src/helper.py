@@ -1,59 +1,50 @@
 import os
 import time
 import json
-from pymongo import MongoClient
-from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from selenium.webdriver.support import expected_conditions as EC
 import logging
-from functools import wraps
-import sqlite3
+from functools import wraps, lru_cache
 import random
 import csv
-from selenium.webdriver.common.action_chains import ActionChains
-# Load environment variables
-load_dotenv(dotenv_path='./environment/.env')
-timeout = int(os.getenv("TIMEOUT"))
-TRIES = int(os.getenv('TRIES'))
-DELAY = float(os.getenv('DELAY'))
-MONGO_URI = os.getenv("MONGO_URI")
-DB_NAME = os.getenv("MONGO_DB")
-COLLECTION_NAME = os.getenv("MONGO_COLLECTION")
-EMAIL = os.getenv("EMAIL")
-PASSWORD = os.getenv("PASSWORD")
-
-# Setup logging: log both to file and console
-logging.basicConfig(
-    level=logging.INFO,  
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("./log/scraping.log"),  
-        # logging.StreamHandler()  # Log to console
-    ]
-)
+import socket
+import subprocess
+from src.config import get_config
+from src.blocking import ResourceBlocker
+from src.metrics import RETRIES, TIMEOUTS, GIVE_UPS, WAIT_SECONDS
+# Selenium's WebDriver and pymongo are imported where they are used, so that
+# offline tools importing this module do not pay for them
+
+# Settings defaulting to None below are read from the configuration when the
+# function runs, not at import, so offline tools never need a complete .env
 
 # Retry decorator for retrying functions that may fail
-def retry(ExceptionToCheck, tries=TRIES, delay=DELAY):
+def retry(ExceptionToCheck, tries=None, delay=None):
     """
     Retry decorator to handle exceptions and retry failed functions.
     Logs more concise exception messages for brevity.
+    tries and delay default to the TRIES and DELAY settings.
     """
     def deco_retry(f):
         @wraps(f)
         def f_retry(*args, **kwargs):
-            mtries, mdelay = tries, delay
+            attempts = get_config().tries if tries is None else tries
+            mtries, mdelay = attempts, get_config().delay if delay is None else delay
             while mtries > 0:
                 try:
                     return f(*args, **kwargs)
                 except ExceptionToCheck as e:
+                    if args and getattr(args[0], "static", False):
+                        # Page snapshots never change, so a retry would fail the same way
+                        return None
                     logging.warning(f"Retrying after exception: {type(e).__name__})")
+                    RETRIES.inc(function=f.__name__)
+                    if isinstance(e, TimeoutException):
+                        TIMEOUTS.inc(function=f.__name__)
                     time.sleep(mdelay)
                     mtries -= 1
-            logging.error(f"Failed after {tries} attempts.")
+            logging.error(f"Failed after {attempts} attempts.")
+            GIVE_UPS.inc(function=f.__name__)
             return None
         return f_retry
     return deco_retry
@@ -61,7 +52,7 @@ def retry(ExceptionToCheck, tries=TRIES, delay=DELAY):
 
 
 # 1. Browser Initialization & Login
-@retry(ExceptionToCheck=(NoSuchElementException, TimeoutException), tries=TRIES, delay=DELAY)
+@retry(ExceptionToCheck=(NoSuchElementException, TimeoutException))
 def login(driver):
     """
     Perform login on the target website using credentials from environment variables.
@@ -78,8 +69,9 @@ def login(driver):
         5. Once the CAPTCHA is solved, the user presses Enter to continue execution.
         6. Verify if the login was successful by checking for a post-login element.
     """
-    email = EMAIL
-    password = PASSWORD
+    config = get_config()
+    email = config.email
+    password = config.password
 
     try:
         username = get_object(driver, By.ID, "username")
@@ -122,80 +114,124 @@ def login(driver):
         logging.error(f"Error during CAPTCHA handling or login verification: {e}")
 
 
-@retry(ExceptionToCheck=(NoSuchElementException, TimeoutException), tries=TRIES, delay=DELAY)
-def scroll_and_load(driver, wait_time=2, max_scrolls=None):
+# Scrolls to the bottom whenever the page grows and reports back once the DOM has been
+# quiet (no mutations, stable height) for `quiet` ms, or after `cap` ms at the latest
+SCROLL_SCRIPT = """
+var quiet = arguments[0], cap = arguments[1], maxScrolls = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = Date.now(), lastChange = start, lastHeight = -1, scrolls = 0;
+var observer = new MutationObserver(function () { lastChange = Date.now(); });
+observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+function tick() {
+    var height = document.body.scrollHeight, now = Date.now();
+    if (height !== lastHeight) {
+        lastHeight = height;
+        lastChange = now;
+        if (maxScrolls === null || scrolls < maxScrolls) {
+            window.scrollTo(0, height);
+            scrolls++;
+        }
+    }
+    if (now - lastChange >= quiet || now - start >= cap) {
+        observer.disconnect();
+        done({scrolls: scrolls, height: height, capped: now - lastChange < quiet});
+        return;
+    }
+    setTimeout(tick, 50);
+}
+tick();
+"""
+
+def scroll_and_load(driver, quiet_time=None, max_wait=None, max_scrolls=None):
     """
-    Scroll down the page and click the 'Show more results' button if available.
-    Useful for loading dynamic content.
-    
+    Scroll down the page until lazily loaded content stops arriving.
+    Waits in the page for the DOM to be quiet for quiet_time seconds instead of
+    sleeping a fixed time after every scroll, so fast pages return quickly.
+
     Args:
         driver: Selenium WebDriver instance.
-        wait_time: Time to wait after each scroll (default is 2 seconds).
-        max_scrolls: Maximum number of scrolls. If None, scroll infinitely (default behavior).
-    """
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    scroll_count = 0
-
-    while True:
-        # Scroll down to the bottom of the page
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(wait_time)  # Wait for the page to load
-
-        # Try to click the "Show more results" button, if available
-        try:
-            show_more_button = get_object(driver, By.XPATH, "//button[@id='ember861']")
-            if show_more_button:
-                show_more_button.click()
-                time.sleep(wait_time)  # Allow time for new content to load
-        except NoSuchElementException:
-            pass  # Button not found; continue scrolling
+        quiet_time: Seconds without DOM changes after which the page counts as loaded (default SCROLL_QUIET).
+        max_wait: Hard cap on the total wait, in seconds (default SCROLL_MAX_WAIT).
+        max_scrolls: Maximum number of scrolls. If None, scroll until the page stops growing.
 
-        new_height = driver.execute_script("return document.body.scrollHeight")
-
-        # Break the loop if the page height hasn't increased (end of scrollable content)
-        if new_height == last_height:
-            break
-
-        last_height = new_height
-        scroll_count += 1
+    Returns:
+        Seconds spent waiting (0 for page snapshots).
+    """
+    if getattr(driver, "static", False):
+        return 0.0  # Page snapshots are already fully loaded
+    quiet_time = get_config().scroll_quiet if quiet_time is None else quiet_time
+    max_wait = get_config().scroll_max_wait if max_wait is None else max_wait
 
-        # Stop if the maximum number of scrolls has been reached
-        if max_scrolls and scroll_count >= max_scrolls:
-            logging.info(f"Reached the maximum scroll limit of {max_scrolls}.")
-            break
+    start = time.perf_counter()
+    try:
+        driver.set_script_timeout(max_wait + 5)
+        result = driver.execute_async_script(SCROLL_SCRIPT, int(quiet_time * 1000), int(max_wait * 1000), max_scrolls) or {}
+        if result.get("capped"):
+            logging.info(f"Page still changing after {max_wait}s, continuing with what has loaded.")
+    except Exception as e:
+        logging.warning(f"Scrolling the page failed: {e}")
+        result = {}
+    elapsed = time.perf_counter() - start
+    logging.info(f"Scrolled {result.get('scrolls', 0)} times, page settled in {elapsed:.2f}s.")
+    return elapsed
 
+def wait_for_load(driver, timeout=30):
+    """
+    Wait until the current page has finished loading, e.g. after navigating
+    without driver.get.
+    """
+    if getattr(driver, "static", False):
+        return
+    from selenium.webdriver.support.ui import WebDriverWait
+    WebDriverWait(driver, timeout, poll_frequency=0.05).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
 
 # 2. Selenium Utility Functions for Element Handling
 
-def wait_element(driver, by, element, timeout=timeout):
+def wait_element(driver, by, element, timeout=None):
     """
-    Wait until a specific element is present on the page.
+    Wait until a specific element is present on the page, at most timeout
+    seconds (default TIMEOUT). Page snapshots are checked once, since there is
+    nothing to wait for.
     """
-    WebDriverWait(driver, timeout).until(EC.presence_of_element_located((by, element)))
+    if getattr(driver, "static", False):
+        driver.find_element(by, element)
+        return
+    timeout = get_config().timeout if timeout is None else timeout
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    start = time.perf_counter()
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((by, element)))
+    except TimeoutException:
+        WAIT_SECONDS.observe(time.perf_counter() - start, outcome="timeout")
+        raise
+    WAIT_SECONDS.observe(time.perf_counter() - start, outcome="found")
 
-def get_element(driver, by, element, timeout=timeout):
+def get_element(driver, by, element, timeout=None):
     """
     Get a single element from the page.
     """
     wait_element(driver, by, element, timeout)
     return driver.find_element(by, element)
 
-def get_elements(driver, by, element, timeout=timeout):
+def get_elements(driver, by, element, timeout=None):
     """
     Get multiple elements from the page.
     """
     wait_element(driver, by, element, timeout)
     return driver.find_elements(by, element)
 
-@retry(ExceptionToCheck=(NoSuchElementException, TimeoutException), tries=TRIES, delay=DELAY)
-def get_object(driver, by, element, timeout=timeout):
+@retry(ExceptionToCheck=(NoSuchElementException, TimeoutException))
+def get_object(driver, by, element, timeout=None):
     """
     Wrapper around get_element with retry.
     """
     return get_element(driver, by, element, timeout)
 
-@retry(ExceptionToCheck=(NoSuchElementException, TimeoutException), tries=TRIES, delay=DELAY)
-def get_objects(driver, by, element, timeout=timeout):
+@retry(ExceptionToCheck=(NoSuchElementException, TimeoutException))
+def get_objects(driver, by, element, timeout=None):
     """
     Wrapper around get_elements with retry.
     """
@@ -203,12 +239,13 @@ def get_objects(driver, by, element, timeout=timeout):
 
 
 # 3. Data Extraction
-@retry(ExceptionToCheck=(NoSuchElementException, TimeoutException), tries=TRIES, delay=DELAY)
-def extract_elements(driver, by, element, multiple=False, attribute=None, timeout=timeout):
+@retry(ExceptionToCheck=(NoSuchElementException, TimeoutException))
+def extract_elements(driver, by, element, multiple=False, attribute=None, timeout=None):
     """
     Extract the text or attribute of a web element. Supports both single and multiple elements.
+    Uses the non-retrying lookups so retries do not nest.
     """
-    elements = get_objects(driver, by, element, timeout) if multiple else [get_object(driver, by, element, timeout)]
+    elements = get_elements(driver, by, element, timeout) if multiple else [get_element(driver, by, element, timeout)]
 
     if attribute:
         if not multiple:
@@ -222,145 +259,109 @@ def extract_elements(driver, by, element, multiple=False, attribute=None, timeou
 
 
 # 4. Data Storage
-# def save_to_json(data, filename="./data/profile_list.json"):
-#     """
-#     Save the scraped data to a JSON file.
-#     """
-#     try:
-#         with open(filename, "w", encoding="utf-8") as f:
-#             json.dump(data, f, ensure_ascii=False, indent=4)
-#         logging.info(f"Data saved to {filename}.")
-#     except Exception as e:
-#         logging.error(f"Error saving to JSON: {e}")
-        
 
-def save_to_json(profile_info, file_path='./data/scraped_profiles.json'):
+@lru_cache(maxsize=None)
+def get_mongo_client(mongo_uri):
     """
-    Save a single profile's data to a JSON file, appending it one by one.
-    If the file doesn't exist, it will create one. 
-    If the file exists, it will append to the existing data.
+    Return a process-wide MongoClient for the URI. MongoClient is thread-safe and
+    pools its connections, so it is created once instead of per write.
     """
-    if not os.path.exists(file_path):
-        # Create the file if it doesn't exist and write the first profile
-        with open(file_path, 'w') as file:
-            json.dump([profile_info], file, indent=4)
-    else:
-        # If the file exists, load the current data, append the new profile, and save
-        with open(file_path, 'r+') as file:
-            try:
-                data = json.load(file)
-            except json.JSONDecodeError:
-                data = []
-            data.append(profile_info)
-            file.seek(0)
-            json.dump(data, file, indent=4)
-
+    from pymongo import MongoClient
+    return MongoClient(mongo_uri)
 
 def save_to_mongo(data):
     """
-    Save the scraped data to a MongoDB collection.
+    Save the scraped data to a MongoDB collection, upserting by profile_url
+    so re-scraped profiles replace their previous version.
     """
+    from pymongo import UpdateOne, InsertOne
+    config = get_config()
     try:
-        with MongoClient(MONGO_URI) as client:
-            db = client[DB_NAME]
-            collection = db[COLLECTION_NAME]
-            if isinstance(data, list):
-                collection.insert_many(data)
-            else:
-                collection.insert_one(data)
-        logging.info(f"Data successfully saved to MongoDB collection: {COLLECTION_NAME}")
+        collection = get_mongo_client(config.mongo_uri)[config.mongo_db][config.mongo_collection]
+        records = data if isinstance(data, list) else [data]
+        operations = [UpdateOne({"profile_url": record["profile_url"]}, {"$set": record}, upsert=True)
+                      if record.get("profile_url") else InsertOne(record) for record in records]
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+        logging.info(f"Data successfully saved to MongoDB collection: {config.mongo_collection}")
     except Exception as e:
         logging.error(f"Failed to save data to MongoDB: {e}")
 
 def import_json_to_mongo(json_file_path, db_name, collection_name, mongo_uri="mongodb://localhost:27017/"):
     """
-    Import a JSON file into a MongoDB collection.
+    Import a JSON (array) or JSONL file into a MongoDB collection.
+    Streams the file in batches and resumes from its checkpoint, see src/importer.py.
     """
+    from src.importer import import_to_mongo
     try:
-        with MongoClient(mongo_uri) as client:
-            db = client[db_name]
-            collection = db[collection_name]
-
-            with open(json_file_path, "r") as file:
-                data = json.load(file)
-
-            if isinstance(data, list):
-                collection.insert_many(data)
-            else:
-                collection.insert_one(data)
-
+        collection = get_mongo_client(mongo_uri)[db_name][collection_name]
+        import_to_mongo(json_file_path, collection, checkpoint_path=f"{json_file_path}.checkpoint")
         logging.info(f"Data imported to {db_name}.{collection_name} successfully.")
     except Exception as e:
         logging.error(f"Failed to import JSON data to MongoDB: {e}")
 
 
 # 5. Browser Setup
-def start_chrome_with_debug():
+def launch_chrome(port=9222, user_data_dir=None, chrome_binary=None, startup_timeout=20):
+    """
+    Launch a Chrome instance with remote debugging enabled on the given port and
+    wait until its debugger accepts connections. Returns the Chrome process.
+    """
+    config = get_config()
+    chrome_binary = chrome_binary or config.chrome_binary
+    user_data_dir = user_data_dir or os.path.join(config.chrome_profile_dir, str(port))
+    process = subprocess.Popen(
+        [chrome_binary, f"--remote-debugging-port={port}", f"--user-data-dir={os.path.abspath(user_data_dir)}",
+         "--no-first-run", "--no-default-browser-check"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                logging.info(f"Launched Chrome with remote debugging on port {port}.")
+                return process
+        except OSError:
+            time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError(f"Chrome did not open its debugger on port {port} within {startup_timeout}s.")
+
+
+def start_chrome_with_debug(port=9222, host="127.0.0.1", launch=False, block_resources=(), baseline_every=25):
     """
     Start Chrome with remote debugging enabled.
+    Attaches to the browser listening on host:port, launching it first if requested.
+
+    Args:
+        block_resources: Resource classes not to load (see src/blocking.py), e.g. ("images", "fonts").
+        baseline_every: Load every n-th page unblocked to measure the savings (0 never).
     """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    process = launch_chrome(port) if launch else None
     chrome_options = Options()
-    chrome_options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
+    chrome_options.add_experimental_option("debuggerAddress", f"{host}:{port}")
     driver = webdriver.Chrome(options=chrome_options)
+    # Keep the launched browser around so close_chrome can shut it down
+    driver.chrome_process = process
+    driver.resource_blocker = None
+    if block_resources:
+        driver.resource_blocker = ResourceBlocker(driver, block_resources, baseline_every)
+        logging.info(f"Blocking {', '.join(block_resources)} in the browser on port {port}.")
     return driver
 
 
-# Crawling
-def save_profile_list(db_path, profile_url):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
+def close_chrome(driver):
+    """
+    Quit the driver, and the Chrome instance too if it was launched by start_chrome_with_debug.
+    """
     try:
-        cursor.execute("INSERT INTO profile_list (profile_url) VALUES (?)", (profile_url,))
-        conn.commit()
-    except sqlite3.IntegrityError:
-        pass
-    
-    conn.close()
-    
-# Load scraped profiles from SQLite
-def load_profile_list(db_path):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT profile_url FROM PROFILE_LIST")
-    profile_list = set([row[0] for row in cursor.fetchall()])
-    
-    conn.close()
-    return profile_list
-    
-
-def is_profile_scraped(db_path, profile_url):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT profile_url FROM PROFILE_LIST WHERE profile_url = ?", (profile_url,))
-    result = cursor.fetchone()
-    
-    conn.close()
-    
-    return result is not None
-            
-            
-
-
-def init_db(db_path):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-
-    # Create table for scraped profiles
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS PROFILE_LIST (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        profile_url TEXT UNIQUE NOT NULL
-    )
-    ''')
-
-    conn.commit()
-    conn.close()
-    
-
+        driver.quit()
+    finally:
+        process = getattr(driver, "chrome_process", None)
+        if process:
+            process.terminate()
 
 
 # Function to load root profiles from a JSON file
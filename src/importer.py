@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import codecs
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import UpdateOne, InsertOne
+from pymongo.errors import BulkWriteError
+from src.urls import canonical_profile_url
+
+
+# Characters allowed between documents: whitespace for JSONL, plus the brackets
+# and commas of a JSON array
+SEPARATORS = " \t\r\n,[]"
+
+
+def iter_json_documents(file_path, offset=0, chunk_size=1 << 20):
+    """
+    Stream the documents of a JSON array or JSONL file without loading the whole file.
+
+    Args:
+        file_path: Path of a JSON array (e.g. scraped_profiles.json) or JSONL file.
+        offset: Byte offset to resume from; must be one returned by a previous call.
+        chunk_size: Bytes read at a time.
+
+    Yields:
+        (document, offset) pairs, offset being the byte position right after the document.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    text, index = "", 0
+    position = offset
+    eof = False
+    with open(file_path, "rb") as file:
+        file.seek(offset)
+        while True:
+            # Skip separators, counting their bytes (all ASCII)
+            start = index
+            while index < len(text) and text[index] in SEPARATORS:
+                index += 1
+            position += index - start
+
+            document = None
+            if index < len(text):
+                try:
+                    document, end = decoder.raw_decode(text, index)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+            elif eof:
+                return
+
+            if document is None:
+                # Need more input: keep only the unparsed tail and read the next chunk
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                text, index = text[index:] + utf8.decode(chunk, final=eof), 0
+                continue
+
+            position += len(text[index:end].encode("utf-8"))
+            index = end
+            yield document, position
+
+
+def read_checkpoint(checkpoint_path, source_path):
+    """
+    Return the byte offset recorded for source_path, or 0 if there is none.
+    """
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path, "r") as file:
+        checkpoint = json.load(file)
+    if checkpoint.get("source") != os.path.abspath(source_path):
+        logging.warning(f"Ignoring checkpoint {checkpoint_path}, it belongs to {checkpoint.get('source')}.")
+        return 0
+    return checkpoint["offset"]
+
+
+def write_checkpoint(checkpoint_path, source_path, offset):
+    """
+    Atomically record that everything before offset has been imported.
+    """
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump({"source": os.path.abspath(source_path), "offset": offset}, file)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _operation(document, key):
+    if key and document.get(key):
+        if key == "profile_url":
+            # Keep a URL that does not canonicalize as it is, rather than upserting every such document onto None
+            document[key] = canonical_profile_url(document[key]) or document[key]
+        return UpdateOne({key: document[key]}, {"$set": document}, upsert=True)
+    return InsertOne(document)
+
+
+def _write_batch(collection, operations):
+    """
+    Write one batch; returns the number of documents that failed.
+    """
+    try:
+        collection.bulk_write(operations, ordered=False)
+        return 0
+    except BulkWriteError as e:
+        # Unordered: everything but the failed documents was written
+        errors = e.details.get("writeErrors", [])
+        logging.error(f"{len(errors)} documents failed to import, first error: {errors[0]['errmsg'] if errors else e}")
+        return len(errors)
+
+
+def import_to_mongo(file_path, collection, key="profile_url", batch_size=1000, workers=4,
+                    checkpoint_path=None, report_every=10.0):
+    """
+    Stream a JSON array or JSONL file into a MongoDB collection in bounded batches.
+
+    Documents are upserted by key (inserted if they lack it) with unordered bulk
+    writes running on a small thread pool. At most workers + 1 batches are held in
+    memory at once. With a checkpoint_path the byte offset up to which every batch
+    has been written is recorded, so an interrupted import resumes where it stopped;
+    the checkpoint is removed once the import completes.
+
+    Args:
+        file_path: Path of the JSON array or JSONL file.
+        collection: pymongo (or mongomock) collection to import into.
+        key: Field used to upsert documents, None to always insert.
+        batch_size: Documents per bulk write.
+        workers: Bulk writes running concurrently.
+        checkpoint_path: Optional file recording the import progress.
+        report_every: Seconds between progress log lines.
+
+    Returns:
+        A summary with the number of documents, failed documents, elapsed seconds and docs/sec.
+    """
+    offset = read_checkpoint(checkpoint_path, file_path)
+    if offset:
+        logging.info(f"Resuming import of {file_path} at byte {offset}.")
+
+    start = last_report = time.perf_counter()
+    documents = errors = 0
+    pending = []  # (future, end offset) in file order
+
+    def settle(wait_all=False):
+        # Collect finished batches in file order (waiting while too many are in flight)
+        # and advance the checkpoint past them
+        nonlocal errors
+        settled = None
+        while pending and (wait_all or len(pending) > workers or pending[0][0].done()):
+            future, end = pending.pop(0)
+            errors += future.result()
+            settled = end
+        if settled is not None and checkpoint_path:
+            write_checkpoint(checkpoint_path, file_path, settled)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        operations = []
+        for document, end in iter_json_documents(file_path, offset):
+            operations.append(_operation(document, key))
+            if len(operations) < batch_size:
+                continue
+            pending.append((executor.submit(_write_batch, collection, operations), end))
+            documents += len(operations)
+            operations = []
+            settle()
+
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                logging.info(f"Imported {documents} documents ({documents / (now - start):.0f} docs/s).")
+                last_report = now
+
+        if operations:
+            pending.append((executor.submit(_write_batch, collection, operations), end))
+            documents += len(operations)
+        settle(wait_all=True)
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "documents": documents,
+        "errors": errors,
+        "elapsed": elapsed,
+        "docs_per_second": documents / elapsed if elapsed > 0 else 0.0,
+    }
+    logging.info(f"Imported {documents} documents from {file_path} into {collection.name} in {elapsed:.1f}s "
+                 f"({summary['docs_per_second']:.0f} docs/s, {errors} failed).")
+    return summary
@@ -0,0 +1,226 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Seconds; covers fast in-process lookups up to full selector timeouts and page loads
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+# Bytes; from a bare HTML document up to a fully loaded profile with images and video
+BYTE_BUCKETS = tuple(2 ** power for power in range(14, 26))
+
+_lock = threading.Lock()
+_metrics = []
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter, optionally split by labels.
+    """
+
+    type = "counter"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        with _lock:
+            _metrics.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with _lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def _samples(self):
+        return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """
+    Value that can go up and down, optionally split by labels.
+    """
+
+    type = "gauge"
+
+    def set(self, value, **labels):
+        with _lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed durations, optionally split by labels.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values = {}
+        with _lock:
+            _metrics.append(self)
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with _lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the wall time of the enclosed block, also when it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        with _lock:
+            series = self._values.get(_label_key(labels))
+            return series["count"] if series else 0
+
+    def _samples(self):
+        samples = []
+        for key, series in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["counts"]):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", key + (("le", _format_value(bound)),), cumulative))
+            samples.append((f"{self.name}_sum", key, series["sum"]))
+            samples.append((f"{self.name}_count", key, series["count"]))
+        return samples
+
+
+# Metrics recorded by the scraper
+PAGE_LOAD_SECONDS = Histogram("scraper_page_load_seconds", "Time spent in driver.get for a profile page.")
+PAGE_BYTES = Histogram("scraper_page_bytes", "Bytes transferred for a profile page, by blocking (on, off).", buckets=BYTE_BUCKETS)
+PAGE_NETWORK_SECONDS = Histogram("scraper_page_network_seconds", "Time until a profile page's last response, by blocking (on, off).")
+SCROLL_SECONDS = Histogram("scraper_scroll_seconds", "Time spent in scroll_and_load.")
+SECTION_SECONDS = Histogram("scraper_section_seconds", "Time spent extracting one profile section, by section and engine.")
+WAIT_SECONDS = Histogram("scraper_wait_seconds", "Time spent waiting for a selector, by outcome (found or timeout).")
+PROFILE_SECONDS = Histogram("scraper_profile_seconds", "Time spent on one profile, from navigation to saved output.")
+RETRIES = Counter("scraper_retries_total", "Retries made by the retry decorator, by function.")
+TIMEOUTS = Counter("scraper_timeouts_total", "Selector waits that ran into their timeout, by function (and field key for registry lookups).")
+GIVE_UPS = Counter("scraper_retry_exhausted_total", "Calls that failed after every retry, by function.")
+PROFILES = Counter("scraper_profiles_total", "Profiles processed, by outcome (scraped, failed, skipped).")
+PROFILE_WRITES = Counter("scraper_profile_writes_total", "Records written for scraped profiles, by kind (full, delta, unchanged).")
+SECTIONS_SKIPPED = Counter("scraper_sections_skipped_total", "Sections skipped because their anchor was absent, by section.")
+SESSIONS = Counter("scraper_sessions_total", "Browser sessions made ready, by outcome (existing, restored, login, failed).")
+LINKS_DISCOVERED = Counter("scraper_links_discovered_total", "Profile links found on scraped pages.")
+LEASES = Counter("scraper_leases_total", "Frontier leases of the coordinator, by kind (fresh, reclaimed, lost).")
+START_TIME = Gauge("scraper_start_time_seconds", "Unix time at which the scraper started.")
+START_TIME.set(time.time())
+
+
+def render():
+    """
+    Render every metric in the Prometheus text exposition format.
+    """
+    lines = []
+    with _lock:
+        for metric in _metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, key, value in metric._samples():
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(file_path):
+    """
+    Atomically write the current metrics to a file, e.g. for the node_exporter
+    textfile collector.
+    """
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(render())
+    os.replace(temp_path, file_path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the log
+
+
+def start_http_server(port, host="127.0.0.1"):
+    """
+    Serve the metrics at http://host:port/metrics from a background thread.
+
+    Returns:
+        The server; call shutdown() on it to stop serving.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    logging.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+    return server
+
+
+def start_textfile_writer(file_path, interval=15.0):
+    """
+    Rewrite the metrics file every interval seconds from a background thread.
+
+    Returns:
+        An Event; set it to stop the writer.
+    """
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            try:
+                write_textfile(file_path)
+            except OSError as e:
+                logging.warning(f"Could not write metrics to {file_path}: {e}")
+
+    threading.Thread(target=loop, name="metrics-textfile", daemon=True).start()
+    logging.info(f"Writing metrics to {file_path} every {interval:.0f}s")
+    return stop
@@ -0,0 +1,222 @@
+import time
+import logging
+import threading
+from src.crawler import crawl_profile
+from src.helper import close_chrome
+from src.prefetch import TabPrefetcher
+from src.metrics import PROFILES
+
+
+class WorkerPool:
+    """
+    Scrapes profiles concurrently with one browser per worker thread.
+
+    All workers pull from the same CrawlState frontier (whose claims keep them
+    from scraping the same profile twice) and write to the same sink. A worker
+    whose browser keeps failing is restarted, and if that fails it stops on its
+    own; the remaining workers carry on.
+    """
+
+    def __init__(self, driver_factories, state, sink, engine="snapshot", pace=None,
+                 crawl=crawl_profile, prefetch=False, max_consecutive_errors=3, idle_poll=1.0):
+        """
+        Args:
+            driver_factories: One callable per worker that returns a ready WebDriver.
+            state: CrawlState shared by all workers.
+            sink: Output sink shared by all workers.
+            engine: Extraction engine passed to the crawl function.
+            pace: Optional callable invoked before every profile visit (rate limiting).
+            crawl: Function scraping one profile, see crawl_profile.
+            prefetch: Load each worker's next profile in a second tab while the
+                current one is extracted (see src/prefetch.py).
+            max_consecutive_errors: Errors in a row after which a worker restarts its browser.
+            idle_poll: Seconds an idle worker waits before checking the frontier again.
+        """
+        self.driver_factories = driver_factories
+        self.state = state
+        self.sink = sink
+        self.engine = engine
+        self.pace = pace
+        self.crawl = crawl
+        self.prefetch = prefetch
+        self.max_consecutive_errors = max_consecutive_errors
+        self.idle_poll = idle_poll
+        self.stats = [{"worker": i, "scraped": 0, "failed": 0, "restarts": 0, "alive": False}
+                      for i in range(len(driver_factories))]
+        self._busy = 0
+        self._busy_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self):
+        """
+        Ask every worker to finish its current profile and exit.
+        """
+        self._stop.set()
+
+    def _claim(self):
+        """
+        Claim the next profile. Returns None once the frontier is empty and no
+        other worker is still scraping (and therefore able to discover more). In a
+        sharded crawl the frontier also holds other nodes' profiles, so the worker
+        keeps waiting until all of them are finished.
+        """
+        while not self._stop.is_set():
+            with self._busy_lock:
+                profile_url = self.state.pop()
+                if profile_url is not None:
+                    self._busy += 1
+                    return profile_url
+                if self._busy == 0 and not self.state.pending_count():
+                    return None
+            time.sleep(self.idle_poll)
+        return None
+
+    def _claim_next(self):
+        """
+        Claim a profile to prefetch if one is queued right now, without waiting.
+        """
+        if self._stop.is_set():
+            return None
+        with self._busy_lock:
+            profile_url = self.state.pop()
+            if profile_url is not None:
+                self._busy += 1
+            return profile_url
+
+    def _start_prefetcher(self, index, driver):
+        if not self.prefetch or driver is None:
+            return None
+        try:
+            return TabPrefetcher(driver)
+        except Exception as e:
+            logging.warning(f"Worker {index}: could not open a prefetch tab, loading profiles one at a time: {e}")
+            return None
+
+    def _release(self):
+        with self._busy_lock:
+            self._busy -= 1
+
+    def _start_driver(self, index):
+        try:
+            return self.driver_factories[index]()
+        except Exception as e:
+            logging.error(f"Worker {index}: could not start browser: {e}")
+            return None
+
+    def _close_driver(self, index, driver):
+        try:
+            close_chrome(driver)
+        except Exception as e:
+            logging.warning(f"Worker {index}: error while closing browser: {e}")
+
+    def _work(self, index):
+        stats = self.stats[index]
+        driver = self._start_driver(index)
+        if driver is None:
+            return
+        stats["alive"] = True
+        consecutive_errors = 0
+        prefetcher = self._start_prefetcher(index, driver)
+        next_url = None
+        paced = False
+
+        try:
+            while True:
+                if next_url is not None:
+                    # Already paced and loading in the background tab since the last profile
+                    profile_url, next_url = next_url, None
+                    preloaded = prefetcher is not None and prefetcher.pending == profile_url
+                else:
+                    # Pace before claiming, so a profile is never held while waiting for the budget
+                    if self.pace and not paced:
+                        self.pace()
+                    paced = False
+                    profile_url = self._claim()
+                    if profile_url is None:
+                        break
+                    preloaded = False
+                try:
+                    if preloaded:
+                        prefetcher.swap()
+                    if prefetcher:
+                        # One visit each: the next profile is paced here and never again; if
+                        # none is queued yet, the pace carries over to the next claim
+                        if self.pace:
+                            self.pace()
+                        next_url = self._claim_next()
+                        paced = next_url is None
+                        if next_url is not None:
+                            try:
+                                prefetcher.start(next_url)
+                            except Exception as e:
+                                logging.warning(f"Worker {index}: prefetching {next_url} failed, loading it later: {e}")
+                    scraped = self.crawl(driver, profile_url, self.state, self.sink, engine=self.engine, preloaded=preloaded)
+                    if scraped:
+                        stats["scraped"] += 1
+                    elif scraped is False:
+                        # None: the profile was visited already and skipped
+                        stats["failed"] += 1
+                    consecutive_errors = 0
+                except Exception as e:
+                    self.state.mark_failed(profile_url, str(e))
+                    PROFILES.inc(outcome="failed")
+                    stats["failed"] += 1
+                    consecutive_errors += 1
+                    logging.error(f"Worker {index}: error while scraping profile {profile_url}: {e}")
+                finally:
+                    self._release()
+
+                if consecutive_errors >= self.max_consecutive_errors:
+                    logging.warning(f"Worker {index}: {consecutive_errors} errors in a row, restarting browser.")
+                    self._close_driver(index, driver)
+                    driver = self._start_driver(index)
+                    if driver is None:
+                        break
+                    prefetcher = self._start_prefetcher(index, driver)
+                    stats["restarts"] += 1
+                    consecutive_errors = 0
+        finally:
+            if next_url is not None:
+                # Claimed but never scraped; give it back to the other workers
+                self.state.release(next_url)
+                self._release()
+            stats["alive"] = False
+            if driver is not None:
+                self._close_driver(index, driver)
+            logging.info(f"Worker {index} stopped: {stats['scraped']} scraped, {stats['failed']} failed.")
+
+    def run(self):
+        """
+        Run all workers until the frontier is exhausted or stop() is called.
+
+        Returns:
+            A summary with the elapsed time, profiles per second and per-worker stats.
+        """
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._work, args=(i,), name=f"worker-{i}", daemon=True)
+                   for i in range(len(self.driver_factories))]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1.0)
+        except KeyboardInterrupt:
+            logging.info("Interrupted, waiting for workers to finish their current profile...")
+            self.stop()
+            for thread in threads:
+                thread.join()
+
+        elapsed = time.perf_counter() - start
+        scraped = sum(stats["scraped"] for stats in self.stats)
+        summary = {
+            "workers": len(self.driver_factories),
+            "scraped": scraped,
+            "failed": sum(stats["failed"] for stats in self.stats),
+            "elapsed": elapsed,
+            "profiles_per_second": scraped / elapsed if elapsed > 0 else 0.0,
+            "per_worker": self.stats,
+        }
+        logging.info(f"Pool finished: {scraped} profiles with {summary['workers']} workers "
+                     f"in {elapsed:.1f}s ({summary['profiles_per_second']:.3f} profiles/s).")
+        return summary
@@ -0,0 +1,63 @@
+import logging
+
+
+# Assigning location returns at once, unlike driver.get which blocks until the page has loaded
+NAVIGATE_SCRIPT = "window.location.href = arguments[0];"
+
+
+class TabPrefetcher:
+    """
+    Loads the next profile in a second tab of the same browser while the
+    current one is being extracted.
+
+    start(url) begins the navigation in the background tab and returns
+    immediately; swap() then brings that tab to the front, where the page has
+    been loading in the meantime, and the previous tab becomes the background
+    tab for the next prefetch. Scrolling still happens in the foreground, since
+    Chrome throttles timers in background tabs.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pending = None
+        front = driver.current_window_handle
+        driver.switch_to.new_window("tab")
+        self.handles = [front, driver.current_window_handle]
+        driver.switch_to.window(front)
+
+    def start(self, url):
+        """
+        Begin loading url in the background tab without waiting for it.
+        """
+        self.driver.switch_to.window(self.handles[1])
+        try:
+            blocker = getattr(self.driver, "resource_blocker", None)
+            if blocker:
+                blocker.before_visit()
+            self.driver.execute_script(NAVIGATE_SCRIPT, url)
+        finally:
+            self.driver.switch_to.window(self.handles[0])
+        self.pending = url
+
+    def swap(self):
+        """
+        Bring the background tab to the front.
+
+        Returns:
+            The URL it was started on.
+        """
+        self.handles.reverse()
+        self.driver.switch_to.window(self.handles[0])
+        url, self.pending = self.pending, None
+        return url
+
+    def close(self):
+        """
+        Close the background tab, leaving the driver on the front one.
+        """
+        try:
+            self.driver.switch_to.window(self.handles[1])
+            self.driver.close()
+            self.driver.switch_to.window(self.handles[0])
+        except Exception as e:
+            logging.warning(f"Could not close the prefetch tab: {e}")
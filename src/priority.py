@@ -0,0 +1,57 @@
+import json
+import math
+import hashlib
+import logging
+
+
+class PriorityRules:
+    """
+    Scores frontier entries so each visit goes to the most valuable profile.
+
+        score = boost(card text) + reference_weight * ln(1 + references) - depth_weight * depth
+
+    depth is the distance from the seed profiles in ROOT, references the number of
+    scraped profiles that linked to the entry, and boost the sum of the weights of
+    every keyword found in the text of the card the link was discovered in.
+    """
+
+    def __init__(self, depth_weight=1.0, reference_weight=2.0, retry_penalty=1.0, boosts=None):
+        self.depth_weight = depth_weight
+        self.reference_weight = reference_weight
+        self.retry_penalty = retry_penalty
+        self.boosts = [(rule["keyword"].lower(), float(rule["weight"])) for rule in (boosts or [])]
+
+    @classmethod
+    def from_file(cls, file_path):
+        """
+        Load rules from a JSON file, e.g.
+        {"depth_weight": 1.0, "reference_weight": 2.0, "boosts": [{"keyword": "jakarta", "weight": 3}]}
+        """
+        try:
+            with open(file_path, 'r') as file:
+                config = json.load(file)
+        except FileNotFoundError:
+            logging.error(f"Priority rules file {file_path} not found, using default rules.")
+            return cls()
+        return cls(
+            depth_weight=config.get("depth_weight", 1.0),
+            reference_weight=config.get("reference_weight", 2.0),
+            retry_penalty=config.get("retry_penalty", 1.0),
+            boosts=config.get("boosts"),
+        )
+
+    def fingerprint(self):
+        """
+        Identify the rules, so stored scores can be recomputed when they change.
+        """
+        rules = [self.depth_weight, self.reference_weight, self.retry_penalty, self.boosts]
+        return hashlib.sha1(json.dumps(rules).encode("utf-8")).hexdigest()
+
+    def boost(self, text):
+        if not text:
+            return 0.0
+        text = text.lower()
+        return sum(weight for keyword, weight in self.boosts if keyword in text)
+
+    def score(self, depth, references, boost):
+        return boost + self.reference_weight * math.log1p(references) - self.depth_weight * depth
@@ -0,0 +1,110 @@
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from src.archive import PageArchive, find_pages
+from src.scrape import scrape_html
+from src.urls import canonical_profile_url
+
+
+# Archive opened once in every worker process (see _open_archive)
+_archive = None
+
+
+def _open_archive(directory):
+    global _archive
+    _archive = PageArchive(directory, read_only=True)
+
+
+def _extract_file(task):
+    file_path, profile_url = task
+    with open(file_path, "rb") as file:
+        return profile_url, scrape_html(file.read(), profile_url)
+
+
+def _extract_archived(task):
+    profile_url, digest = task
+    return profile_url, scrape_html(_archive.read_blob(digest), profile_url)
+
+
+def file_tasks(paths):
+    """
+    (file, profile URL) pairs for saved pages; a page named <slug>.html is taken
+    to be the profile https://www.linkedin.com/in/<slug>/.
+    """
+    for file_path in find_pages(paths):
+        slug = os.path.splitext(os.path.basename(file_path))[0]
+        yield file_path, canonical_profile_url(f"https://www.linkedin.com/in/{slug}/")
+
+
+def archive_tasks(directory):
+    """
+    (profile URL, content hash) pairs for the latest capture of every archived profile.
+    """
+    with PageArchive(directory, read_only=True) as archive:
+        tasks = [(url, digest) for url, _, digest in archive.latest()]
+    return tasks
+
+
+def reextract(sink, paths=(), archive_dir=None, workers=None, window=None):
+    """
+    Run the section extractors over saved pages on all cores, without a browser.
+
+    Args:
+        sink: Output sink with a write(record) method, written from this process only.
+        paths: HTML files or directories of them.
+        archive_dir: Directory of a PageArchive; its latest capture of every profile is used.
+        workers: Worker processes (default: one per core).
+        window: Maximum pages being extracted or waiting to be written at once.
+
+    Returns:
+        A summary with the number of profiles extracted and failed, elapsed seconds
+        and profiles per second.
+    """
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 8
+    if archive_dir:
+        tasks, extract = archive_tasks(archive_dir), _extract_archived
+        pool = ProcessPoolExecutor(workers, initializer=_open_archive, initargs=(archive_dir,))
+    else:
+        tasks, extract = file_tasks(paths), _extract_file
+        pool = ProcessPoolExecutor(workers)
+
+    start = time.perf_counter()
+    extracted = failed = 0
+
+    def collect(future):
+        nonlocal extracted, failed
+        try:
+            profile_url, profile_data = future.result()
+        except Exception as e:
+            logging.error(f"Re-extraction failed: {e}")
+            failed += 1
+            return
+        if profile_data and profile_data.get("intro"):
+            sink.write({"profile_url": profile_url, **profile_data})
+            extracted += 1
+        else:
+            logging.warning(f"No intro found when re-extracting {profile_url}.")
+            failed += 1
+
+    with pool:
+        # Keep a bounded window of pages in flight, written in input order
+        pending = []
+        for task in tasks:
+            pending.append(pool.submit(extract, task))
+            if len(pending) >= window:
+                collect(pending.pop(0))
+        for future in pending:
+            collect(future)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "extracted": extracted,
+        "failed": failed,
+        "elapsed": elapsed,
+        "profiles_per_second": extracted / elapsed if elapsed > 0 else 0.0,
+    }
+    logging.info(f"Re-extracted {extracted} profiles ({failed} failed) with {workers} processes "
+                 f"in {elapsed:.1f}s ({summary['profiles_per_second']:.1f} profiles/s).")
+    return summary
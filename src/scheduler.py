@@ -0,0 +1,112 @@
+import time
+import random
+import logging
+import threading
+
+
+class CrawlScheduler:
+    """
+    Paces profile visits with a token bucket, a jittered minimum gap between
+    visits and an optional daily budget.
+
+    One scheduler is shared by every worker in the process, so the limits hold
+    for all browsers together. Only call acquire() right before an actual page
+    visit; profiles that are skipped must not consume budget.
+
+    The clocks, sleep function and random source can be injected so the
+    scheduler can be driven deterministically.
+    """
+
+    def __init__(self, rate_per_hour=25, burst=3, daily_budget=None, min_interval=20.0, jitter=0.5,
+                 clock=time.monotonic, wall_clock=time.time, sleep=time.sleep, rng=None):
+        """
+        Args:
+            rate_per_hour: Sustained number of visits allowed per hour.
+            burst: Maximum number of visits that can be made back-to-back after idling.
+            daily_budget: Maximum visits per calendar day (None for no limit).
+            min_interval: Minimum seconds between two consecutive visits.
+            jitter: Random extra fraction added to every wait (0.5 means up to +50%).
+            clock: Monotonic clock used for refills and gaps.
+            wall_clock: Wall clock used to find the calendar day.
+            sleep: Function used to wait.
+            rng: random.Random instance used for jitter.
+        """
+        if rate_per_hour <= 0:
+            raise ValueError("rate_per_hour must be positive.")
+        self.rate = rate_per_hour / 3600.0
+        self.burst = max(1, burst)
+        self.daily_budget = daily_budget
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._last_refill = clock()
+        self._next_allowed = self._last_refill
+        self._day = None
+        self._day_count = 0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _seconds_until_tomorrow(self):
+        wall = self.wall_clock()
+        today = time.localtime(wall)
+        midnight = time.mktime((today.tm_year, today.tm_mon, today.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+        return max(1.0, midnight - wall)
+
+    def try_acquire(self):
+        """
+        Take one visit if allowed right now.
+
+        Returns:
+            0.0 if the visit was granted, otherwise the number of seconds to wait
+            before trying again.
+        """
+        with self._lock:
+            today = time.strftime("%Y-%m-%d", time.localtime(self.wall_clock()))
+            if today != self._day:
+                self._day = today
+                self._day_count = 0
+            if self.daily_budget is not None and self._day_count >= self.daily_budget:
+                return self._seconds_until_tomorrow()
+
+            now = self.clock()
+            self._refill(now)
+            wait = max(0.0, self._next_allowed - now)
+            if self._tokens < 1:
+                wait = max(wait, (1 - self._tokens) / self.rate)
+            if wait > 0:
+                return wait
+
+            self._tokens -= 1
+            self._day_count += 1
+            gap = self.min_interval * (1 + self.rng.uniform(0, self.jitter))
+            self._next_allowed = now + gap
+            return 0.0
+
+    def acquire(self):
+        """
+        Block until a visit is allowed, then take it.
+        Returns the total number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return waited
+            # Jitter the wait so visits do not land on a fixed beat (bounded by one visit interval)
+            wait += self.rng.uniform(0, self.jitter) * min(wait, max(self.min_interval, 1 / self.rate))
+            if wait >= 600:
+                logging.info(f"Crawl budget exhausted, pausing for {wait / 60:.0f} minutes...")
+            self.sleep(wait)
+            waited += wait
+
+    def visits_today(self):
+        with self._lock:
+            return self._day_count
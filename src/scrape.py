@@ -1,19 +1,14 @@
 import logging
+import time
 from urllib.parse import urlparse, urlunparse
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.by import By
-from src.helper import mimic_human_interaction, scroll_and_load, get_object, get_objects, extract_elements
-
-
-# Setup logging to file and console
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("./log/scraping.log"),  # Log to file
-        # logging.StreamHandler(),  # Log to console
-    ]
-)
+from src.helper import mimic_human_interaction, scroll_and_load, wait_for_load, get_object, get_objects, extract_elements
+from src.snapshot import SnapshotPage
+from src.batch import extract_sections_batched
+from src.urls import canonical_profile_url
+from src.selector_registry import find, find_text, get_registry
+from src.metrics import PAGE_LOAD_SECONDS, SCROLL_SECONDS, SECTION_SECONDS, SECTIONS_SKIPPED
 
 
 def extract_intro(driver):
@@ -23,34 +18,27 @@ def extract_intro(driver):
     intro_data = {}
 
     try:
-        intro_xpath = "//div[contains(@class, 'mt2 relative')]"
-        intro = get_object(driver, By.XPATH, intro_xpath)
+        intro = find(driver, "intro.container")
 
         if intro:
             # Extract name
-            name_xpath = ".//h1[contains(@class, 'text-heading-xlarge')]"
-            intro_data["name"] = extract_elements(intro, By.XPATH, name_xpath)
+            intro_data["name"] = find_text(intro, "intro.name")
 
             # Extract pronouns
-            pronouns_xpath = ".//span[contains(@class, 'text-body-small v-align-middle')]"
-            intro_data["pronouns"] = extract_elements(intro, By.XPATH, pronouns_xpath)
+            intro_data["pronouns"] = find_text(intro, "intro.pronouns")
 
             # Extract workplace
-            works_at_xpath = ".//div[contains(@class, 'text-body-medium break-words')]"
-            intro_data["works_at"] = extract_elements(intro, By.XPATH, works_at_xpath)
+            intro_data["works_at"] = find_text(intro, "intro.works_at")
 
             # Extract location
-            location_xpath = ".//span[contains(@class, 'text-body-small inline t-black--light break-words')]"
-            intro_data["location"] = extract_elements(intro, By.XPATH, location_xpath)
+            intro_data["location"] = find_text(intro, "intro.location")
 
             # Extract followers and connections
-            followers_xpath = "//p[contains(@class, 'pvs-header__optional-link')]//span[contains(text(), 'followers')]"
-            connections_xpath = "//li[@class='text-body-small']//span[@class='t-bold']"
             try:
-                intro_data["followers"] = extract_elements(driver, By.XPATH, followers_xpath).split()[0]
+                intro_data["followers"] = find_text(driver, "intro.followers").split()[0]
             except:
                 intro_data["followers"] = None
-            intro_data["connections"] = extract_elements(driver, By.XPATH, connections_xpath)
+            intro_data["connections"] = find_text(driver, "intro.connections")
 
         else:
             logging.error("Intro section not found.")
@@ -74,8 +62,7 @@ def extract_about(driver):
     Extracts the 'About' section from the LinkedIn profile.
     """
     try:
-        xpath_about = "//section[contains(@class, 'artdeco-card pv-profile-card')]//h2[span[text()='About']]/ancestor::section//div[contains(@class, 'full-width')]//span[@aria-hidden='true']"
-        about_description = extract_elements(driver, By.XPATH, xpath_about)
+        about_description = find_text(driver, "about.description")
 
         return {"about_description": about_description or ""}
     except Exception:
@@ -89,45 +76,37 @@ def extract_experience(driver):
     """
     experience_data = []
     try:
-        scroll_and_load(driver)
-
-        experience_elements = get_objects(
-            driver, By.XPATH,
-            "//div[@id='experience']/ancestor::section//ul/li[contains(@class, 'artdeco-list__item')]"
-        )
+        experience_elements = find(driver, "experience.entries", multiple=True)
 
         for experience in experience_elements:
             experience_dict = {}
 
-            nested_experiences = get_objects(
-                experience, By.XPATH,
-                ".//div[contains(@class, 'pvs-entity__sub-components')]/ul/li/div[contains(@data-view-name, 'profile-component-entity')]"
-            ) or None
+            nested_experiences = find(experience, "experience.nested", multiple=True) or None
 
             if nested_experiences:
                 try:
-                    company_name = extract_elements(experience, By.XPATH, ".//div[contains(@class, 'flex-wrap')]").split("\n")[0]
+                    company_name = find_text(experience, "experience.header").split("\n")[0]
                 except:
                     company_name = None
                 
                 try:
-                    location = extract_elements(experience, By.XPATH, ".//a[@data-field='experience_company_logo']//span[contains(@class, 't-black--light')]").split("\n")[0]
+                    location = find_text(experience, "experience.logo_location").split("\n")[0]
                 except:
                     location = None
                 
                 for nested_exp in nested_experiences:
                     try:
-                        job_title = extract_elements(nested_exp, By.XPATH, ".//div[@class='display-flex flex-wrap align-items-center full-height']").split("\n")[0]
+                        job_title = find_text(nested_exp, "experience.nested_job_title").split("\n")[0]
                     except:
                         job_title = None
                     
                     try:
-                        type = extract_elements(nested_exp, By.XPATH, ".//span[@class='t-14 t-normal']").split()[0]
+                        type = find_text(nested_exp, "experience.nested_type").split()[0]
                     except:
                         type = None
                         
-                    dates = extract_elements(nested_exp, By.XPATH, './/span[contains(@class, "t-black--light")]/span')
-                    description = extract_elements(nested_exp, By.XPATH, ".//div[contains(@class,'inline-show-more-text--is-collapsed') and not(contains(@class, 'break-words'))]")
+                    dates = find_text(nested_exp, "experience.nested_dates")
+                    description = find_text(nested_exp, "experience.nested_description")
 
                     experience_dict = {
                         "company_name": company_name,
@@ -141,14 +120,14 @@ def extract_experience(driver):
 
             else:
                 try:
-                    company_type = extract_elements(experience, By.XPATH, ".//span[@class='t-14 t-normal']").split("\n")[0].split("·")
+                    company_type = find_text(experience, "experience.company_type").split("\n")[0].split("·")
                 except:
                     company_name = None
                 company_name, type = company_type[0], company_type[1]
-                job_title = extract_elements(experience, By.XPATH, ".//div[contains(@class, 'flex-wrap')]")
-                dates = extract_elements(experience, By.XPATH, './/span[contains(@class, "t-black--light")]/span')
-                location = extract_elements(experience, By.XPATH, ".//span[contains(@class, 't-black--light')]//span[@aria-hidden='true']")
-                description = extract_elements(experience, By.XPATH, ".//li[contains(@class, 'pvs-list__item--with-top-padding')]//div[contains(@class, 'inline-show-more-text--is-collapsed')]")
+                job_title = find_text(experience, "experience.header")
+                dates = find_text(experience, "experience.dates")
+                location = find_text(experience, "experience.location")
+                description = find_text(experience, "experience.description")
 
                 experience_data.append({
                     "company_name": company_name,
@@ -170,22 +149,19 @@ def extract_education(driver):
     """
     educations = []
     try:
-        education_entries = get_objects(driver, By.XPATH, "//div[@id='education']/ancestor::section//ul/li[contains(@class, 'artdeco-list__item')]")
+        education_entries = find(driver, "education.entries", multiple=True)
 
         for entry in education_entries:
             education_data = {}
 
             # Extract institution name
-            institution_xpath = ".//a[contains(@target, '_self')]//span[contains(@aria-hidden, 'true')]"
-            education_data["institution"] = extract_elements(entry, By.XPATH, institution_xpath)
+            education_data["institution"] = find_text(entry, "education.institution")
 
             # Extract degree and field of study
-            degree_field_xpath = ".//span[contains(@class, 't-14 t-normal')]"
-            education_data["degree_field"] = extract_elements(entry, By.XPATH, degree_field_xpath)
+            education_data["degree_field"] = find_text(entry, "education.degree_field")
 
             # Extract graduation year
-            graduation_year_xpath = ".//span[@class='pvs-entity__caption-wrapper']"
-            education_data["graduation_year"] = extract_elements(entry, By.XPATH, graduation_year_xpath)
+            education_data["graduation_year"] = find_text(entry, "education.graduation_year")
 
             educations.append(education_data)
 
@@ -200,26 +176,22 @@ def extract_certificates(driver):
     """
     certificates = []
     try:
-        certificate_entries = get_objects(driver, By.XPATH, "//div[@id='licenses_and_certifications']/ancestor::section//ul/li[contains(@class, 'artdeco-list__item')]")
+        certificate_entries = find(driver, "certificates.entries", multiple=True)
 
         for entry in certificate_entries:
             certificate_data = {}
 
             # Extract certificate name
-            cert_name_xpath = ".//div[contains(@class, 'display-flex')]//span[contains(@aria-hidden, 'true')]"
-            certificate_data["cert_name"] = extract_elements(entry, By.XPATH, cert_name_xpath)
+            certificate_data["cert_name"] = find_text(entry, "certificates.cert_name")
 
             # Extract issuing organization
-            issuer_xpath = ".//span[@class='t-14 t-normal']//span[contains(@aria-hidden, 'true')]"
-            certificate_data["issuer"] = extract_elements(entry, By.XPATH, issuer_xpath)
+            certificate_data["issuer"] = find_text(entry, "certificates.issuer")
 
             # Extract issue date
-            issue_date_xpath = ".//span[@class='pvs-entity__caption-wrapper' and contains(@aria-hidden, 'true')]"
-            certificate_data["issue_date"] = extract_elements(entry, By.XPATH, issue_date_xpath)
+            certificate_data["issue_date"] = find_text(entry, "certificates.issue_date")
 
             # Extract credential URL (if available)
-            credential_url_xpath = ".//a[contains(@class, 'artdeco-button')]"
-            certificate_data["credential_url"] = extract_elements(entry, By.XPATH, credential_url_xpath, attribute="href")
+            certificate_data["credential_url"] = find_text(entry, "certificates.credential_url", attribute="href")
 
             certificates.append(certificate_data)
 
@@ -234,30 +206,25 @@ def extract_project(driver):
     """
     projects = []
     try:
-        project_elements = get_objects(driver, By.XPATH, "//div[@id='projects']/ancestor::section//ul/li[contains(@class, 'artdeco-list__item')]")
+        project_elements = find(driver, "projects.entries", multiple=True)
 
         for project in project_elements:
             project_data = {}
 
             # Extract project title
-            title_xpath = ".//div[contains(@class, 'mr1 t-bold')]/span[@aria-hidden='true']"
-            project_data["project_title"] = extract_elements(project, By.XPATH, title_xpath)
+            project_data["project_title"] = find_text(project, "projects.project_title")
 
             # Extract project dates
-            dates_xpath = ".//span[@class='t-14 t-normal']"
-            project_data["dates"] = extract_elements(project, By.XPATH, dates_xpath)
+            project_data["dates"] = find_text(project, "projects.dates")
 
             # Extract associated organization
-            organization_xpath = ".//span[contains(text(), 'Associated with')]/following-sibling::span"
-            project_data["organization"] = extract_elements(project, By.XPATH, organization_xpath)
+            project_data["organization"] = find_text(project, "projects.organization")
 
             # Extract project description
-            description_xpath = ".//span[@aria-hidden='true']"
-            project_data["description"] = extract_elements(project, By.XPATH, description_xpath)
+            project_data["description"] = find_text(project, "projects.description")
 
             # Extract project link (if available)
-            link_xpath = ".//a[@class='optional-action-target-wrapper']"
-            project_data["link"] = extract_elements(project, By.XPATH, link_xpath, attribute="href")
+            project_data["link"] = find_text(project, "projects.link", attribute="href")
 
             projects.append(project_data)
 
@@ -272,22 +239,19 @@ def extract_volunteering(driver):
     """
     volunteers = []
     try:
-        volunteering_entries = get_objects(driver, By.XPATH, "//div[@id='volunteering_experience']/ancestor::section//ul/li[contains(@class, 'artdeco-list__item')]")
+        volunteering_entries = find(driver, "volunteering.entries", multiple=True)
 
         for entry in volunteering_entries:
             volunteer_data = {}
 
             # Extract role
-            role_xpath = ".//div[contains(@class,'t-bold')]"
-            volunteer_data["role"] = extract_elements(entry, By.XPATH, role_xpath)
+            volunteer_data["role"] = find_text(entry, "volunteering.role")
 
             # Extract organization
-            organization_xpath = ".//span[contains(@class, 't-14 t-normal')]"
-            volunteer_data["organization"] = extract_elements(entry, By.XPATH, organization_xpath)
+            volunteer_data["organization"] = find_text(entry, "volunteering.organization")
 
             # Extract duration
-            duration_xpath = ".//span[@class='pvs-entity__caption-wrapper']"
-            volunteer_data["duration"] = extract_elements(entry, By.XPATH, duration_xpath)
+            volunteer_data["duration"] = find_text(entry, "volunteering.duration")
 
             volunteers.append(volunteer_data)
 
@@ -302,19 +266,17 @@ def extract_skill(driver):
     """
     skills = []
     try:
-        skill_elements = get_objects(driver, By.XPATH, "//div[@id='skills']/ancestor::section//ul/li[contains(@class, 'artdeco-list__item')]")
+        skill_elements = find(driver, "skills.entries", multiple=True)
 
         for skill in skill_elements:
             skill_data = {}
             
             # Extract skill title
-            title_xpath = ".//div[contains(@class, 'hoverable-link-text')]/span[@aria-hidden='true']"
-            skill_data["title"] = extract_elements(skill, By.XPATH, title_xpath)
+            skill_data["title"] = find_text(skill, "skills.title")
 
             # Extract endorsements count
             try:
-                endorsements_xpath = ".//span[contains(@aria-hidden, 'true') and contains(text(), 'endorsements')]"
-                skill_data["endorsements"] = extract_elements(skill, By.XPATH, endorsements_xpath).split()[0]
+                skill_data["endorsements"] = find_text(skill, "skills.endorsements").split()[0]
             except:
                 skill_data["endorsements"] = None
                 pass
@@ -331,20 +293,17 @@ def extract_honor(driver):
     """
     honors = []
     try:
-        honors_xpath = "//div[@id='honors_and_awards']/ancestor::section//ul/li[contains(@class, 'artdeco-list__item')]"
-        honor_elements = get_objects(driver, By.XPATH, honors_xpath)
+        honor_elements = find(driver, "honors.entries", multiple=True)
 
         for honor in honor_elements:
             honor_data = {}
 
             # Extract honor title
-            title_xpath = ".//div[contains(@class, 't-bold')]/span"
-            honor_data["title"] = extract_elements(honor, By.XPATH, title_xpath)
+            honor_data["title"] = find_text(honor, "honors.title")
 
             # Extract issuing organization
-            issuer_xpath = ".//span[contains(@class, 't-14 t-normal')]"
             try:
-                issuer_data = extract_elements(honor, By.XPATH, issuer_xpath).split("·")
+                issuer_data = find_text(honor, "honors.issuer").split("·")
             except:
                 issuer_data = None
                 
@@ -364,19 +323,17 @@ def extract_organizations(driver):
     """
     organizations = []
     try:
-        organization_entries = get_objects(driver, By.XPATH, "//div[@id='organizations']/ancestor::section//ul/li[contains(@class, 'artdeco-list__item')]")
+        organization_entries = find(driver, "organizations.entries", multiple=True)
 
         for entry in organization_entries:
             organization_data = {}
 
             # Extract organization name
-            name_xpath = ".//div[contains(@class,'t-bold')]"
-            organization_data["organization_name"] = extract_elements(entry, By.XPATH, name_xpath)
+            organization_data["organization_name"] = find_text(entry, "organizations.organization_name")
 
             # Extract role and duration
-            role_duration_xpath = ".//span[contains(@class, 't-14 t-normal')]"
             try:
-                role_duration = extract_elements(entry, By.XPATH, role_duration_xpath).split("·")
+                role_duration = find_text(entry, "organizations.role_duration").split("·")
             except:
                 role_duration = None
                 
@@ -384,8 +341,7 @@ def extract_organizations(driver):
             organization_data["duration"] = role_duration[1].strip() if len(role_duration) > 1 else None
 
             # Extract description
-            description_xpath = ".//li[contains(@class, 'pvs-list__item--with-top-padding')]//div[contains(@class, 't-14 t-normal t-black')]"
-            organization_data["description"] = extract_elements(entry, By.XPATH, description_xpath)
+            organization_data["description"] = find_text(entry, "organizations.description")
 
             organizations.append(organization_data)
 
@@ -394,48 +350,157 @@ def extract_organizations(driver):
     return organizations
 
 
-def scrape_profile(driver, profile_url, visited_profiles):
+# Extractor of every section, keyed by its field in profile_data
+SECTION_EXTRACTORS = {
+    "intro": extract_intro,
+    "about": extract_about,
+    "experience": extract_experience,
+    "education": extract_education,
+    "certificates": extract_certificates,
+    "projects": extract_project,
+    "volunteering": extract_volunteering,
+    "skills": extract_skill,
+    "honors": extract_honor,
+    "organizations": extract_organizations,
+}
+
+# Anchor id of every optional section, keyed by its field in profile_data
+SECTION_ANCHORS = {
+    "experience": "experience",
+    "education": "education",
+    "certificates": "licenses_and_certifications",
+    "projects": "projects",
+    "volunteering": "volunteering_experience",
+    "skills": "skills",
+    "honors": "honors_and_awards",
+    "organizations": "organizations",
+}
+
+PROBE_SCRIPT = "return arguments[0].filter(function (id) { return document.getElementById(id) !== null; });"
+
+
+def probe_sections(driver):
+    """
+    Finds which optional sections exist on the page with a single lookup.
+
+    Returns:
+        A set of the profile_data fields whose section anchor is present,
+        or None if the probe failed (every extractor should then run).
+    """
+    anchors = list(SECTION_ANCHORS.values())
+    try:
+        if getattr(driver, "static", False):
+            found = {anchor for anchor in anchors if driver.find_elements(By.ID, anchor)}
+        else:
+            found = set(driver.execute_script(PROBE_SCRIPT, anchors) or [])
+    except Exception as e:
+        logging.warning(f"Section probe failed, running every extractor: {e}")
+        return None
+    return {field for field, anchor in SECTION_ANCHORS.items() if anchor in found}
+
+
+def extract_sections(driver, sections=None):
+    """
+    Runs every section extractor against a live WebDriver or a SnapshotPage.
+
+    Args:
+        driver: Selenium WebDriver instance or SnapshotPage.
+        sections: Optional set of optional sections known to be present (see probe_sections).
+            Extractors of the other optional sections are skipped and yield an empty list.
+
+    Returns:
+        profile_data: A dictionary containing all extracted profile sections.
+    """
+    engine = "snapshot" if getattr(driver, "static", False) else "selenium"
+    profile_data = {}
+    for field, extractor in SECTION_EXTRACTORS.items():
+        if field in SECTION_ANCHORS and sections is not None and field not in sections:
+            SECTIONS_SKIPPED.inc(section=field)
+            profile_data[field] = []
+        else:
+            with SECTION_SECONDS.time(section=field, engine=engine):
+                profile_data[field] = extractor(driver)
+    return profile_data
+
+
+def scrape_html(page_source, profile_url=None):
+    """
+    Extracts all profile sections from saved page HTML, without a browser.
+    """
+    return extract_sections(SnapshotPage(page_source, profile_url))
+
+
+def scrape_profile(driver, profile_url, engine="snapshot", archive=None, preloaded=False):
     """
     Scrapes a LinkedIn profile by extracting all relevant sections (intro, about, experience, education, etc.).
     
     Args:
         driver: Selenium WebDriver instance.
         profile_url: URL of the LinkedIn profile to scrape.
-        visited_profiles: A set containing previously visited profile URLs.
+        engine: "snapshot" to parse the page source once and extract in-process,
+            "script" to fetch each section with one in-page script call,
+            or "selenium" to query the live browser for every field.
+        archive: Optional PageArchive receiving the rendered page, so it can be
+            re-extracted later without visiting the profile again.
+        preloaded: True if the driver's current tab was already sent to profile_url
+            (see src/prefetch.py); only the rest of its load is waited for.
 
     Returns:
         profile_data: A dictionary containing all extracted profile sections (intro, experience, etc.).
     """
 
-    if profile_url in visited_profiles:
-        logging.warning(f"Profile already visited: {profile_url}")
-        return None
-
     logging.info(f"Scraping profile: {profile_url}")
     
-    # Visit the profile URL
-    driver.get(profile_url)
+    # Visit the profile URL, or finish loading it if it was prefetched
+    blocker = getattr(driver, "resource_blocker", None)
+    with PAGE_LOAD_SECONDS.time():
+        if preloaded:
+            wait_for_load(driver)
+        else:
+            if blocker:
+                blocker.before_visit()
+            driver.get(profile_url)
     
     # Scroll to load the entire page content
-    scroll_and_load(driver)
-
-    # Initialize dictionary to store all profile data
-    profile_data = {}
+    with SCROLL_SECONDS.time():
+        scroll_and_load(driver)
+    if blocker:
+        blocker.after_load(profile_url)
+
+    # Keep the rendered page; the snapshot engine reuses the same copy
+    page = None
+    if archive is not None:
+        try:
+            page = SnapshotPage.from_driver(driver)
+            archive.put(canonical_profile_url(profile_url) or profile_url, page.page_source)
+        except Exception as e:
+            logging.error(f"Failed to archive page of {profile_url}: {e}")
 
     # Extract different sections of the profile
     try:
-        profile_data["intro"] = extract_intro(driver)
-        profile_data["about"] = extract_about(driver)
-        profile_data["experience"] = extract_experience(driver)
-        profile_data["education"] = extract_education(driver)
-        profile_data["certificates"] = extract_certificates(driver)
-        profile_data["projects"] = extract_project(driver)
-        profile_data["volunteering"] = extract_volunteering(driver)
-        profile_data["skills"] = extract_skill(driver)
-        profile_data["honors"] = extract_honor(driver)
-        profile_data["organizations"] = extract_organizations(driver)
-
-        logging.info(f"Successfully scraped profile: {profile_url}")
+        start = time.perf_counter()
+        profile_data = None
+        if engine == "snapshot":
+            page = page or SnapshotPage.from_driver(driver)
+            profile_data = extract_sections(page, probe_sections(page))
+            if not profile_data["intro"]:
+                logging.warning(f"Snapshot extraction found no intro for {profile_url}, falling back to Selenium.")
+                profile_data = None
+        elif engine == "script":
+            profile_data = extract_sections_batched(driver, probe_sections(driver))
+            if not profile_data["intro"]:
+                logging.warning(f"Batched extraction found no intro for {profile_url}, falling back to Selenium.")
+                profile_data = None
+        if profile_data is None:
+            sections = probe_sections(driver)
+            skipped = sorted(set(SECTION_ANCHORS) - sections) if sections is not None else []
+            if skipped:
+                # Each absent section would otherwise wait out the timeouts of its entry selectors
+                saved = sum(get_registry().miss_cost(f"{section}.entries") for section in skipped)
+                logging.info(f"Skipping absent sections {skipped} for {profile_url}, saving ~{saved:.1f}s.")
+            profile_data = extract_sections(driver, sections)
+
+        logging.info(f"Successfully scraped profile: {profile_url} ({time.perf_counter() - start:.3f}s extraction)")
 
     except Exception as e:
         logging.error(f"Failed to scrape profile {profile_url}: {e}")
@@ -444,13 +509,19 @@ def scrape_profile(driver, profile_url, visited_profiles):
     return profile_data
 
 
-def extract_more_profiles(driver):
+def extract_more_profile_cards(driver):
     """
-    Extracts URLs of profiles from the 'More profiles for you' section.
+    Extracts the profile cards of the 'More profiles for you' section as
+    (canonical profile URL, card text) pairs, deduplicated by URL.
     """
     try:
-        profile_urls = get_objects(driver, By.XPATH, "//a[@data-field='browsemap_card_click']")
-        return [urlparse(url.get_attribute('href'))._replace(query="").geturl() for url in profile_urls] if profile_urls else []
+        profile_links = find(driver, "more_profiles.links", multiple=True)
+        cards = {}
+        for link in profile_links or []:
+            url = canonical_profile_url(link.get_attribute('href'))
+            if url and url not in cards:
+                cards[url] = link.text.strip()
+        return list(cards.items())
     except NoSuchElementException:
         logging.error("No 'More profiles for you' section found.")
         return []
@@ -459,6 +530,14 @@ def extract_more_profiles(driver):
         return []
 
 
+def extract_more_profiles(driver):
+    """
+    Extracts URLs of profiles from the 'More profiles for you' section,
+    reduced to their canonical form and deduplicated.
+    """
+    return [url for url, _ in extract_more_profile_cards(driver)]
+
+
 def extract_company_people_links(driver, company_url):
     """
     Extracts profile links from a company's 'People' page.
@@ -0,0 +1,340 @@
+import os
+import json
+import math
+import time
+import logging
+import threading
+from collections import deque
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from src.config import ConfigError, get_config
+from src.metrics import TIMEOUTS, WAIT_SECONDS
+
+
+def _section_entries(anchor):
+    return [
+        f"//div[@id='{anchor}']/ancestor::section//ul/li[contains(@class, 'artdeco-list__item')]",
+        f"//div[@id='{anchor}']/ancestor::section//ul/li[contains(@class, 'pvs-list__paged-list-item')]",
+    ]
+
+
+# Every XPath the extractors use, keyed by "<section>.<field>". The first one is
+# the primary selector, the others are fallbacks tried when it finds nothing.
+SELECTORS = {
+    # Intro card
+    "intro.container": [
+        "//div[contains(@class, 'mt2 relative')]",
+        "//section[contains(@class, 'artdeco-card')][.//h1]",
+    ],
+    "intro.name": [".//h1[contains(@class, 'text-heading-xlarge')]", ".//h1"],
+    "intro.pronouns": [".//span[contains(@class, 'text-body-small v-align-middle')]"],
+    "intro.works_at": [".//div[contains(@class, 'text-body-medium break-words')]"],
+    "intro.location": [".//span[contains(@class, 'text-body-small inline t-black--light break-words')]"],
+    "intro.followers": ["//p[contains(@class, 'pvs-header__optional-link')]//span[contains(text(), 'followers')]"],
+    "intro.connections": ["//li[@class='text-body-small']//span[@class='t-bold']"],
+
+    # About
+    "about.description": [
+        "//section[contains(@class, 'artdeco-card pv-profile-card')]//h2[span[text()='About']]/ancestor::section//div[contains(@class, 'full-width')]//span[@aria-hidden='true']",
+        "//div[@id='about']/ancestor::section//div[contains(@class, 'full-width')]//span[@aria-hidden='true']",
+    ],
+
+    # Experience, with the roles nested under a company
+    "experience.entries": _section_entries("experience"),
+    "experience.nested": [".//div[contains(@class, 'pvs-entity__sub-components')]/ul/li/div[contains(@data-view-name, 'profile-component-entity')]"],
+    "experience.header": [".//div[contains(@class, 'flex-wrap')]"],
+    "experience.logo_location": [".//a[@data-field='experience_company_logo']//span[contains(@class, 't-black--light')]"],
+    "experience.company_type": [".//span[@class='t-14 t-normal']"],
+    "experience.dates": ['.//span[contains(@class, "t-black--light")]/span'],
+    "experience.location": [".//span[contains(@class, 't-black--light')]//span[@aria-hidden='true']"],
+    "experience.description": [".//li[contains(@class, 'pvs-list__item--with-top-padding')]//div[contains(@class, 'inline-show-more-text--is-collapsed')]"],
+    "experience.nested_job_title": [".//div[@class='display-flex flex-wrap align-items-center full-height']"],
+    "experience.nested_type": [".//span[@class='t-14 t-normal']"],
+    "experience.nested_dates": ['.//span[contains(@class, "t-black--light")]/span'],
+    "experience.nested_description": [".//div[contains(@class,'inline-show-more-text--is-collapsed') and not(contains(@class, 'break-words'))]"],
+
+    # Education
+    "education.entries": _section_entries("education"),
+    "education.institution": [".//a[contains(@target, '_self')]//span[contains(@aria-hidden, 'true')]"],
+    "education.degree_field": [".//span[contains(@class, 't-14 t-normal')]"],
+    "education.graduation_year": [".//span[@class='pvs-entity__caption-wrapper']"],
+
+    # Licenses & certifications
+    "certificates.entries": _section_entries("licenses_and_certifications"),
+    "certificates.cert_name": [".//div[contains(@class, 'display-flex')]//span[contains(@aria-hidden, 'true')]"],
+    "certificates.issuer": [".//span[@class='t-14 t-normal']//span[contains(@aria-hidden, 'true')]"],
+    "certificates.issue_date": [".//span[@class='pvs-entity__caption-wrapper' and contains(@aria-hidden, 'true')]"],
+    "certificates.credential_url": [".//a[contains(@class, 'artdeco-button')]"],
+
+    # Projects
+    "projects.entries": _section_entries("projects"),
+    "projects.project_title": [".//div[contains(@class, 'mr1 t-bold')]/span[@aria-hidden='true']"],
+    "projects.dates": [".//span[@class='t-14 t-normal']"],
+    "projects.organization": [".//span[contains(text(), 'Associated with')]/following-sibling::span"],
+    "projects.description": [".//span[@aria-hidden='true']"],
+    "projects.link": [".//a[@class='optional-action-target-wrapper']"],
+
+    # Volunteering
+    "volunteering.entries": _section_entries("volunteering_experience"),
+    "volunteering.role": [".//div[contains(@class,'t-bold')]"],
+    "volunteering.organization": [".//span[contains(@class, 't-14 t-normal')]"],
+    "volunteering.duration": [".//span[@class='pvs-entity__caption-wrapper']"],
+
+    # Skills
+    "skills.entries": _section_entries("skills"),
+    "skills.title": [".//div[contains(@class, 'hoverable-link-text')]/span[@aria-hidden='true']"],
+    "skills.endorsements": [".//span[contains(@aria-hidden, 'true') and contains(text(), 'endorsements')]"],
+
+    # Honors & awards
+    "honors.entries": _section_entries("honors_and_awards"),
+    "honors.title": [".//div[contains(@class, 't-bold')]/span"],
+    "honors.issuer": [".//span[contains(@class, 't-14 t-normal')]"],
+
+    # Organizations
+    "organizations.entries": _section_entries("organizations"),
+    "organizations.organization_name": [".//div[contains(@class,'t-bold')]"],
+    "organizations.role_duration": [".//span[contains(@class, 't-14 t-normal')]"],
+    "organizations.description": [".//li[contains(@class, 'pvs-list__item--with-top-padding')]//div[contains(@class, 't-14 t-normal t-black')]"],
+
+    # 'More profiles for you' cards
+    "more_profiles.links": ["//a[@data-field='browsemap_card_click']"],
+}
+
+
+class SelectorStats:
+    """
+    Hit count and recent hit latencies of one selector.
+    """
+
+    def __init__(self, window):
+        self.attempts = 0
+        self.hits = 0
+        self.latencies = deque(maxlen=window)
+
+    def hit_rate(self):
+        # Smoothed, so an untried selector ranks between good and dead ones
+        return (self.hits + 1) / (self.attempts + 2)
+
+    def percentile(self, fraction):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class SelectorRegistry:
+    """
+    Ordered fallback selectors per field, with per-selector statistics.
+
+    Lookups try a field's selectors best first (highest observed hit rate, then
+    declared order) and wait for each at most a timeout derived from the p99 of
+    its observed hit latencies, so a selector that stopped matching costs a
+    fraction of a second instead of the full TIMEOUT. Statistics can be saved to
+    and loaded from a JSON file to carry them across runs.
+    """
+
+    def __init__(self, selectors=SELECTORS, default_timeout=10, min_timeout=0.25, timeout_margin=2.0,
+                 min_samples=20, window=500):
+        """
+        Args:
+            selectors: Mapping of field key to its XPaths, primary first.
+            default_timeout: Wait used until a selector has min_samples observations.
+            min_timeout: Lower bound of a derived timeout.
+            timeout_margin: Factor applied to the observed p99 latency.
+            min_samples: Observations needed before timeouts and ordering adapt.
+            window: Number of recent hit latencies kept per selector.
+        """
+        self.selectors = selectors
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.timeout_margin = timeout_margin
+        self.min_samples = min_samples
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _stat(self, key, xpath):
+        stat = self._stats.get((key, xpath))
+        if stat is None:
+            stat = self._stats[(key, xpath)] = SelectorStats(self.window)
+        return stat
+
+    def candidates(self, key):
+        """
+        Selectors of a field, best first.
+        """
+        xpaths = self.selectors[key]
+        with self._lock:
+            ranked = []
+            for index, xpath in enumerate(xpaths):
+                stat = self._stat(key, xpath)
+                rate = stat.hit_rate() if stat.attempts >= self.min_samples else None
+                ranked.append((-(rate if rate is not None else 0.5), index, xpath))
+        return [xpath for _, _, xpath in sorted(ranked)]
+
+    def timeout_for(self, key, xpath):
+        """
+        Seconds to wait for a selector: margin x observed p99 hit latency, or
+        min_timeout for a selector that has not matched in min_samples attempts.
+        """
+        with self._lock:
+            stat = self._stat(key, xpath)
+            if stat.attempts < self.min_samples:
+                return self.default_timeout
+            if stat.hits == 0:
+                return self.min_timeout
+            if len(stat.latencies) < self.min_samples:
+                return self.default_timeout
+            p99 = stat.percentile(0.99)
+        return min(self.default_timeout, max(self.min_timeout, p99 * self.timeout_margin))
+
+    def miss_cost(self, key):
+        """
+        Seconds a live lookup of key currently waits when none of its selectors match.
+        """
+        return sum(self.timeout_for(key, xpath) for xpath in self.selectors[key])
+
+    def misses(self):
+        """
+        Lookups recorded so far that found nothing, over all selectors.
+        """
+        with self._lock:
+            return sum(stat.attempts - stat.hits for stat in self._stats.values())
+
+    def record(self, key, xpath, hit, seconds=None):
+        """
+        Record the outcome of one lookup; seconds is only given for live lookups.
+        """
+        with self._lock:
+            stat = self._stat(key, xpath)
+            stat.attempts += 1
+            if hit:
+                stat.hits += 1
+                if seconds is not None:
+                    stat.latencies.append(seconds)
+
+    def report(self):
+        """
+        One row per selector: key, xpath, attempts, hit rate, p50/p99 latency and current timeout.
+        """
+        rows = []
+        for key, xpaths in self.selectors.items():
+            for xpath in xpaths:
+                with self._lock:
+                    stat = self._stat(key, xpath)
+                    attempts, hits = stat.attempts, stat.hits
+                    p50, p99 = stat.percentile(0.5), stat.percentile(0.99)
+                rows.append({
+                    "key": key,
+                    "xpath": xpath,
+                    "attempts": attempts,
+                    "hit_rate": hits / attempts if attempts else None,
+                    "p50": p50,
+                    "p99": p99,
+                    "timeout": self.timeout_for(key, xpath),
+                })
+        return rows
+
+    def save(self, file_path):
+        with self._lock:
+            data = [{"key": key, "xpath": xpath, "attempts": stat.attempts, "hits": stat.hits,
+                     "latencies": list(stat.latencies)}
+                    for (key, xpath), stat in self._stats.items() if stat.attempts]
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, file_path)
+
+    def load(self, file_path):
+        """
+        Merge statistics saved by save(); selectors no longer registered are ignored.
+        """
+        if not os.path.exists(file_path):
+            return
+        with open(file_path, "r") as file:
+            data = json.load(file)
+        with self._lock:
+            for item in data:
+                if item["xpath"] not in self.selectors.get(item["key"], ()):
+                    continue
+                stat = self._stat(item["key"], item["xpath"])
+                stat.attempts += item["attempts"]
+                stat.hits += item["hits"]
+                stat.latencies.extend(item["latencies"])
+        logging.info(f"Loaded selector statistics for {len(data)} selectors from {file_path}.")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    The process-wide registry used by find(), created on first use with the
+    TIMEOUT setting and the statistics saved in SELECTOR_STATS. Offline tools
+    extracting from snapshots do not need a valid configuration: if it does not
+    load, the registry starts with the defaults.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                try:
+                    config = get_config()
+                except ConfigError as e:
+                    logging.warning(f"Selector registry uses its defaults, the configuration is invalid: {e}")
+                    _registry = SelectorRegistry()
+                else:
+                    registry = SelectorRegistry(default_timeout=float(config.timeout))
+                    if config.selector_stats:
+                        registry.load(config.selector_stats)
+                    _registry = registry
+    return _registry
+
+
+def find(context, key, multiple=False, registry=None):
+    """
+    Look up a field with its registered selectors, best first.
+
+    Args:
+        context: WebDriver, WebElement, SnapshotPage or SnapshotElement to search in.
+        key: Field key in the registry, e.g. "intro.name".
+        multiple: Return every match of the first selector that matches.
+        registry: SelectorRegistry to use (default: get_registry()).
+
+    Returns:
+        The first matching element (None if nothing matched), or a list if multiple.
+    """
+    registry = registry or get_registry()
+    static = getattr(context, "static", False)
+    for xpath in registry.candidates(key):
+        if static:
+            # Snapshots are complete: one lookup, and no latency worth learning from
+            elements = context.find_elements(By.XPATH, xpath)
+            registry.record(key, xpath, bool(elements))
+        else:
+            from selenium.webdriver.support.ui import WebDriverWait
+            start = time.perf_counter()
+            try:
+                # Poll often, so short learned timeouts are not rounded up to the default 0.5s poll
+                elements = WebDriverWait(context, registry.timeout_for(key, xpath), poll_frequency=0.05).until(
+                    lambda current: current.find_elements(By.XPATH, xpath))
+            except TimeoutException:
+                elements = []
+                TIMEOUTS.inc(function="find", key=key)
+            elapsed = time.perf_counter() - start
+            registry.record(key, xpath, bool(elements), elapsed)
+            WAIT_SECONDS.observe(elapsed, outcome="found" if elements else "timeout")
+        if elements:
+            return elements if multiple else elements[0]
+    return [] if multiple else None
+
+
+def find_text(context, key, attribute=None, registry=None):
+    """
+    Text (or an attribute) of the first element matching a field, or None.
+    """
+    element = find(context, key, registry=registry)
+    if element is None:
+        return None
+    return element.get_attribute(attribute) if attribute else element.text.strip()
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import logging
+import threading
+from src.helper import login, close_chrome
+from src.metrics import SESSIONS
+
+
+LINKEDIN_URL = "https://www.linkedin.com"
+LOGIN_URL = f"{LINKEDIN_URL}/login"
+# A tiny same-origin page: enough to set cookies and localStorage and run the probe,
+# without loading the feed
+ORIGIN_URL = f"{LINKEDIN_URL}/robots.txt"
+
+# Resolves with the HTTP status of the logged-in member's own record; 200 only with a valid session
+PROBE_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var csrf = (document.cookie.match(/JSESSIONID="?([^";]+)/) || [])[1] || '';
+fetch('/voyager/api/me', {credentials: 'include', redirect: 'manual', headers: {'csrf-token': csrf}})
+    .then(function (response) { done(response.status); })
+    .catch(function () { done(0); });
+"""
+
+READ_STORAGE_SCRIPT = "return Object.assign({}, window.localStorage);"
+WRITE_STORAGE_SCRIPT = "var items = arguments[0]; for (var key in items) { window.localStorage.setItem(key, items[key]); }"
+
+
+class SessionManager:
+    """
+    Keeps one LinkedIn login for every browser of the scraper.
+
+    After a successful login the session's cookies and localStorage are saved to
+    a file (readable by the owner only), and ensure() restores them into every
+    new driver. A cheap probe (one small API request, no page load) decides
+    whether a session is valid; only when neither the browser's own session nor
+    the saved one passes does it fall back to the interactive login, one worker
+    at a time, so a single CAPTCHA prompt serves all browsers.
+    """
+
+    def __init__(self, file_path, login=login, probe_timeout=10):
+        self.file_path = file_path
+        self.login = login
+        self.probe_timeout = probe_timeout
+        self._lock = threading.Lock()
+
+    def _open_origin(self, driver):
+        if not (driver.current_url or "").startswith(LINKEDIN_URL):
+            driver.get(ORIGIN_URL)
+
+    def probe(self, driver):
+        """
+        Check whether the driver is logged in.
+        """
+        try:
+            self._open_origin(driver)
+            driver.set_script_timeout(self.probe_timeout)
+            status = driver.execute_async_script(PROBE_SCRIPT)
+        except Exception as e:
+            logging.warning(f"Session probe failed: {e}")
+            return False
+        logging.info(f"Session probe answered {status}.")
+        return status == 200
+
+    def load(self):
+        """
+        Return the saved session, or None if there is none.
+        """
+        if not os.path.exists(self.file_path):
+            return None
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable session file {self.file_path}: {e}")
+            return None
+
+    def save(self, driver):
+        """
+        Atomically save the cookies and localStorage of a logged-in driver.
+        """
+        self._open_origin(driver)
+        session = {
+            "saved_at": time.time(),
+            "cookies": driver.get_cookies(),
+            "local_storage": driver.execute_script(READ_STORAGE_SCRIPT) or {},
+        }
+        temp_path = f"{self.file_path}.tmp"
+        # The file holds the session token; keep it private from the start
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(session, file)
+        os.replace(temp_path, self.file_path)
+        logging.info(f"Saved session with {len(session['cookies'])} cookies to {self.file_path}.")
+
+    def restore(self, driver, session=None):
+        """
+        Load a saved session into the driver.
+
+        Returns:
+            True if there was a session to restore.
+        """
+        session = session or self.load()
+        if not session:
+            return False
+        self._open_origin(driver)
+        now = time.time()
+        restored = 0
+        for cookie in session["cookies"]:
+            if cookie.get("expiry") and cookie["expiry"] < now:
+                continue
+            if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+                cookie.pop("sameSite", None)
+            try:
+                driver.add_cookie(cookie)
+                restored += 1
+            except Exception as e:
+                logging.debug(f"Could not restore cookie {cookie.get('name')} for {cookie.get('domain')}: {e}")
+        driver.execute_script(WRITE_STORAGE_SCRIPT, session.get("local_storage") or {})
+        logging.info(f"Restored {restored} cookies from the session saved {(now - session['saved_at']) / 3600:.1f}h ago.")
+        return True
+
+    def ensure(self, driver):
+        """
+        Make sure the driver is logged in: keep the browser's own session if it is
+        valid, otherwise restore the saved one, and log in only if both fail.
+
+        Returns:
+            How the session was obtained ("existing", "restored", "login"),
+            or None if the driver could not be logged in.
+        """
+        outcome = None
+        if self.probe(driver):
+            outcome = "existing"
+            if not os.path.exists(self.file_path):
+                self.save(driver)
+        else:
+            session = self.load()
+            if session and self.restore(driver, session) and self.probe(driver):
+                outcome = "restored"
+            else:
+                with self._lock:
+                    # Another worker may have logged in while this one waited
+                    latest = self.load()
+                    if latest and latest != session and self.restore(driver, latest) and self.probe(driver):
+                        outcome = "restored"
+                    else:
+                        driver.get(LOGIN_URL)
+                        self.login(driver)
+                        if self.probe(driver):
+                            self.save(driver)
+                            outcome = "login"
+
+        SESSIONS.inc(outcome=outcome or "failed")
+        if outcome:
+            logging.info(f"Session ready ({outcome}).")
+        else:
+            logging.error("Could not log in; check the credentials or complete the CAPTCHA.")
+        return outcome
+
+
+def start_logged_in(factory, sessions):
+    """
+    Start a driver with factory() and make sure it is logged in (see SessionManager.ensure).
+    Raises RuntimeError, after closing the driver, if it cannot be logged in.
+    """
+    driver = factory()
+    if sessions.ensure(driver) is None:
+        close_chrome(driver)
+        raise RuntimeError("Browser could not be logged in.")
+    return driver
@@ -0,0 +1,319 @@
+import os
+import json
+import time
+import logging
+import threading
+from src.urls import canonical_profile_url
+
+
+def recover_jsonl(file_path):
+    """
+    Drop a truncated last line (e.g. left behind by a crash mid-write) so the
+    file only contains complete records. Returns the number of bytes removed.
+    """
+    if not os.path.exists(file_path):
+        return 0
+
+    with open(file_path, 'rb+') as file:
+        size = file.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+        file.seek(size - 1)
+        if file.read(1) == b"\n":
+            return 0
+
+        # Walk backwards in chunks until the last complete line ends
+        position = size
+        keep = 0
+        while position > 0:
+            chunk_size = min(64 * 1024, position)
+            position -= chunk_size
+            file.seek(position)
+            chunk = file.read(chunk_size)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                keep = position + newline + 1
+                break
+
+        file.truncate(keep)
+
+    logging.warning(f"Recovered {file_path}: dropped {size - keep} bytes of a truncated record.")
+    return size - keep
+
+
+def iter_jsonl(file_path):
+    """
+    Yield records from a JSONL file one at a time.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+DELTA_FIELDS = ("changed_sections", "scraped_at")
+
+
+def _index_profiles(jsonl_path):
+    """
+    Offsets of the lines to combine for every profile in a JSONL file: its
+    latest full record followed by the delta records written after it.
+    Profiles are returned in order of first appearance.
+    """
+    lines = {}
+    with open(jsonl_path, 'rb') as file:
+        offset = 0
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                url = record.get("profile_url")
+                if "changed_sections" not in record:
+                    lines[url] = [offset]
+                else:
+                    lines.setdefault(url, []).append(offset)
+            offset += len(line)
+    return lines
+
+
+def merge_delta(profile, delta):
+    """
+    Apply a delta record (see crawler.profile_record) to a full profile record.
+    """
+    profile.update({key: value for key, value in delta.items() if key not in DELTA_FIELDS})
+    return profile
+
+
+def export_jsonl_to_json(jsonl_path, json_path, indent=4):
+    """
+    Convert a JSONL file to the legacy JSON array format, one full record per
+    profile: delta records of refreshed profiles are folded into the latest full
+    record of the same profile_url, never written on their own. Records are read
+    back one profile at a time, only their line offsets are held in memory.
+    The output is replaced atomically.
+    """
+    tmp_path = f"{json_path}.tmp"
+    count = 0
+    orphans = 0
+    pad = " " * indent if indent else ""
+    with open(jsonl_path, 'rb') as source, open(tmp_path, 'w') as out:
+        out.write("[")
+        for url, offsets in _index_profiles(jsonl_path).items():
+            records = []
+            for offset in offsets:
+                source.seek(offset)
+                records.append(json.loads(source.readline()))
+            if "changed_sections" in records[0]:
+                # Deltas without a full record cannot make up a complete profile
+                orphans += 1
+                continue
+            record = records[0]
+            for delta in records[1:]:
+                merge_delta(record, delta)
+            item = json.dumps(record, indent=indent)
+            if indent:
+                item = "\n".join(pad + line for line in item.split("\n"))
+            out.write(("," if count else "") + ("\n" if indent else "") + item)
+            count += 1
+        out.write(("\n" if indent and count else "") + "]")
+    os.replace(tmp_path, json_path)
+    if orphans:
+        logging.warning(f"Skipped {orphans} profiles that only have delta records in {jsonl_path}.")
+    logging.info(f"Exported {count} profiles from {jsonl_path} to {json_path}.")
+    return count
+
+
+class JsonlSink:
+    """
+    Append-only output sink writing one compact JSON record per line.
+    Each record is flushed to the OS immediately and fsynced in batches.
+    Safe to share between worker threads.
+    """
+
+    def __init__(self, file_path='./data/scraped_profiles.jsonl', fsync_every=20):
+        self.file_path = file_path
+        self.fsync_every = fsync_every
+        self._unsynced = 0
+        self._lock = threading.Lock()
+        recover_jsonl(file_path)
+        self._file = open(file_path, 'a', encoding='utf-8')
+
+    def write(self, record):
+        """
+        Append a single record to the file.
+        """
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                self._sync()
+
+    def sync(self):
+        """
+        Force buffered records onto disk.
+        """
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MongoSink:
+    """
+    Buffered MongoDB output sink. Records are upserted by canonical profile URL,
+    so re-scraping a profile replaces it instead of adding a duplicate.
+
+    Writes are buffered and sent with one unordered bulk_write once batch_size
+    records are waiting or flush_interval seconds have passed, over a single
+    pooled client. close() drains the buffer. Safe to share between worker threads.
+
+    While MongoDB is unreachable, failed batches stay buffered up to max_buffered
+    profiles; beyond that the oldest are appended to spill_path (to be loaded
+    later with cli.py import), or dropped with an error if there is none.
+    """
+
+    def __init__(self, mongo_uri=None, db_name=None, collection_name=None,
+                 batch_size=50, flush_interval=5.0, client=None, max_buffered=10_000, spill_path=None):
+        """
+        Args:
+            mongo_uri: MongoDB connection string (ignored when client is given).
+            db_name: Database name.
+            collection_name: Collection name.
+            batch_size: Buffered records that trigger a flush.
+            flush_interval: Maximum seconds a record waits in the buffer.
+            client: Optional existing MongoClient (or a stand-in such as mongomock).
+            max_buffered: Profiles kept in memory while writes keep failing.
+            spill_path: Optional JSONL file receiving the profiles that do not fit.
+        """
+        self._owns_client = client is None
+        if client is None:
+            from pymongo import MongoClient
+            client = MongoClient(mongo_uri)
+        self.client = client
+        self.collection = self.client[db_name][collection_name]
+        self.collection.create_index("profile_url", unique=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max(max_buffered, batch_size)
+        self.spill_path = spill_path
+        self._buffer = {}
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="mongo-sink", daemon=True)
+        self._flusher.start()
+
+    def write(self, record):
+        """
+        Buffer a record; flushes when the buffer reaches batch_size.
+        """
+        record = dict(record, profile_url=canonical_profile_url(record["profile_url"]) or record["profile_url"])
+        with self._lock:
+            buffered = self._buffer.get(record["profile_url"])
+            if buffered is None or "changed_sections" not in record:
+                # A full record supersedes whatever is buffered for the profile
+                self._buffer[record["profile_url"]] = record
+            elif "changed_sections" not in buffered:
+                merge_delta(buffered, record)
+            else:
+                # Two deltas: keep the sections of both
+                changed = buffered["changed_sections"]
+                buffered.update(record)
+                buffered["changed_sections"] = changed + [section for section in record["changed_sections"]
+                                                          if section not in changed]
+            if len(self._buffer) >= self.batch_size and time.monotonic() >= self._retry_at:
+                self._flush()
+            if len(self._buffer) > self.max_buffered:
+                self._spill(len(self._buffer) - self.max_buffered)
+
+    def flush(self):
+        """
+        Send every buffered record now.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        from pymongo import UpdateOne
+        records = list(self._buffer.values())
+        operations = [UpdateOne({"profile_url": record["profile_url"]}, {"$set": record}, upsert=True)
+                      for record in records]
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            # Upserts are idempotent, so the whole batch is simply retried after flush_interval
+            logging.error(f"Failed to write {len(records)} profiles to MongoDB, keeping them buffered: {e}")
+            self._retry_at = time.monotonic() + self.flush_interval
+            return
+        self._buffer.clear()
+        logging.info(f"Upserted {len(records)} profiles into MongoDB collection: {self.collection.name}")
+
+    def _spill(self, count):
+        # Oldest first: dicts keep insertion order
+        records = [self._buffer.pop(url) for url in list(self._buffer)[:count]]
+        if self.spill_path:
+            with open(self.spill_path, 'a', encoding='utf-8') as file:
+                for record in records:
+                    file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            logging.error(f"MongoDB buffer full, spilled {len(records)} profiles to {self.spill_path}.")
+        else:
+            logging.error(f"MongoDB buffer full, dropped {len(records)} profiles that were not written.")
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush()
+            if self._buffer:
+                if self.spill_path:
+                    self._spill(len(self._buffer))
+                else:
+                    logging.error(f"{len(self._buffer)} profiles could not be written to MongoDB.")
+        if self._owns_client:
+            self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MultiSink:
+    """
+    Writes every record to several sinks, e.g. a JsonlSink and a MongoSink.
+    """
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def write(self, record):
+        for sink in self.sinks:
+            sink.write(record)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
@@ -0,0 +1,149 @@
+import logging
+from urllib.parse import urljoin
+from lxml import html as lxml_html
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+
+# Serialized DOM and URL in one call, instead of driver.page_source plus driver.current_url
+CAPTURE_SCRIPT = "return [document.documentElement.outerHTML, window.location.href];"
+
+# Tags whose content never shows up in a rendered page's text
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "head", "title", "meta", "link"}
+
+# Tags that start a new line in rendered text (mirrors what WebElement.text returns)
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+    "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+}
+
+
+def _is_hidden(node):
+    """
+    Check whether a node is explicitly hidden and would not be rendered.
+    """
+    if node.get("hidden") is not None or node.get("type") == "hidden":
+        return True
+    style = (node.get("style") or "").replace(" ", "").lower()
+    return "display:none" in style or "visibility:hidden" in style
+
+
+def render_text(node):
+    """
+    Approximate Selenium's WebElement.text for an lxml node: visible text only,
+    block elements on their own line, whitespace collapsed within each line.
+    """
+    parts = []
+
+    def walk(current):
+        if not isinstance(current.tag, str) or current.tag in SKIPPED_TAGS or _is_hidden(current):
+            return
+        # LinkedIn's visually-hidden copies are absolutely positioned, which renders them as blocks
+        block = current.tag in BLOCK_TAGS or "visually-hidden" in (current.get("class") or "").split()
+        if block or current.tag == "br":
+            parts.append("\n")
+        if current.text:
+            parts.append(current.text)
+        for child in current:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if block:
+            parts.append("\n")
+
+    walk(node)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+class SnapshotElement:
+    """
+    Read-only stand-in for a Selenium WebElement, backed by a parsed lxml node.
+    Supports the subset of the WebElement API used by the extractors in src/scrape.py.
+    """
+
+    # A snapshot never changes, so waiting or retrying on it is pointless
+    static = True
+
+    def __init__(self, node, base_url=None):
+        self._node = node
+        self._base_url = base_url
+
+    def _select(self, by, value):
+        if by == By.XPATH:
+            nodes = self._node.xpath(value)
+        elif by == By.ID:
+            nodes = self._node.xpath(".//*[@id=$value]", value=value)
+        elif by == By.CLASS_NAME:
+            nodes = self._node.xpath(".//*[contains(concat(' ', normalize-space(@class), ' '), $value)]", value=f" {value} ")
+        elif by == By.NAME:
+            nodes = self._node.xpath(".//*[@name=$value]", value=value)
+        elif by == By.TAG_NAME:
+            nodes = self._node.xpath(f".//{value}")
+        else:
+            raise ValueError(f"Unsupported locator strategy for snapshots: {by}")
+
+        # XPath may also yield strings or attribute values; only elements are findable
+        return [node for node in nodes if hasattr(node, "tag") and isinstance(node.tag, str)]
+
+    def find_element(self, by=By.ID, value=None):
+        nodes = self._select(by, value)
+        if not nodes:
+            raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+        return SnapshotElement(nodes[0], self._base_url)
+
+    def find_elements(self, by=By.ID, value=None):
+        return [SnapshotElement(node, self._base_url) for node in self._select(by, value)]
+
+    @property
+    def text(self):
+        return render_text(self._node)
+
+    @property
+    def tag_name(self):
+        return self._node.tag
+
+    def get_attribute(self, name):
+        value = self._node.get(name)
+        # Selenium returns links resolved against the page URL
+        if value and name in ("href", "src") and self._base_url:
+            return urljoin(self._base_url, value)
+        return value
+
+
+class SnapshotPage(SnapshotElement):
+    """
+    A parsed copy of a rendered page that can be passed to the extractors in place
+    of a live WebDriver. Every lookup runs in-process against the lxml tree.
+    """
+
+    def __init__(self, page_source, url=None):
+        document = lxml_html.document_fromstring(page_source)
+        super().__init__(document, url)
+        self.current_url = url
+        self.page_source = page_source
+
+    @classmethod
+    def from_driver(cls, driver):
+        """
+        Capture the current DOM and URL of a live WebDriver in a single round-trip.
+        """
+        page_source, url = driver.execute_script(CAPTURE_SCRIPT)
+        return cls(page_source, url)
+
+    @classmethod
+    def from_file(cls, file_path, url=None):
+        """
+        Load a saved page (e.g. an HTML fixture) from disk.
+        """
+        with open(file_path, "rb") as file:
+            return cls(file.read(), url)
+
+    def execute_script(self, script, *args):
+        """
+        Snapshots cannot run JavaScript; scrolling and height checks are no-ops.
+        """
+        logging.debug("Ignoring execute_script on a page snapshot.")
+        return None
@@ -0,0 +1,385 @@
+import time
+import json
+import logging
+import sqlite3
+import threading
+from src.priority import PriorityRules
+from src.urls import canonical_profile_url
+from src.visited import VisitedIndex
+
+
+class CrawlState:
+    """
+    Persistent crawl state kept in one long-lived SQLite connection.
+
+    Tables:
+        frontier: profiles discovered but not yet scraped, ordered by priority score.
+        refs:     distinct (referrer, profile) links found on scraped pages, for queued profiles.
+        visited:  profiles that are finished (scraped or given up on).
+        status:   last outcome, attempt count and error for every profile tried.
+        profiles: last scrape time and per-section content hashes of scraped profiles.
+
+    Writes are committed in batches, so a crash loses at most the last few
+    updates; claimed frontier entries are released again on the next start.
+
+    Profiles are stored under their canonical URL (see src/urls.py), and visited
+    checks go through a bounded in-memory VisitedIndex before touching SQLite.
+
+    The frontier is a priority queue persisted through an index on its score
+    (see src/priority.py), so the ordering survives restarts.
+
+    Scraped profiles older than a TTL can be queued again with requeue_stale();
+    the stored section hashes then tell which sections changed since.
+    """
+
+    def __init__(self, db_path, commit_every=10, commit_interval=5.0, max_attempts=3, visited_capacity=10_000_000,
+                 rules=None):
+        self.db_path = db_path
+        self.rules = rules or PriorityRules()
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.max_attempts = max_attempts
+        self._lock = threading.RLock()
+        self._pending_writes = 0
+        self._last_commit = time.monotonic()
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+        self.visited_index = VisitedIndex(visited_capacity, file_path=f"{db_path}.bloom")
+        self.visited_index.load(self.conn)
+
+    def _init_schema(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS frontier (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT UNIQUE NOT NULL,
+            claimed INTEGER NOT NULL DEFAULT 0,
+            added_at REAL NOT NULL
+        )
+        ''')
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS refs (
+            url TEXT NOT NULL,
+            referrer TEXT NOT NULL,
+            PRIMARY KEY (url, referrer)
+        ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS visited (
+            url TEXT PRIMARY KEY,
+            visited_at REAL NOT NULL
+        ) WITHOUT ROWID
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS visited_time ON visited (visited_at)")
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS status (
+            url TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            updated_at REAL NOT NULL
+        ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS profiles (
+            url TEXT PRIMARY KEY,
+            depth INTEGER NOT NULL DEFAULT 0,
+            context TEXT,
+            scraped_at REAL NOT NULL,
+            hashes TEXT
+        ) WITHOUT ROWID
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS profiles_scraped ON profiles (scraped_at)")
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        ) WITHOUT ROWID
+        ''')
+
+        # Carry over profiles recorded in the PROFILE_LIST table of earlier versions, once
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < 1:
+            legacy = cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='PROFILE_LIST'").fetchone()
+            if legacy:
+                cursor.execute("INSERT OR IGNORE INTO visited (url, visited_at) SELECT profile_url, ? FROM PROFILE_LIST", (time.time(),))
+            cursor.execute("PRAGMA user_version = 1")
+
+        # Re-key rows stored before URLs were canonicalized, once
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < 2:
+            for table in ("visited", "status", "frontier"):
+                for (url,) in cursor.execute(f"SELECT url FROM {table}").fetchall():
+                    canonical = canonical_profile_url(url)
+                    if canonical != url:
+                        if canonical:
+                            cursor.execute(f"UPDATE OR IGNORE {table} SET url = ? WHERE url = ?", (canonical, url))
+                        cursor.execute(f"DELETE FROM {table} WHERE url = ?", (url,))
+            cursor.execute("PRAGMA user_version = 2")
+
+        # Add the priority columns to the frontier, once
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < 3:
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(frontier)")}
+            for column, definition in (("depth", "INTEGER NOT NULL DEFAULT 0"), ("refs", "INTEGER NOT NULL DEFAULT 0"),
+                                       ("boost", "REAL NOT NULL DEFAULT 0"), ("penalty", "REAL NOT NULL DEFAULT 0"),
+                                       ("score", "REAL NOT NULL DEFAULT 0"), ("context", "TEXT")):
+                if column not in columns:
+                    cursor.execute(f"ALTER TABLE frontier ADD COLUMN {column} {definition}")
+            cursor.execute("DROP INDEX IF EXISTS frontier_claimed")
+            cursor.execute("PRAGMA user_version = 3")
+        cursor.execute("CREATE INDEX IF NOT EXISTS frontier_priority ON frontier (claimed, score DESC, id)")
+
+        # Profiles scraped before freshness was tracked count as scraped when they were visited, once
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < 4:
+            cursor.execute(
+                "INSERT OR IGNORE INTO profiles (url, scraped_at) SELECT v.url, v.visited_at FROM visited v "
+                "LEFT JOIN status s ON s.url = v.url WHERE s.status IS NULL OR s.status = 'done'"
+            )
+            cursor.execute("PRAGMA user_version = 4")
+
+        # Stored scores are only recomputed when the rules change
+        fingerprint = self.rules.fingerprint()
+        stored = cursor.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+        if stored is None or stored[0] != fingerprint:
+            self._rescore(cursor)
+            cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('rules', ?)", (fingerprint,))
+
+        # Anything claimed by a previous run that never finished goes back in line
+        cursor.execute("UPDATE frontier SET claimed = 0 WHERE claimed = 1")
+        self.conn.commit()
+
+    def _wrote(self, count=1):
+        self._pending_writes += count
+        if (self._pending_writes >= self.commit_every
+                or time.monotonic() - self._last_commit >= self.commit_interval):
+            self.commit()
+
+    def commit(self):
+        with self._lock:
+            self.conn.commit()
+            self._pending_writes = 0
+            self._last_commit = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self.conn.commit()
+            self.visited_index.save()
+            self.conn.close()
+
+    def __contains__(self, url):
+        return self.is_visited(url)
+
+    def is_visited(self, url):
+        url = canonical_profile_url(url)
+        if url is None or not self.visited_index.might_contain(url):
+            return False
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM visited WHERE url = ?", (url,)).fetchone() is not None
+
+    def _add_visited(self, url):
+        now = time.time()
+        self.conn.execute("INSERT OR IGNORE INTO visited (url, visited_at) VALUES (?, ?)", (url, now))
+        self.visited_index.add(url, now)
+
+    def _rescore(self, cursor):
+        rows = cursor.execute("SELECT id, depth, refs, penalty, context FROM frontier").fetchall()
+        for row_id, depth, refs, penalty, context in rows:
+            boost = self.rules.boost(context)
+            score = self.rules.score(depth, refs, boost) - penalty
+            cursor.execute("UPDATE frontier SET boost = ?, score = ? WHERE id = ?", (boost, score, row_id))
+        if rows:
+            logging.info(f"Priority rules changed, rescored {len(rows)} frontier entries.")
+
+    def push(self, links, depth=0, referrer=None):
+        """
+        Add profiles to the frontier, skipping visited ones and anything that is not
+        a profile URL. Profiles already queued keep their smallest depth and gain
+        the new boost, and a reference if referrer has not linked to them before,
+        so re-scraping a page (after a failure or for a refresh) counts once.
+
+        Args:
+            links: Profile URLs, or (url, card_text) pairs for links discovered on a page.
+            depth: Distance of the links from the seed profiles.
+            referrer: Scraped profile the links were found on.
+
+        Returns the number of profiles added.
+        """
+        now = time.time()
+        added = 0
+        updated = 0
+        referrer = canonical_profile_url(referrer) if referrer else None
+        with self._lock:
+            for link in links:
+                url, text = link if isinstance(link, tuple) else (link, None)
+                url = canonical_profile_url(url)
+                if url is None or url == referrer:
+                    continue
+                if self.visited_index.might_contain(url) and \
+                        self.conn.execute("SELECT 1 FROM visited WHERE url = ?", (url,)).fetchone():
+                    continue
+
+                references = 0
+                if referrer:
+                    references = self.conn.execute("INSERT OR IGNORE INTO refs (url, referrer) VALUES (?, ?)",
+                                                   (url, referrer)).rowcount
+                boost = self.rules.boost(text)
+                row = self.conn.execute("SELECT depth, refs, boost, penalty, context FROM frontier WHERE url = ?", (url,)).fetchone()
+                if row is None:
+                    self.conn.execute(
+                        "INSERT INTO frontier (url, added_at, depth, refs, boost, score, context) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (url, now, depth, references, boost, self.rules.score(depth, references, boost), text)
+                    )
+                    added += 1
+                else:
+                    old_depth, old_references, old_boost, penalty, context = row
+                    new_depth, references, boost = min(old_depth, depth), old_references + references, max(old_boost, boost)
+                    self.conn.execute(
+                        "UPDATE frontier SET depth = ?, refs = ?, boost = ?, score = ?, context = ? WHERE url = ?",
+                        (new_depth, references, boost, self.rules.score(new_depth, references, boost) - penalty, text or context, url)
+                    )
+                    updated += 1
+            if added or updated:
+                self._wrote(added + updated)
+        return added
+
+    def pop(self):
+        """
+        Claim the highest-scoring unclaimed profile in the frontier. The entry stays
+        in the frontier until mark_done/mark_failed, so a crash never loses it.
+        Returns None when the frontier is empty.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT id, url FROM frontier WHERE claimed = 0 ORDER BY score DESC, id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE frontier SET claimed = 1 WHERE id = ?", (row[0],))
+            self._wrote()
+            return row[1]
+
+    def release(self, url):
+        """
+        Put a claimed profile back in the frontier without counting an attempt.
+        """
+        with self._lock:
+            self.conn.execute("UPDATE frontier SET claimed = 0 WHERE url = ?", (url,))
+            self._wrote()
+
+    def discard(self, url):
+        """
+        Drop a claimed profile that turned out to be visited already from the
+        frontier, without recording an outcome for it.
+        """
+        with self._lock:
+            self.conn.execute("DELETE FROM frontier WHERE url = ?", (url,))
+            self.conn.execute("DELETE FROM refs WHERE url = ?", (url,))
+            self._wrote()
+
+    def depth_of(self, url):
+        """
+        Distance of a queued profile from the seed profiles (0 if unknown).
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT depth FROM frontier WHERE url = ?", (canonical_profile_url(url),)).fetchone()
+            return row[0] if row else 0
+
+    def _set_status(self, url, status, error=None):
+        self.conn.execute(
+            "INSERT INTO status (url, status, attempts, last_error, updated_at) VALUES (?, ?, 1, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET status = excluded.status, attempts = attempts + 1, "
+            "last_error = excluded.last_error, updated_at = excluded.updated_at",
+            (url, status, error, time.time())
+        )
+
+    def attempts(self, url):
+        with self._lock:
+            row = self.conn.execute("SELECT attempts FROM status WHERE url = ?", (url,)).fetchone()
+            return row[0] if row else 0
+
+    def section_hashes(self, url):
+        """
+        Section hashes stored by the last successful scrape, or None if never scraped.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT hashes FROM profiles WHERE url = ?", (canonical_profile_url(url),)).fetchone()
+            return json.loads(row[0]) if row and row[0] else None
+
+    def mark_done(self, url, hashes=None):
+        """
+        Record a successful scrape and move the profile to the visited set.
+
+        Args:
+            url: The scraped profile.
+            hashes: Optional content hash per section, compared on the next scrape.
+        """
+        with self._lock:
+            self._set_status(url, "done")
+            row = self.conn.execute("SELECT depth, context FROM frontier WHERE url = ?", (url,)).fetchone()
+            depth, context = row if row else (0, None)
+            self.conn.execute(
+                "INSERT INTO profiles (url, depth, context, scraped_at, hashes) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET depth = MIN(depth, excluded.depth), "
+                "context = COALESCE(excluded.context, context), scraped_at = excluded.scraped_at, "
+                "hashes = COALESCE(excluded.hashes, hashes)",
+                (url, depth, context, time.time(), json.dumps(hashes, sort_keys=True) if hashes else None)
+            )
+            self.conn.execute("DELETE FROM frontier WHERE url = ?", (url,))
+            self.conn.execute("DELETE FROM refs WHERE url = ?", (url,))
+            self._add_visited(url)
+            self._wrote()
+
+    def mark_failed(self, url, error=None):
+        """
+        Record a failed attempt. The profile goes back into the frontier with a lower
+        score until it has failed max_attempts times, after which it is given up on.
+        """
+        with self._lock:
+            self._set_status(url, "failed", error)
+            if self.attempts(url) >= self.max_attempts:
+                self.conn.execute("DELETE FROM frontier WHERE url = ?", (url,))
+                self.conn.execute("DELETE FROM refs WHERE url = ?", (url,))
+                self._add_visited(url)
+                logging.warning(f"Giving up on {url} after {self.max_attempts} attempts.")
+            else:
+                penalty = self.rules.retry_penalty
+                self.conn.execute(
+                    "UPDATE frontier SET claimed = 0, penalty = penalty + ?, score = score - ? WHERE url = ?",
+                    (penalty, penalty, url)
+                )
+            self._wrote()
+
+    def requeue_stale(self, ttl, limit=None):
+        """
+        Queue scraped profiles whose last scrape is older than ttl seconds again,
+        at the priority their original depth and card text give them. Profiles
+        that were given up on are not retried.
+
+        Returns the number of profiles queued.
+        """
+        cutoff = time.time() - ttl
+        query = ("SELECT p.url, p.depth, p.context FROM profiles p LEFT JOIN status s ON s.url = p.url "
+                 "WHERE p.scraped_at < ? AND (s.status IS NULL OR s.status = 'done') ORDER BY p.scraped_at")
+        with self._lock:
+            rows = self.conn.execute(query + (" LIMIT ?" if limit else ""),
+                                     (cutoff, limit) if limit else (cutoff,)).fetchall()
+            now = time.time()
+            for url, depth, context in rows:
+                boost = self.rules.boost(context)
+                self.conn.execute("DELETE FROM visited WHERE url = ?", (url,))
+                self.conn.execute("UPDATE status SET attempts = 0 WHERE url = ?", (url,))
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO frontier (url, added_at, depth, refs, boost, score, context) VALUES (?, ?, ?, 0, ?, ?, ?)",
+                    (url, now, depth, boost, self.rules.score(depth, 0, boost), context)
+                )
+            self.commit()
+        if rows:
+            logging.info(f"Queued {len(rows)} profiles scraped more than {ttl / 3600:.1f}h ago for a refresh.")
+        return len(rows)
+
+    def pending_count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+    def visited_count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM visited").fetchone()[0]
@@ -0,0 +1,58 @@
+import re
+import unicodedata
+from urllib.parse import urlparse, unquote, quote
+
+
+PROFILE_PATH = re.compile(r"^/in/([^/]+)", re.IGNORECASE)
+# Old public profile URLs: /pub/<name>/<a>/<b>/<c> names one member, /pub/<name> alone does not
+PUBLIC_PROFILE_PATH = re.compile(r"^/pub/([^/]+(?:/[0-9a-z]{1,3}){3})/?$", re.IGNORECASE)
+# Member ids (e.g. ACoAAB...) are case-sensitive, unlike vanity names
+MEMBER_ID = re.compile(r"^AC[A-Za-z0-9_-]{20,}$")
+
+
+def profile_slug(url):
+    """
+    Reduce a LinkedIn profile URL to its stable slug key.
+
+    '/in/foo', 'https://www.linkedin.com/in/foo/', 'https://de.linkedin.com/in/Foo?x=1'
+    and percent-encoded variants all map to 'foo'. Vanity names are lowercased,
+    member ids ('/in/ACoAA...') keep their case, and old public profile URLs keep
+    their whole path ('pub/foo/1a/2b/3c'). Returns None for anything that is not
+    a profile URL.
+    """
+    if not url:
+        return None
+    url = url.strip()
+    if url.startswith("/"):
+        url = "https://www.linkedin.com" + url
+    elif "://" not in url:
+        url = "https://" + url
+
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if host != "linkedin.com" and not host.endswith(".linkedin.com"):
+        return None
+
+    match = PROFILE_PATH.match(parsed.path)
+    if match:
+        slug = unicodedata.normalize("NFC", unquote(match.group(1))).strip()
+        return (slug if MEMBER_ID.match(slug) else slug.lower()) or None
+
+    match = PUBLIC_PROFILE_PATH.match(parsed.path)
+    if match:
+        return "pub/" + unicodedata.normalize("NFC", unquote(match.group(1))).strip().lower()
+    return None
+
+
+def canonical_profile_url(url):
+    """
+    Return the canonical form of a profile URL (https://www.linkedin.com/in/<slug>/,
+    or https://www.linkedin.com/pub/<name>/<a>/<b>/<c>/ for old public profiles),
+    or None if the URL is not a profile URL.
+    """
+    slug = profile_slug(url)
+    if slug is None:
+        return None
+    if slug.startswith("pub/"):
+        return f"https://www.linkedin.com/{quote(slug, safe='-_.~/')}/"
+    return f"https://www.linkedin.com/in/{quote(slug, safe='-_.~')}/"
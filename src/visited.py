@@ -0,0 +1,111 @@
+import os
+import math
+import struct
+import hashlib
+import logging
+from src.urls import profile_slug
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. Memory is set by the capacity and the
+    target false-positive rate (about 1.2 MB per million entries at 1%) and
+    never grows; lookups have no false negatives.
+    """
+
+    def __init__(self, capacity=10_000_000, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first, second = struct.unpack("<QQ", digest)
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class VisitedIndex:
+    """
+    In-memory Bloom filter keyed by profile slug, placed in front of the visited
+    table of the crawl state. A negative answer is final; a positive one is
+    confirmed against SQLite, so membership tests stay exact.
+
+    The filter is saved next to the database on close together with the time of
+    the newest visit it covers, so a restart only replays visits made after it.
+    """
+
+    HEADER = struct.Struct("<4sQdQ")
+    MAGIC = b"BLM1"
+
+    def __init__(self, capacity=10_000_000, error_rate=0.01, file_path=None):
+        self.file_path = file_path
+        self.filter = BloomFilter(capacity, error_rate)
+        self.covered_until = 0.0
+
+    def add(self, url, visited_at=None):
+        slug = profile_slug(url)
+        if slug is None:
+            return
+        self.filter.add(slug)
+        if visited_at and visited_at > self.covered_until:
+            self.covered_until = visited_at
+        if self.filter.count == self.filter.capacity:
+            logging.warning(f"Visited index reached its capacity of {self.filter.capacity}; "
+                            "false positives (extra database lookups) will increase.")
+
+    def might_contain(self, url):
+        slug = profile_slug(url)
+        return slug is not None and slug in self.filter
+
+    def load(self, conn):
+        """
+        Fill the filter from the saved file (if compatible) plus every visit
+        recorded after it, streaming rows from the visited table.
+        """
+        since = self._load_file()
+        rows = conn.execute("SELECT url, visited_at FROM visited WHERE visited_at >= ?", (since,))
+        replayed = 0
+        for url, visited_at in rows:
+            self.add(url, visited_at)
+            replayed += 1
+        logging.info(f"Visited index ready: {self.filter.count} entries ({replayed} replayed from the database).")
+
+    def _load_file(self):
+        if not self.file_path or not os.path.exists(self.file_path):
+            return 0.0
+        try:
+            with open(self.file_path, "rb") as file:
+                magic, size, covered_until, count = self.HEADER.unpack(file.read(self.HEADER.size))
+                if magic != self.MAGIC or size != self.filter.size:
+                    logging.info("Visited index file does not match the configured capacity, rebuilding.")
+                    return 0.0
+                bits = file.read()
+            if len(bits) != len(self.filter.bits):
+                return 0.0
+            self.filter.bits[:] = bits
+            self.filter.count = count
+            self.covered_until = covered_until
+            return covered_until
+        except (OSError, struct.error) as e:
+            logging.warning(f"Could not read visited index file, rebuilding: {e}")
+            return 0.0
+
+    def save(self):
+        if not self.file_path:
+            return
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.filter.size, self.covered_until, self.filter.count))
+            file.write(self.filter.bits)
+        os.replace(tmp_path, self.file_path)
@@ -0,0 +1,32 @@
+import pytest
+
+
+class ListSink:
+    """
+    Output sink keeping the written records in memory.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+
+class Driver:
+    """
+    Browser stand-in for pools whose crawl function never touches the driver.
+    """
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def sink():
+    return ListSink()
+
+
+@pytest.fixture
+def driver_factory():
+    return Driver
@@ -0,0 +1,46 @@
+import os
+import pytest
+from src.archive import PageArchive, find_pages
+from src.reextract import reextract
+from src.scrape import scrape_html
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "data", "fixtures")
+URL = "https://www.linkedin.com/in/someone/"
+
+
+def page_source():
+    with open(find_pages([FIXTURES])[0], "rb") as file:
+        return file.read()
+
+
+def test_read_only_archive_reads_what_was_archived(tmp_path):
+    directory = str(tmp_path / "archive")
+    with PageArchive(directory) as archive:
+        digest = archive.put(URL, page_source(), captured_at=1.0)
+    with PageArchive(directory, read_only=True) as archive:
+        assert archive.captures(URL) == [(1.0, digest)]
+        assert scrape_html(archive.get(URL), URL) == scrape_html(page_source(), URL)
+        with pytest.raises(Exception):
+            archive.put(URL, page_source())
+
+
+def test_read_only_archive_must_exist(tmp_path):
+    directory = str(tmp_path / "mistyped")
+    with pytest.raises(FileNotFoundError):
+        PageArchive(directory, read_only=True)
+    assert not os.path.exists(directory)
+
+
+def test_reextract_from_the_archive(sink, tmp_path):
+    directory = str(tmp_path / "archive")
+    with PageArchive(directory) as archive:
+        archive.put(URL, page_source())
+    summary = reextract(sink, archive_dir=directory, workers=2)
+    assert summary["extracted"] == 1
+    assert sink.records == [{"profile_url": URL, **scrape_html(page_source(), URL)}]
+
+
+def test_reextract_from_a_missing_archive_fails(sink, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        reextract(sink, archive_dir=str(tmp_path / "mistyped"), workers=1)
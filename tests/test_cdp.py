@@ -0,0 +1,104 @@
+import os
+import json
+import time
+import asyncio
+import threading
+import pytest
+from src.cdp import run_crawl
+from src.fakes import FakeCDPServer
+from src.scrape import scrape_html
+from src.session import SessionManager
+from src.state import CrawlState
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "data", "fixtures", "sample_profile.html")
+SEEDS = [f"https://www.linkedin.com/in/seed-{i}/" for i in range(6)]
+# Profiles linked from the fixture's "More profiles for you" section
+DISCOVERED = ["https://www.linkedin.com/in/budi-santoso/", "https://www.linkedin.com/in/dewi-lestari/"]
+
+
+class ThreadRecordingState:
+    """
+    Wraps a CrawlState and records the threads its methods are called on.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.threads = set()
+
+    def __contains__(self, url):
+        return url in self.state
+
+    def __getattr__(self, name):
+        method = getattr(self.state, name)
+
+        def call(*args, **kwargs):
+            self.threads.add(threading.current_thread())
+            return method(*args, **kwargs)
+        return call
+
+
+@pytest.fixture
+def page_source():
+    with open(FIXTURE, "rb") as file:
+        return file.read()
+
+
+@pytest.fixture
+def server(page_source):
+    # run_crawl starts its own event loop, so the fake browser runs on another thread
+    server = FakeCDPServer({}, default_page=page_source, load_time=0.2)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    yield server
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def test_crawls_seeds_and_discovered_profiles(server, page_source, sink, tmp_path):
+    state = ThreadRecordingState(CrawlState(str(tmp_path / "state.db")))
+    state.push(SEEDS)
+    state.threads.clear()
+    summary = run_crawl(state, sink, port=server.port, tabs=4)
+    threads = set(state.threads)
+
+    scraped = {record["profile_url"]: record for record in sink.records}
+    assert set(scraped) == set(SEEDS + DISCOVERED)
+    expected = scrape_html(page_source, SEEDS[0])
+    assert {key: value for key, value in scraped[SEEDS[0]].items() if key != "profile_url"} == expected
+    assert summary["scraped"] == len(SEEDS) + len(DISCOVERED)
+    assert state.pending_count() == 0
+    # Pages loaded concurrently, and the SQLite state never ran on the event loop's thread
+    assert server.max_loading > 1
+    assert threads and threading.main_thread() not in threads
+    state.close()
+
+
+def test_warm_starts_from_the_saved_session(server, sink, tmp_path):
+    server.session_status = 401
+    session_file = tmp_path / "session.json"
+    session_file.write_text(json.dumps({
+        "saved_at": time.time(),
+        "cookies": [{"name": "li_at", "value": "token", "domain": ".linkedin.com", "path": "/",
+                     "expiry": time.time() + 3600, "sameSite": "Lax"}],
+        "local_storage": {},
+    }))
+    state = CrawlState(str(tmp_path / "state.db"))
+    state.push(SEEDS[:1])
+    run_crawl(state, sink, port=server.port, tabs=1, sessions=SessionManager(str(session_file)))
+    assert server.cookies[0]["name"] == "li_at" and server.cookies[0]["sameSite"] == "Lax"
+    assert len(sink.records) == 1 + len(DISCOVERED)
+    state.close()
+
+
+def test_refuses_to_crawl_logged_out(server, sink, tmp_path):
+    server.session_status = 401
+    state = CrawlState(str(tmp_path / "state.db"))
+    state.push(SEEDS[:1])
+    with pytest.raises(RuntimeError):
+        run_crawl(state, sink, port=server.port, tabs=1, sessions=SessionManager(str(tmp_path / "missing.json")))
+    assert state.pending_count() == 1
+    state.close()
@@ -0,0 +1,35 @@
+import os
+import sys
+import subprocess
+
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+FIXTURE = os.path.join(ROOT, "data", "fixtures", "sample_profile.html")
+
+
+def run(*args):
+    # An unrelated bad setting must not matter to tools that do not use it
+    env = dict(os.environ, MONGO_BATCH_SIZE="x")
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+
+
+def test_offline_tools_import_without_a_valid_config():
+    result = run("-c", "import src.helper, src.scrape, src.reextract, src.bench, src.selector_registry")
+    assert result.returncode == 0, result.stderr
+
+
+def test_snapshot_extraction_works_without_a_valid_config():
+    result = run("-c", f"from src.scrape import scrape_html; print(scrape_html(open({FIXTURE!r}, 'rb').read())['intro']['name'])")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip()
+
+
+def test_selectors_report_reads_only_its_argument(tmp_path):
+    result = run("cli.py", "selectors", str(tmp_path / "missing.json"))
+    assert result.returncode == 0, result.stderr
+    assert "Loaded selector statistics" not in result.stderr
+
+
+def test_the_bad_setting_is_still_reported():
+    result = run("-c", "from src.config import get_config; get_config()")
+    assert result.returncode != 0 and "MONGO_BATCH_SIZE" in result.stderr
@@ -0,0 +1,198 @@
+import time
+import random
+import threading
+import pytest
+from src.coordinator import Coordinator, HashRing, ShardedState, ring_point
+from src.pool import WorkerPool
+from src.state import CrawlState
+
+
+URLS = [f"https://www.linkedin.com/in/user-{i}/" for i in range(300)]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "coordinator.db")
+
+
+@pytest.fixture
+def nodes():
+    started = []
+    yield started
+    for node in started:
+        node.close()
+
+
+def claim_all(node):
+    claimed = []
+    while (url := node.claim()) is not None:
+        claimed.append(url)
+    return claimed
+
+
+def moved_url(before, after, node):
+    """
+    A URL from URLS owned by someone else on the ring over before, and by node on the ring over after.
+    """
+    old, new = HashRing(before), HashRing(after)
+    return next(url for url in URLS if old.owner(url) != node and new.owner(url) == node)
+
+
+def test_ring_arcs_match_owner():
+    ring = HashRing(["a", "b", "c"])
+    for url in URLS:
+        point = ring_point(url)
+        owners = [node for node in ring.nodes if any(lo < point <= hi for lo, hi in ring.arcs(node))]
+        assert owners == [ring.owner(url)]
+
+
+def test_nodes_claim_disjoint_shards(db_path, nodes):
+    for name in ("a", "b", "c"):
+        node = Coordinator(db_path, node_id=name)
+        node.join()
+        nodes.append(node)
+    nodes[0].push(URLS)
+
+    claimed = {node.node_id: claim_all(node) for node in nodes}
+    everything = [url for urls in claimed.values() for url in urls]
+    assert sorted(everything) == sorted(URLS)
+    ring = HashRing(["a", "b", "c"])
+    for name, urls in claimed.items():
+        assert urls and all(ring.owner(url) == name for url in urls)
+
+
+def test_held_lease_is_not_handed_out_again(db_path, nodes):
+    node = Coordinator(db_path, node_id="a", lease_seconds=1)
+    node.join()
+    nodes.append(node)
+    node.push(URLS[:1])
+
+    assert node.claim() == URLS[0]
+    # The heartbeat keeps renewing the lease while the profile is being crawled
+    time.sleep(1.5)
+    assert node.claim() is None
+    node.release(URLS[0])
+    assert node.claim() == URLS[0]
+
+
+def test_expired_lease_is_taken_over_after_resharding(db_path, nodes):
+    # a claims a profile, then hangs: it is still live but stops renewing its lease
+    a = Coordinator(db_path, node_id="a", lease_seconds=1)
+    a.heartbeat()
+    url = moved_url(["a"], ["a", "b"], "b")
+    a.push([url])
+    assert a.claim() == url
+
+    b = Coordinator(db_path, node_id="b")
+    b.join()
+    nodes.append(b)
+    assert b.claim() is None
+    time.sleep(1.2)
+    assert b.claim() == url
+    a.conn.close()
+
+
+def test_node_that_lost_its_lease_records_nothing(db_path, nodes, tmp_path):
+    a = Coordinator(db_path, node_id="a", lease_seconds=1)
+    a.heartbeat()
+    url = moved_url(["a"], ["a", "b"], "b")
+    a.push([url])
+    assert a.claim() == url
+    b = Coordinator(db_path, node_id="b")
+    b.join()
+    nodes.append(b)
+    time.sleep(1.2)
+    assert b.claim() == url
+
+    assert a.fail(url) is False
+    assert a.complete(url) is False
+    local = CrawlState(str(tmp_path / "a.db"))
+    state = ShardedState(a, local)
+    state.mark_failed(url, "timed out")
+    state.mark_done(url)
+    assert url not in local
+    row = b.conn.execute("SELECT lease_owner, attempts FROM frontier WHERE url = ?", (url,)).fetchone()
+    assert row == ("b", 0)
+    assert not b.is_done(url)
+    assert b.complete(url) and b.is_done(url)
+    local.close()
+    a.conn.close()
+
+
+def test_dead_nodes_shard_moves_to_the_live_nodes(db_path, nodes):
+    a = Coordinator(db_path, node_id="a", heartbeat_ttl=1)
+    a.join()
+    nodes.append(a)
+    # b registers and claims its shard, then dies without leaving
+    b = Coordinator(db_path, node_id="b", heartbeat_ttl=1)
+    b.heartbeat()
+    a.push(URLS[:100])
+    held_by_b = claim_all(b)
+    held_by_a = claim_all(a)
+    assert held_by_b and held_by_a and not set(held_by_a) & set(held_by_b)
+    b.conn.close()
+
+    time.sleep(1.2)
+    assert a.live_nodes() == ["a"]
+    assert a.owner(held_by_b[0]) == "a"
+    assert sorted(claim_all(a)) == sorted(held_by_b)
+
+
+def test_failed_profile_is_given_up_after_max_attempts(db_path, nodes):
+    node = Coordinator(db_path, node_id="a", max_attempts=2)
+    node.join()
+    nodes.append(node)
+    node.push(URLS[:1])
+
+    assert node.fail(node.claim()) is False
+    assert node.fail(node.claim()) is True
+    assert node.is_done(URLS[0])
+    assert node.pending_count() == 0
+    assert node.claim() is None
+
+
+def test_two_nodes_crawl_every_profile_once(db_path, sink, driver_factory, tmp_path):
+    seen = []
+    lock = threading.Lock()
+    summaries = {}
+
+    def crawl(driver, profile_url, state, sink, engine=None, preloaded=False):
+        with lock:
+            seen.append(profile_url)
+        state.mark_done(profile_url)
+        state.push(random.sample(URLS[:100], 4), depth=state.depth_of(profile_url) + 1, referrer=profile_url)
+        return True
+
+    def run(name):
+        node = Coordinator(db_path, node_id=name, heartbeat_ttl=5)
+        node.join()
+        state = ShardedState(node, CrawlState(str(tmp_path / f"{name}.db")))
+        state.push(URLS[:5])
+        try:
+            summaries[name] = WorkerPool([driver_factory] * 2, state, sink, crawl=crawl, idle_poll=0.05).run()
+        finally:
+            state.close()
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(seen) == len(set(seen))
+    check = Coordinator(db_path, node_id="check")
+    assert check.pending_count() == 0
+    assert check.done_count() == len(seen)
+    assert sum(summary["scraped"] for summary in summaries.values()) == len(seen)
+    check.conn.close()
+
+
+def test_references_count_distinct_referrers(db_path, nodes):
+    node = Coordinator(db_path, node_id="a")
+    node.join()
+    nodes.append(node)
+    for referrer in (URLS[1], URLS[1], URLS[2]):
+        node.push(URLS[:1], depth=1, referrer=referrer)
+    assert node.conn.execute("SELECT refs FROM frontier WHERE url = ?", (URLS[0],)).fetchone()[0] == 2
+    node.complete(node.claim())
+    assert node.conn.execute("SELECT COUNT(*) FROM refs").fetchone()[0] == 0
@@ -0,0 +1,56 @@
+import pytest
+from src import crawler
+from src.state import CrawlState
+
+
+URL = "https://www.linkedin.com/in/someone/"
+CARDS = [("https://www.linkedin.com/in/card/", "Card")]
+
+
+@pytest.fixture
+def state(tmp_path):
+    state = CrawlState(str(tmp_path / "state.db"))
+    state.push([URL])
+    state.pop()
+    yield state
+    state.close()
+
+
+def scrape_returns(monkeypatch, profile_info):
+    monkeypatch.setattr(crawler, "scrape_profile", lambda driver, profile_url, **kwargs: profile_info)
+    monkeypatch.setattr(crawler, "extract_more_profile_cards", lambda driver: CARDS)
+
+
+def queued(state):
+    return [row[0] for row in state.conn.execute("SELECT url FROM frontier ORDER BY url")]
+
+
+def test_scraped_page_queues_its_links(monkeypatch, state, sink):
+    scrape_returns(monkeypatch, {"intro": {"name": "Someone"}})
+    assert crawler.crawl_profile(None, URL, state, sink) is True
+    assert len(sink.records) == 1
+    assert queued(state) == [CARDS[0][0]]
+
+
+def test_failed_page_queues_no_links(monkeypatch, state, sink):
+    scrape_returns(monkeypatch, None)
+    assert crawler.crawl_profile(None, URL, state, sink) is False
+    assert not sink.records
+    assert queued(state) == [URL]
+    assert state.attempts(URL) == 1
+
+
+def test_visited_profile_is_skipped_without_an_attempt(monkeypatch, state, sink):
+    # Finished meanwhile, e.g. by a concurrent run on the same state
+    state._add_visited(URL)
+    edges = []
+
+    class Graph:
+        def add_edges(self, source, targets):
+            edges.append((source, targets))
+
+    scrape_returns(monkeypatch, {"intro": {"name": "Someone"}})
+    assert crawler.crawl_profile(None, URL, state, sink, graph=Graph()) is None
+    assert not sink.records and not edges
+    assert state.attempts(URL) == 0
+    assert queued(state) == []
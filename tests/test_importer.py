@@ -0,0 +1,78 @@
+import json
+import mongomock
+import pytest
+from src.importer import iter_json_documents, import_to_mongo, read_checkpoint
+
+
+def profiles(count):
+    return [{"profile_url": f"https://www.linkedin.com/in/user-{i}/", "name": f"Zoë {i}"} for i in range(count)]
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient()["scraper"]["profiles"]
+
+
+def test_reads_json_arrays_and_jsonl_alike(tmp_path):
+    documents = profiles(5)
+    array_path, lines_path = tmp_path / "profiles.json", tmp_path / "profiles.jsonl"
+    array_path.write_text(json.dumps(documents, indent=2, ensure_ascii=False), encoding="utf-8")
+    lines_path.write_text("".join(json.dumps(d, ensure_ascii=False) + "\n" for d in documents), encoding="utf-8")
+    for path in (array_path, lines_path):
+        assert [document for document, _ in iter_json_documents(str(path), chunk_size=16)] == documents
+
+
+def test_resumes_from_any_returned_offset(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps(profiles(6), ensure_ascii=False), encoding="utf-8")
+    offsets = [offset for _, offset in iter_json_documents(str(path))]
+    rest = [document["name"] for document, _ in iter_json_documents(str(path), offset=offsets[2])]
+    assert rest == ["Zoë 3", "Zoë 4", "Zoë 5"]
+
+
+def test_imports_with_upserts_and_removes_the_checkpoint(tmp_path, collection):
+    path = tmp_path / "profiles.jsonl"
+    documents = profiles(25) + [{"profile_url": "https://de.linkedin.com/in/USER-3", "name": "Updated"}]
+    path.write_text("".join(json.dumps(d) + "\n" for d in documents), encoding="utf-8")
+    checkpoint = tmp_path / "import.checkpoint"
+    summary = import_to_mongo(str(path), collection, batch_size=4, workers=2, checkpoint_path=str(checkpoint))
+    assert summary["documents"] == 26 and summary["errors"] == 0
+    assert collection.count_documents({}) == 25
+    assert collection.find_one({"profile_url": "https://www.linkedin.com/in/user-3/"})["name"] == "Updated"
+    assert not checkpoint.exists()
+
+
+def test_unusable_urls_are_not_merged(tmp_path, collection):
+    path = tmp_path / "profiles.jsonl"
+    path.write_text('{"profile_url": "https://example.com/a"}\n{"profile_url": "https://example.com/b"}\n')
+    import_to_mongo(str(path), collection, batch_size=10)
+    assert collection.count_documents({}) == 2
+
+
+def test_interrupted_import_resumes_at_the_checkpoint(tmp_path, collection):
+    path = tmp_path / "profiles.jsonl"
+    path.write_text("".join(json.dumps(d) + "\n" for d in profiles(12)), encoding="utf-8")
+    checkpoint = tmp_path / "import.checkpoint"
+    original = collection.bulk_write
+    batches = []
+
+    def crash_on_third(operations, ordered=True):
+        batches.append(len(operations))
+        if len(batches) == 3:
+            raise RuntimeError("killed")
+        return original(operations, ordered=ordered)
+
+    collection.bulk_write = crash_on_third
+    with pytest.raises(RuntimeError):
+        import_to_mongo(str(path), collection, batch_size=4, workers=1, checkpoint_path=str(checkpoint))
+    # Only batches known to be written move the checkpoint: at least the first, never the third
+    offset = read_checkpoint(str(checkpoint), str(path))
+    imported = sum(1 for _, end in iter_json_documents(str(path)) if end <= offset)
+    assert imported in (4, 8)
+    assert collection.count_documents({}) == 8
+
+    collection.bulk_write = original
+    summary = import_to_mongo(str(path), collection, batch_size=4, workers=1, checkpoint_path=str(checkpoint))
+    assert summary["documents"] == 12 - imported
+    assert collection.count_documents({}) == 12
+    assert not checkpoint.exists()
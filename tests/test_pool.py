@@ -0,0 +1,67 @@
+import os
+import threading
+from src.bench import run_pool_benchmark
+from src.pool import WorkerPool
+from src.state import CrawlState
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "data", "fixtures", "sample_profile.html")
+
+
+def test_workers_crawl_concurrently(tmp_path, sink, driver_factory):
+    state = CrawlState(str(tmp_path / "state.db"))
+    state.push([f"https://www.linkedin.com/in/user-{i}/" for i in range(8)])
+    # Every crawl waits until four are running at once; it fails if they never are
+    barrier = threading.Barrier(4, timeout=10)
+
+    def crawl(driver, profile_url, state, sink, engine=None, preloaded=False):
+        barrier.wait()
+        state.mark_done(profile_url)
+        return True
+
+    summary = WorkerPool([driver_factory] * 4, state, sink, crawl=crawl, idle_poll=0.01).run()
+    assert summary["scraped"] == 8 and summary["failed"] == 0
+    state.close()
+
+
+def test_pool_benchmark_matches_the_plain_scrape():
+    one, four = run_pool_benchmark([FIXTURE], workers=(1, 4), repeat=4, load_time=0.05)
+    assert one["profiles"] == four["profiles"] == 4
+    assert one["same_output"] and four["same_output"]
+    assert one["profiles_per_second"] > 0 and four["profiles_per_second"] > 0
+
+
+def test_every_profile_is_scraped_once(tmp_path, sink, driver_factory):
+    state = CrawlState(str(tmp_path / "state.db"))
+    state.push([f"https://www.linkedin.com/in/user-{i}/" for i in range(20)])
+    seen = []
+    lock = threading.Lock()
+
+    def crawl(driver, profile_url, state, sink, engine=None, preloaded=False):
+        with lock:
+            seen.append(profile_url)
+        state.mark_done(profile_url)
+        return True
+
+    summary = WorkerPool([driver_factory] * 3, state, sink, crawl=crawl, idle_poll=0.01).run()
+    assert sorted(seen) == sorted(set(seen)) and len(seen) == 20
+    assert summary["scraped"] == 20
+    assert state.pending_count() == 0
+    state.close()
+
+
+def test_failing_crawl_is_recorded_and_worker_continues(tmp_path, sink, driver_factory):
+    state = CrawlState(str(tmp_path / "state.db"), max_attempts=1)
+    state.push(["https://www.linkedin.com/in/broken/", "https://www.linkedin.com/in/fine/"])
+
+    def crawl(driver, profile_url, state, sink, engine=None, preloaded=False):
+        if "broken" in profile_url:
+            raise RuntimeError("page crashed")
+        state.mark_done(profile_url)
+        return True
+
+    pool = WorkerPool([driver_factory], state, sink, crawl=crawl, idle_poll=0.01)
+    pool.run()
+    assert pool.stats[0]["scraped"] == 1 and pool.stats[0]["failed"] == 1
+    assert state.pending_count() == 0
+    state.close()
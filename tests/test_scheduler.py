@@ -0,0 +1,72 @@
+import time
+import random
+import pytest
+from src.scheduler import CrawlScheduler
+
+
+class FakeClock:
+    """
+    Monotonic and wall clock that only move when the scheduler sleeps.
+    """
+
+    def __init__(self, wall=None):
+        self.now = 0.0
+        self.wall = wall if wall is not None else time.mktime((2026, 3, 2, 9, 0, 0, 0, 0, -1))
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.wall + self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def scheduler(clock, **kwargs):
+    return CrawlScheduler(clock=clock.monotonic, wall_clock=clock.time, sleep=clock.sleep, rng=random.Random(0), **kwargs)
+
+
+def test_burst_then_sustained_rate():
+    clock = FakeClock()
+    pacing = scheduler(clock, rate_per_hour=60, burst=3, min_interval=0, jitter=0)
+    for _ in range(3):
+        assert pacing.acquire() == 0
+    assert clock.now == 0
+    # The bucket is empty; every further visit waits for one token (60 per hour)
+    pacing.acquire()
+    assert clock.now == 60
+    pacing.acquire()
+    assert clock.now == 120
+
+
+def test_min_interval_with_jitter_bounds():
+    clock = FakeClock()
+    pacing = scheduler(clock, rate_per_hour=3600, burst=10, min_interval=20, jitter=0.5)
+    stamps = []
+    for _ in range(5):
+        pacing.acquire()
+        stamps.append(clock.now)
+    gaps = [later - earlier for earlier, later in zip(stamps, stamps[1:])]
+    assert all(20 <= gap <= 20 * 1.5 * 1.5 for gap in gaps)
+
+
+def test_daily_budget_waits_until_midnight():
+    clock = FakeClock()
+    pacing = scheduler(clock, rate_per_hour=3600, burst=5, daily_budget=2, min_interval=0, jitter=0)
+    pacing.acquire()
+    pacing.acquire()
+    assert pacing.visits_today() == 2
+    wait = pacing.try_acquire()
+    # Started at 09:00, so the budget comes back after 15 hours
+    assert wait == 15 * 3600
+    pacing.acquire()
+    assert time.localtime(clock.time()).tm_mday == 3
+    assert pacing.visits_today() == 1
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        CrawlScheduler(rate_per_hour=0)
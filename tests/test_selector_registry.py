@@ -0,0 +1,34 @@
+from src.fakes import FakeWebDriver
+from src.metrics import TIMEOUTS
+from src.selector_registry import SelectorRegistry, find
+from src.snapshot import SnapshotPage
+
+
+PAGE = "<html><body><h1 class='name'>Someone</h1></body></html>"
+SELECTORS = {"intro.name": ["//h1[@class='missing']", "//h1[@class='name']"], "about.description": ["//p"]}
+
+
+def test_timed_out_lookups_are_counted_by_field():
+    registry = SelectorRegistry(SELECTORS, default_timeout=0.1)
+    before = TIMEOUTS.value(function="find", key="about.description")
+    assert find(FakeWebDriver(PAGE), "about.description", registry=registry) is None
+    assert find(FakeWebDriver(PAGE), "intro.name", registry=registry).text == "Someone"
+    assert TIMEOUTS.value(function="find", key="about.description") == before + 1
+    assert registry.misses() == 2
+
+
+def test_snapshot_misses_do_not_count_as_timeouts():
+    registry = SelectorRegistry(SELECTORS, default_timeout=0.1)
+    before = TIMEOUTS.value(function="find", key="about.description")
+    assert find(SnapshotPage(PAGE), "about.description", registry=registry) is None
+    assert TIMEOUTS.value(function="find", key="about.description") == before
+    assert registry.misses() == 1
+
+
+def test_miss_cost_follows_learned_timeouts():
+    registry = SelectorRegistry(SELECTORS, default_timeout=2.0, min_timeout=0.25, min_samples=2)
+    assert registry.miss_cost("intro.name") == 4.0
+    for _ in range(2):
+        registry.record("intro.name", SELECTORS["intro.name"][0], False)
+        registry.record("intro.name", SELECTORS["intro.name"][1], True, 0.1)
+    assert registry.miss_cost("intro.name") == 0.25 + 0.25
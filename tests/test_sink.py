@@ -0,0 +1,159 @@
+import json
+import mongomock
+from src.crawler import record_profile
+from src.sink import JsonlSink, MongoSink, MultiSink, export_jsonl_to_json
+from src.state import CrawlState
+
+
+def mongo_sink(client, **kwargs):
+    return MongoSink(db_name="scraper", collection_name="profiles", client=client, **kwargs)
+
+
+def test_upserts_by_canonical_url():
+    client = mongomock.MongoClient()
+    with mongo_sink(client, batch_size=10, flush_interval=60) as sink:
+        sink.write({"profile_url": "https://de.linkedin.com/in/Foo/?trk=x", "name": "Old"})
+        sink.write({"profile_url": "https://www.linkedin.com/in/foo/", "name": "New"})
+        sink.write({"profile_url": "https://www.linkedin.com/in/bar/", "name": "Bar"})
+    collection = client["scraper"]["profiles"]
+    assert collection.count_documents({}) == 2
+    assert collection.find_one({"profile_url": "https://www.linkedin.com/in/foo/"})["name"] == "New"
+
+
+def test_flushes_when_the_batch_is_full():
+    client = mongomock.MongoClient()
+    sink = mongo_sink(client, batch_size=2, flush_interval=60)
+    collection = client["scraper"]["profiles"]
+    sink.write({"profile_url": "https://www.linkedin.com/in/a/"})
+    assert collection.count_documents({}) == 0
+    sink.write({"profile_url": "https://www.linkedin.com/in/b/"})
+    assert collection.count_documents({}) == 2
+    sink.close()
+
+
+def test_failed_batch_stays_buffered_until_the_next_flush():
+    client = mongomock.MongoClient()
+    sink = mongo_sink(client, batch_size=100, flush_interval=60)
+    collection = sink.collection
+    original = collection.bulk_write
+    calls = []
+
+    def flaky(operations, ordered=True):
+        calls.append(len(operations))
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")
+        return original(operations, ordered=ordered)
+
+    collection.bulk_write = flaky
+    sink.write({"profile_url": "https://www.linkedin.com/in/a/"})
+    sink.flush()
+    assert collection.count_documents({}) == 0
+    sink.close()
+    assert calls == [1, 1]
+    assert collection.count_documents({}) == 1
+
+
+def test_unusable_url_keeps_its_value():
+    client = mongomock.MongoClient()
+    with mongo_sink(client) as sink:
+        sink.write({"profile_url": "https://example.com/someone", "name": "A"})
+        sink.write({"profile_url": "https://example.com/other", "name": "B"})
+    assert client["scraper"]["profiles"].count_documents({}) == 2
+
+
+def test_multi_sink_writes_everywhere(tmp_path):
+    client = mongomock.MongoClient()
+    path = tmp_path / "profiles.jsonl"
+    sink = MultiSink(JsonlSink(str(path)), mongo_sink(client))
+    sink.write({"profile_url": "https://www.linkedin.com/in/a/", "name": "A"})
+    sink.close()
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == ["A"]
+    assert client["scraper"]["profiles"].count_documents({}) == 1
+
+
+def test_buffered_delta_is_merged_into_the_buffered_profile():
+    client = mongomock.MongoClient()
+    url = "https://www.linkedin.com/in/a/"
+    with mongo_sink(client, batch_size=10, flush_interval=60) as sink:
+        sink.write({"profile_url": url, "name": "A", "about": "old", "experience": ["x"]})
+        sink.write({"profile_url": url, "changed_sections": ["about"], "scraped_at": "t1", "about": "new"})
+        sink.write({"profile_url": url, "changed_sections": ["experience"], "scraped_at": "t2", "experience": ["y"]})
+    document = client["scraper"]["profiles"].find_one({"profile_url": url})
+    assert (document["name"], document["about"], document["experience"]) == ("A", "new", ["y"])
+
+
+def test_buffered_deltas_keep_the_sections_of_both():
+    client = mongomock.MongoClient()
+    url = "https://www.linkedin.com/in/a/"
+    client["scraper"]["profiles"].insert_one({"profile_url": url, "name": "A", "about": "old", "experience": ["x"]})
+    with mongo_sink(client, batch_size=10, flush_interval=60) as sink:
+        sink.write({"profile_url": url, "changed_sections": ["about"], "scraped_at": "t1", "about": "new"})
+        sink.write({"profile_url": url, "changed_sections": ["experience"], "scraped_at": "t2", "experience": ["y"]})
+    document = client["scraper"]["profiles"].find_one({"profile_url": url})
+    assert (document["name"], document["about"], document["experience"]) == ("A", "new", ["y"])
+    assert document["changed_sections"] == ["about", "experience"]
+
+
+def test_export_folds_refreshed_profiles_into_one_record(tmp_path):
+    state = CrawlState(str(tmp_path / "state.db"))
+    url = "https://www.linkedin.com/in/a/"
+    other = "https://www.linkedin.com/in/b/"
+    state.push([url, other])
+    path = tmp_path / "profiles.jsonl"
+    with JsonlSink(str(path)) as sink:
+        record_profile(url, {"name": "A", "about": "old", "experience": ["x"]}, state, sink)
+        record_profile(other, {"name": "B"}, state, sink)
+        # A refresh only writes the changed section
+        record_profile(url, {"name": "A", "about": "new", "experience": ["x"]}, state, sink)
+    assert "changed_sections" in json.loads(path.read_text().splitlines()[-1])
+
+    destination = tmp_path / "profiles.json"
+    assert export_jsonl_to_json(str(path), str(destination)) == 2
+    assert json.loads(destination.read_text()) == [
+        {"profile_url": url, "name": "A", "about": "new", "experience": ["x"]},
+        {"profile_url": other, "name": "B"},
+    ]
+    state.close()
+
+
+def test_export_skips_deltas_without_a_full_record(tmp_path):
+    path = tmp_path / "profiles.jsonl"
+    with JsonlSink(str(path)) as sink:
+        sink.write({"profile_url": "https://www.linkedin.com/in/a/", "changed_sections": ["about"], "about": "x"})
+        sink.write({"profile_url": "https://www.linkedin.com/in/b/", "name": "B"})
+    destination = tmp_path / "profiles.json"
+    assert export_jsonl_to_json(str(path), str(destination)) == 1
+    assert json.loads(destination.read_text()) == [{"profile_url": "https://www.linkedin.com/in/b/", "name": "B"}]
+
+
+def failing_sink(client, **kwargs):
+    sink = mongo_sink(client, batch_size=2, flush_interval=60, **kwargs)
+
+    def down(operations, ordered=True):
+        raise RuntimeError("connection refused")
+
+    sink.collection.bulk_write = down
+    return sink
+
+
+def test_buffer_is_capped_while_mongo_is_down(tmp_path):
+    client = mongomock.MongoClient()
+    spill = tmp_path / "spill.jsonl"
+    sink = failing_sink(client, max_buffered=3, spill_path=str(spill))
+    for i in range(5):
+        sink.write({"profile_url": f"https://www.linkedin.com/in/user-{i}/"})
+        assert len(sink._buffer) <= 3
+    spilled = [json.loads(line)["profile_url"] for line in spill.read_text().splitlines()]
+    assert spilled == ["https://www.linkedin.com/in/user-0/", "https://www.linkedin.com/in/user-1/"]
+    sink.close()
+    # Whatever is still buffered when closing goes to the spill file too
+    assert len(spill.read_text().splitlines()) == 5
+
+
+def test_buffer_overflow_is_dropped_without_a_spill_file():
+    client = mongomock.MongoClient()
+    sink = failing_sink(client, max_buffered=3)
+    for i in range(5):
+        sink.write({"profile_url": f"https://www.linkedin.com/in/user-{i}/"})
+    assert list(sink._buffer) == [f"https://www.linkedin.com/in/user-{i}/" for i in range(2, 5)]
+    sink.close()
@@ -0,0 +1,48 @@
+import os
+import pytest
+from selenium.webdriver.common.by import By
+from src.bench import run_benchmark
+from src.fakes import FakeWebDriver
+from src.scrape import SECTION_ANCHORS, extract_sections, probe_sections, scrape_html
+from src.selector_registry import get_registry
+from src.snapshot import SnapshotPage
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "data", "fixtures", "sample_profile.html")
+URL = "https://www.linkedin.com/in/sample/"
+
+
+@pytest.fixture
+def page_source():
+    with open(FIXTURE, "rb") as file:
+        return file.read()
+
+
+@pytest.fixture(autouse=True)
+def short_waits(monkeypatch):
+    # Selectors that miss on the live (fake) driver wait out their timeout
+    monkeypatch.setattr(get_registry(), "default_timeout", 0.05)
+
+
+def test_snapshot_matches_the_selenium_engine(page_source):
+    driver = FakeWebDriver(page_source, URL)
+    live = extract_sections(driver, probe_sections(driver))
+    snapshot = scrape_html(page_source, URL)
+    assert snapshot["intro"]
+    assert snapshot == live
+
+
+def test_all_engines_agree_with_absent_sections():
+    _, matches = run_benchmark([FIXTURE], missing_sections=("projects", "honors"))
+    assert matches == {"selenium": True, "snapshot": True, "script": True}
+
+
+def test_probe_finds_only_present_sections(page_source):
+    page = SnapshotPage(page_source, URL)
+    assert probe_sections(page) <= set(SECTION_ANCHORS)
+    assert probe_sections(page) == probe_sections(FakeWebDriver(page_source, URL))
+
+
+def test_unsupported_locators_are_rejected(page_source):
+    with pytest.raises(ValueError):
+        SnapshotPage(page_source, URL).find_elements(By.CSS_SELECTOR, "h1")
@@ -0,0 +1,28 @@
+from src.state import CrawlState
+
+
+def refs(state, url):
+    return state.conn.execute("SELECT refs FROM frontier WHERE url = ?", (url,)).fetchone()[0]
+
+
+def test_references_count_distinct_referrers(tmp_path):
+    state = CrawlState(str(tmp_path / "state.db"))
+    url = "https://www.linkedin.com/in/target/"
+    state.push([url], depth=1, referrer="https://www.linkedin.com/in/a/")
+    # The same page pushed again, e.g. when it is retried or refreshed
+    state.push([url], depth=1, referrer="https://www.linkedin.com/in/a/")
+    assert refs(state, url) == 1
+    state.push([url], depth=1, referrer="https://www.linkedin.com/in/b/")
+    assert refs(state, url) == 2
+    state.push([url])
+    assert refs(state, url) == 2
+    state.close()
+
+
+def test_references_are_dropped_with_the_frontier_entry(tmp_path):
+    state = CrawlState(str(tmp_path / "state.db"))
+    url = "https://www.linkedin.com/in/target/"
+    state.push([url], referrer="https://www.linkedin.com/in/a/")
+    state.mark_done(state.pop())
+    assert state.conn.execute("SELECT COUNT(*) FROM refs").fetchone()[0] == 0
+    state.close()